@@ -0,0 +1,85 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from metrics import admission_rejections_total
+
+# Weight of the newest per-file parse time in the running average
+_SMOOTHING = 0.2
+
+# Retry-After bounds, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__('Server is busy parsing other statements; retry later')
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Bounds the files admitted for parsing, running or waiting for a pool
+    worker, across /api/upload and /api/jobs. Work beyond `depth` files is
+    refused with QueueFull rather than queued without limit, so a burst of
+    uploads cannot pile up behind the process pool. A request larger than
+    `depth` on its own is admitted only when nothing else is in flight.
+
+    Retry-After is the time the admitted files should take to drain at the
+    recent per-file parse time.
+    """
+
+    def __init__(self, depth: int, workers: int, seconds_per_file: float = 1.0):
+        self.depth = max(1, depth)
+        self.workers = max(1, workers)
+        self._seconds_per_file = seconds_per_file
+        self._active = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def admit(self, files: int) -> None:
+        """
+        Reserve room for `files` files or raise QueueFull.
+        """
+        with self._lock:
+            if self._active and self._active + files > self.depth:
+                self._rejected += 1
+                admission_rejections_total.inc()
+                raise QueueFull(self._retry_after())
+            self._active += files
+
+    def release(self, files: int, seconds: Optional[float] = None) -> None:
+        """
+        Return room for `files` files, given the worker time (seconds) they took.
+        """
+        with self._lock:
+            self._active = max(0, self._active - files)
+            if seconds is not None and files > 0:
+                per_file = seconds / files
+                self._seconds_per_file += _SMOOTHING * (per_file - self._seconds_per_file)
+
+    @contextmanager
+    def admitted(self, files: int) -> Iterator[None]:
+        self.admit(files)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            # Parses of a batch run side by side, so the batch time is spread
+            # over at most `workers` files at once
+            self.release(files, (time.monotonic() - start) * min(files, self.workers))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'active': self._active,
+                'rejected': self._rejected,
+                'seconds_per_file': round(self._seconds_per_file, 3),
+            }
+
+    def _retry_after(self) -> int:
+        drain = self._active * self._seconds_per_file / self.workers
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(drain)))
@@ -1,16 +1,177 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-import io
-import csv
-from parser import parse_pdf
-from models import ParsedRecord
+import hashlib
+import json
+import os
+import time
+import zipfile
+from parser import CACHE_VERSION, EXTRACTION_MODES
+from models import ParsedRecord, records_json
+from cache import ParseCache
+from executor import create_executor
+from jobs import JobManager
+from storage import create_store, InvalidCursor, RecordQuery, SearchUnavailable, SORTABLE_COLUMNS
+from export import ARROW_AVAILABLE, EXPORT_FORMATS
+from metrics import REGISTRY
+from source import FileTooLarge, spool
+from backends import PRELOAD_BACKENDS, warm_up
+from admission import AdmissionQueue, QueueFull
+from archive import ArchiveIngest, ArchiveTooLarge, open_archive
+from reextract import Reextractor
+from transactions import AGGREGATE_DIMENSIONS, TransactionStore
+
+# Upload limits: per file, and for a whole multipart request (rejected with 413
+# as soon as the declared or streamed size passes it)
+MAX_FILE_SIZE_MB = float(os.environ.get('MAX_FILE_SIZE_MB', '10'))
+MAX_REQUEST_SIZE_MB = float(os.environ.get('MAX_REQUEST_SIZE_MB', '100'))
+# ZIP uploads to /api/archives have their own, larger request limit
+MAX_ARCHIVE_SIZE_MB = float(os.environ.get('MAX_ARCHIVE_SIZE_MB', '2048'))
+
+
+class UploadRequest(Request):
+    """
+    Applies MAX_ARCHIVE_SIZE_MB instead of MAX_CONTENT_LENGTH to archive
+    uploads. Werkzeug enforces the limit while it reads the body, so an
+    oversized archive is refused without being spooled whole.
+    """
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'ingest_archive':
+            return int(MAX_ARCHIVE_SIZE_MB * 1024 * 1024)
+        return super().max_content_length
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_REQUEST_SIZE_MB * 1024 * 1024)
 CORS(app)
 
-# In-memory storage for parsed records
-records_store = []
+# Parsed records: in memory, or SQLite when USE_SQLITE=true
+record_store = create_store()
+
+# Transaction rows of the stored records, in columnar arrays (memory only)
+transaction_store = TransactionStore()
+
+# Cache of parse results keyed by file content, so re-uploads skip parsing
+parse_cache = ParseCache(
+    version=CACHE_VERSION,
+    max_entries=int(os.environ.get('PARSE_CACHE_SIZE', '256')),
+    cache_dir=os.environ.get('PARSE_CACHE_DIR', './data/parse_cache')
+)
+
+# Import the PDF backends now rather than on the first upload; under a
+# pre-forking server (gunicorn --preload) this runs once in the master
+if PRELOAD_BACKENDS:
+    warm_up()
+
+# Parses upload batches inline or across a process pool (PARSE_EXECUTOR)
+parse_executor = create_executor(cache=parse_cache)
+
+
+def _store_record(record: ParsedRecord) -> None:
+    record_store.add(record)
+    transaction_store.add(record.id, record.transactions)
+
+
+# Files admitted for parsing at once, running or waiting for a worker, across
+# uploads and jobs; requests beyond that get 429 with Retry-After
+PARSE_QUEUE_DEPTH = int(os.environ.get('PARSE_QUEUE_DEPTH', str(parse_executor.max_workers * 8)))
+admission = AdmissionQueue(PARSE_QUEUE_DEPTH, parse_executor.max_workers)
+
+# Background ingestion jobs; finished records land in record_store and transaction_store
+job_manager = JobManager(parse_executor, on_record=_store_record, admission=admission)
+
+# Refreshes records extracted with older field rules from their stored page text
+reextractor = Reextractor(record_store, on_records=transaction_store.replace_records)
+
+# Page size for /api/records when no limit is given, and the largest allowed
+DEFAULT_PAGE_SIZE = int(os.environ.get('RECORDS_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('RECORDS_MAX_PAGE_SIZE', '1000'))
+
+# Allow ?trace=1 outside debug mode
+PARSE_TRACE = os.environ.get('PARSE_TRACE', 'false').lower() == 'true'
+
+
+def _trace_requested() -> bool:
+    """
+    Whether parse traces should be attached to the records in this response.
+    """
+    return (app.debug or PARSE_TRACE) and request.args.get('trace') in ('1', 'true')
+
+
+def _invalid_mode() -> bool:
+    """
+    Whether ?mode= names an unknown extraction mode.
+    """
+    mode = request.args.get('mode')
+    return bool(mode) and mode not in EXTRACTION_MODES
+
+
+def _bad_mode():
+    return jsonify({
+        'success': False,
+        'error': f"mode must be one of: {', '.join(EXTRACTION_MODES)}"
+    }), 400
+
+
+def _spool_uploads(files) -> list:
+    """
+    Spool uploaded files to disk as (PdfSource, filename) pairs instead of
+    reading them into memory. Raises FileTooLarge for any file over
+    MAX_FILE_SIZE_MB, after removing the files already spooled.
+    """
+    uploads = []
+    try:
+        for file in files:
+            filename = secure_filename(file.filename)
+            try:
+                uploads.append((spool(file.stream, int(MAX_FILE_SIZE_MB * 1024 * 1024)), filename))
+            except FileTooLarge as e:
+                raise FileTooLarge(f'{filename}: {e}') from None
+    except BaseException:
+        _discard_uploads(uploads)
+        raise
+    return uploads
+
+
+def _discard_uploads(uploads: list) -> None:
+    for source, _ in uploads:
+        source.discard()
+
+
+def _records_response(records, **fields) -> Response:
+    """
+    A {'success': true, 'data': [...records], **fields} JSON response. The
+    records are encoded by records_json() rather than as one dict each.
+    """
+    head = json.dumps({'success': True, **fields}, separators=(',', ':'))
+    body = head[:-1].encode('utf-8') + b',"data":' + records_json(records) + b'}'
+    return Response(body, mimetype='application/json')
+
+
+def _busy(e: QueueFull):
+    response = jsonify({
+        'success': False,
+        'error': str(e)
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+
+def _too_large(e: Exception):
+    if isinstance(e, RequestEntityTooLarge):
+        limit_mb = request.max_content_length / (1024 * 1024)
+        message = f'Upload exceeds the {limit_mb:g} MB request limit'
+    else:
+        message = str(e)
+    return jsonify({
+        'success': False,
+        'error': message
+    }), 413
+
 
 # Hardcoded credentials
 VALID_EMAIL = "admin@example.com"
@@ -50,7 +211,13 @@ def upload():
     """
     Upload and parse PDF credit card statements.
     Accepts multiple files and returns parsed results immediately.
+    ?mode=fast|balanced|accurate picks the text extraction mode (default:
+    EXTRACTION_MODE). With ?trace=1 in debug mode each result carries its
+    per-stage timings.
     """
+    if _invalid_mode():
+        return _bad_mode()
+
     try:
         if 'files' not in request.files:
             return jsonify({
@@ -66,31 +233,213 @@ def upload():
                 'error': 'No files provided'
             }), 400
 
-        parsed_results = []
+        files = [f for f in files if f.filename != '']
 
-        for file in files:
-            if file.filename == '':
-                continue
+        # Refuse the batch up front when the parse queue is full
+        with admission.admitted(len(files)):
+            # Spool to disk; the parser reads each file from there
+            uploads = _spool_uploads(files)
 
-            filename = secure_filename(file.filename)
-            
-            # Read file bytes
-            file_bytes = file.read()
-            
-            # Parse the PDF
-            record = parse_pdf(file_bytes, filename)
-            
-            # Store in memory
-            records_store.append(record)
-            
-            # Add to results
-            parsed_results.append(record.to_dict())
+            # Parse the PDFs; results come back in upload order
+            try:
+                results = parse_executor.parse_many_traced(uploads, request.args.get('mode'))
+            finally:
+                _discard_uploads(uploads)
+        records = [record for record, _ in results]
+
+        # Store all records from the batch in one write
+        record_store.add_many(records)
+        transaction_store.add_records(records)
+
+        if not _trace_requested():
+            return _records_response(records), 200
+
+        parsed_results = [record.to_dict() for record in records]
+        for result, (_, trace) in zip(parsed_results, results):
+            result['trace'] = trace.to_dict() if trace is not None else None
 
         return jsonify({
             'success': True,
             'data': parsed_results
         }), 200
 
+    except QueueFull as e:
+        return _busy(e)
+    except (FileTooLarge, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue PDF statements for background parsing.
+    Returns a job id immediately; poll /api/jobs/<id> or stream /api/jobs/<id>/events.
+    Takes the same ?mode= as /api/upload.
+    """
+    if _invalid_mode():
+        return _bad_mode()
+
+    try:
+        files = [f for f in request.files.getlist('files') if f.filename != '']
+
+        if not files:
+            return jsonify({
+                'success': False,
+                'error': 'No files provided'
+            }), 400
+
+        # The job deletes each spooled file, and frees its admission slot,
+        # once it has been parsed
+        admission.admit(len(files))
+        uploads = []
+        try:
+            uploads = _spool_uploads(files)
+            job = job_manager.submit(uploads, trace=_trace_requested(), mode=request.args.get('mode'))
+        except Exception:
+            admission.release(len(files))
+            _discard_uploads(uploads)
+            raise
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 202
+
+    except QueueFull as e:
+        return _busy(e)
+    except (FileTooLarge, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status of a background parsing job, per file.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    }), 200
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-Sent Events stream of parsed records for a job.
+    Honours Last-Event-ID so reconnecting clients do not miss records.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+
+    last_event_id = request.headers.get('Last-Event-ID', '0')
+    start = int(last_event_id) if last_event_id.isdigit() else 0
+
+    return Response(
+        stream_with_context(job_manager.stream(job, start=start)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/archives', methods=['POST'])
+def ingest_archive():
+    """
+    Parse every PDF in an uploaded ZIP archive (multipart field `archive`),
+    streaming one NDJSON result line per entry as it completes and a final
+    `done` summary. Duplicate entries are skipped by content hash. Takes the
+    same ?mode= and ?trace=1 as /api/upload.
+    """
+    if _invalid_mode():
+        return _bad_mode()
+
+    try:
+        upload = request.files.get('archive')
+        if upload is None or upload.filename == '':
+            return jsonify({
+                'success': False,
+                'error': 'No archive provided'
+            }), 400
+
+        try:
+            archive = open_archive(upload.stream)
+        except zipfile.BadZipFile:
+            return jsonify({
+                'success': False,
+                'error': 'Archive is not a valid ZIP file'
+            }), 400
+
+        # The entries being spooled or parsed hold one admission slot each
+        window = parse_executor.max_workers
+        try:
+            admission.admit(window)
+        except QueueFull:
+            archive.close()
+            raise
+        started = time.monotonic()
+        mode = request.args.get('mode')
+
+        def parse_entry(source, filename):
+            record, trace = parse_executor.parse_many_traced([(source, filename)], mode)[0]
+            try:
+                _store_record(record)
+            except Exception as e:
+                record = ParsedRecord.create(filename=filename, status='FAILED', error=f'Storage error: {str(e)}')
+            return record, trace
+
+        ingest = ArchiveIngest(
+            archive,
+            parse_entry,
+            window=window,
+            max_entry_bytes=int(MAX_FILE_SIZE_MB * 1024 * 1024),
+            trace=_trace_requested()
+        )
+
+        def lines():
+            for result in ingest.results():
+                yield json.dumps(result, separators=(',', ':')) + '\n'
+
+        response = Response(
+            stream_with_context(lines()),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+        # Frees the admission slots when the response closes, which happens
+        # even when the client disconnects before the stream starts
+        def release():
+            # Entries parsed side by side: spread the elapsed time over them
+            parsed = ingest.counts['PARSED'] + ingest.counts['FAILED']
+            per_file = (time.monotonic() - started) * window / parsed if parsed else None
+            admission.release(window, per_file * window if per_file is not None else None)
+
+        response.call_on_close(release)
+        return response, 200
+
+    except QueueFull as e:
+        return _busy(e)
+    except (ArchiveTooLarge, RequestEntityTooLarge) as e:
+        return _too_large(e)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -101,13 +450,109 @@ def upload():
 @app.route('/api/records', methods=['GET'])
 def get_records():
     """
-    Get all parsed records from memory.
+    Get one page of parsed records.
+    Query params: issuer, status, q (matches filename, issuer, card last 4),
+    sort, order (asc|desc), limit and cursor (next_cursor from the previous page).
+    Sends an ETag; a matching If-None-Match returns 304 while the records are unchanged.
+    """
+    try:
+        sort = request.args.get('sort', 'uploaded_at')
+        order = request.args.get('order', 'desc')
+        if sort not in SORTABLE_COLUMNS or order not in ('asc', 'desc'):
+            return jsonify({
+                'success': False,
+                'error': f"sort must be one of {', '.join(SORTABLE_COLUMNS)} and order asc or desc"
+            }), 400
+
+        limit = request.args.get('limit', str(DEFAULT_PAGE_SIZE))
+        if not limit.isdigit() or int(limit) < 1:
+            return jsonify({
+                'success': False,
+                'error': 'limit must be a positive integer'
+            }), 400
+
+        query = RecordQuery(
+            issuer=request.args.get('issuer') or None,
+            status=request.args.get('status') or None,
+            q=request.args.get('q', '').strip() or None,
+            sort=sort,
+            order=order,
+            cursor=request.args.get('cursor') or None,
+            limit=min(int(limit), MAX_PAGE_SIZE)
+        )
+
+        # The store version changes on every write, so it plus the query identifies the page
+        params = hashlib.sha256(repr(tuple(query)).encode()).hexdigest()[:16]
+        etag = f'{record_store.version()}-{params}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        page = record_store.query(query)
+        response = _records_response(page.records, pagination={
+            'next_cursor': page.next_cursor,
+            'limit': query.limit,
+            'total': page.total
+        })
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response, 200
+
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/search', methods=['GET'])
+def search_records():
+    """
+    Full-text search over statement text, merchant names, filenames and issuers.
+    Query params: q (every word must match), limit and offset.
+    Returns matching record ids with their scores, best match first.
     """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({
+            'success': False,
+            'error': 'q is required'
+        }), 400
+
+    limit = request.args.get('limit', '20')
+    offset = request.args.get('offset', '0')
+    if not limit.isdigit() or int(limit) < 1 or not offset.isdigit():
+        return jsonify({
+            'success': False,
+            'error': 'limit must be a positive integer and offset a non-negative one'
+        }), 400
+    limit, offset = min(int(limit), MAX_PAGE_SIZE), int(offset)
+
     try:
+        page = record_store.search(q, limit=limit, offset=offset)
+        next_offset = offset + limit if offset + limit < page.total else None
         return jsonify({
             'success': True,
-            'data': [record.to_dict() for record in records_store]
+            'data': [hit._asdict() for hit in page.hits],
+            'pagination': {
+                'offset': offset,
+                'next_offset': next_offset,
+                'limit': limit,
+                'total': page.total
+            }
         }), 200
+
+    except SearchUnavailable as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 501
     except Exception as e:
         return jsonify({
             'success': False,
@@ -115,48 +560,116 @@ def get_records():
         }), 500
 
 
-@app.route('/api/export.csv', methods=['GET'])
-def export_csv():
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
     """
-    Export all records as CSV.
+    Dashboard aggregates: totals, per-issuer sums, variant and category counts
+    and the parsed/failed split. Sends an ETag like /api/records.
     """
     try:
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'ID', 'Filename', 'Issuer', 'Card Last 4', 
-            'Card Variant', 'Amount Payable', 'Transaction Count',
-            'Interest Charges', 'Top Spending Category',
-            'Uploaded At', 'Status', 'Error'
-        ])
-        
-        # Write data
-        for record in records_store:
-            writer.writerow([
-                record.id,
-                record.filename,
-                record.issuer,
-                record.card_last4 or '',
-                record.card_variant or '',
-                record.total_balance or '',
-                record.transaction_count or '',
-                record.interest_charges or '',
-                record.top_merchant_category or '',
-                record.uploaded_at,
-                record.status,
-                record.error or ''
-            ])
-        
-        # Prepare response
-        output.seek(0)
-        return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='credit_card_statements.csv'
+        etag = f'stats-{record_store.version()}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        response = jsonify({
+            'success': True,
+            'data': record_store.stats()
+        })
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response, 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/records/<record_id>/transactions', methods=['GET'])
+def get_record_transactions(record_id):
+    """
+    The transaction rows parsed from one record's statement.
+    """
+    try:
+        rows = transaction_store.rows(record_id)
+        if rows is None:
+            return jsonify({
+                'success': False,
+                'error': 'No transactions found for this record'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': rows
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/transactions/summary', methods=['GET'])
+def transaction_summary():
+    """
+    Spend, credits and transaction count across all stored rows, grouped by
+    ?by=category (default), month or merchant; ?limit= keeps the top groups.
+    """
+    by = request.args.get('by', 'category')
+    if by not in AGGREGATE_DIMENSIONS:
+        return jsonify({
+            'success': False,
+            'error': f"by must be one of: {', '.join(AGGREGATE_DIMENSIONS)}"
+        }), 400
+
+    try:
+        limit = request.args.get('limit', type=int)
+        return jsonify({
+            'success': True,
+            'data': {
+                'by': by,
+                'transactions': transaction_store.count(),
+                'groups': transaction_store.aggregate(by, limit=limit)
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/export.<fmt>', methods=['GET'])
+def export_records(fmt):
+    """
+    Stream all records as CSV, NDJSON, Parquet or Arrow IPC.
+    Rows are written to the response batch by batch, so memory stays flat.
+    """
+    export_format = EXPORT_FORMATS.get(fmt)
+    if export_format is None:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"
+        }), 404
+
+    if export_format.columnar and not ARROW_AVAILABLE:
+        return jsonify({
+            'success': False,
+            'error': 'Parquet and Arrow exports require pyarrow (pip install pyarrow)'
+        }), 501
+
+    try:
+        return Response(
+            stream_with_context(export_format.write(record_store.iter_records())),
+            mimetype=export_format.mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename=credit_card_statements.{export_format.extension}'
+            }
         )
 
     except Exception as e:
@@ -166,14 +679,52 @@ def export_csv():
         }), 500
 
 
+@app.route('/api/reextract', methods=['POST'])
+def start_reextract():
+    """
+    Re-run the field extractors over the stored page text of every record
+    extracted with older rules, in the background. Returns the job (the
+    running one, if a pass is already under way); poll /api/reextract/<id>.
+    """
+    try:
+        job = reextractor.start()
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/reextract/<job_id>', methods=['GET'])
+def get_reextract(job_id):
+    """
+    Progress of a re-extraction job.
+    """
+    job = reextractor.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    }), 200
+
+
 @app.route('/api/clear', methods=['DELETE'])
 def clear_records():
     """
-    Clear all parsed records from memory.
+    Clear all parsed records, with their stored text and search index.
     """
     try:
-        global records_store
-        records_store = []
+        record_store.clear()
+        transaction_store.clear()
         return jsonify({
             'success': True,
             'data': {'message': 'All records cleared successfully'}
@@ -185,10 +736,36 @@ def clear_records():
         }), 500
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Parse cache hit/miss/eviction counters.
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'data': parse_cache.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+    Parser stage/field timing histograms and fallback counters in the
+    Prometheus text format.
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
-    """Health check endpoint."""
-    return jsonify({'status': 'ok'}), 200
+    """Health check endpoint, with the parse queue's occupancy."""
+    return jsonify({'status': 'ok', 'queue': admission.stats()}), 200
 
 
 if __name__ == '__main__':
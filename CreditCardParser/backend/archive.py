@@ -0,0 +1,156 @@
+import os
+import posixpath
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+from werkzeug.utils import secure_filename
+from models import ParsedRecord
+from metrics import Trace
+from source import FileTooLarge, PdfSource, spool
+
+# Entries one archive may hold; larger archives are refused with 413
+MAX_ARCHIVE_ENTRIES = int(os.environ.get('MAX_ARCHIVE_ENTRIES', '2000'))
+
+# Entry results: the record's status, or one of these
+DUPLICATE = 'DUPLICATE'
+SKIPPED = 'SKIPPED'
+
+
+class ArchiveTooLarge(ValueError):
+    pass
+
+
+def open_archive(stream: BinaryIO) -> zipfile.ZipFile:
+    """
+    Open a ZIP archive from a seekable stream, reading only its central
+    directory. Raises zipfile.BadZipFile for anything that is not a ZIP and
+    ArchiveTooLarge for more than MAX_ARCHIVE_ENTRIES entries.
+    """
+    archive = zipfile.ZipFile(stream)
+    if len(archive.infolist()) > MAX_ARCHIVE_ENTRIES:
+        archive.close()
+        raise ArchiveTooLarge(f'Archive holds more than {MAX_ARCHIVE_ENTRIES} entries')
+    return archive
+
+
+def _ignored(info: zipfile.ZipInfo) -> bool:
+    # Directories, and the metadata macOS and others add to archives
+    name = info.filename
+    return info.is_dir() or name.startswith('__MACOSX/') or posixpath.basename(name).startswith('.')
+
+
+def _result(index: int, entry: str, status: str, **fields) -> dict:
+    return {'event': 'entry', 'index': index, 'entry': entry, 'status': status, **fields}
+
+
+class ArchiveIngest:
+    """
+    Streams the PDF entries of one ZIP archive through a parse function,
+    yielding one result per entry as it completes.
+
+    Entries are decompressed one at a time into spooled files, and at most
+    `window` of them are spooled or parsing at once, so neither the
+    archive's contents nor its results are ever held whole. Each entry is
+    hashed while it decompresses; an entry with the same content as an
+    earlier one is reported as a DUPLICATE of it and not parsed again.
+    Non-PDF entries are reported as SKIPPED. The last result is a `done`
+    summary.
+    """
+
+    def __init__(
+        self,
+        archive: zipfile.ZipFile,
+        parse: Callable[[PdfSource, str], Tuple[ParsedRecord, Optional[Trace]]],
+        window: int,
+        max_entry_bytes: Optional[int] = None,
+        trace: bool = False
+    ):
+        self.archive = archive
+        self.parse = parse
+        self.window = max(1, window)
+        self.max_entry_bytes = max_entry_bytes
+        self.trace = trace
+        self.counts = {'total': 0, 'PARSED': 0, 'FAILED': 0, DUPLICATE: 0, SKIPPED: 0}
+
+    def results(self) -> Iterator[dict]:
+        seen: Dict[str, int] = {}
+        running = {}
+        pool = ThreadPoolExecutor(max_workers=self.window, thread_name_prefix='archive')
+        try:
+            for index, info in enumerate(info for info in self.archive.infolist() if not _ignored(info)):
+                entry = info.filename
+                if not entry.lower().endswith('.pdf'):
+                    yield self._count(_result(index, entry, SKIPPED, error='Not a PDF'))
+                    continue
+
+                # Keep the window full but no fuller: wait for a parse before spooling more
+                while len(running) >= self.window:
+                    yield from self._finished(running)
+
+                try:
+                    source = self._spool(info)
+                except FileTooLarge as e:
+                    yield self._count(_result(index, entry, 'FAILED', error=f'{entry}: {e}'))
+                    continue
+                except (zipfile.BadZipFile, RuntimeError, NotImplementedError, zlib.error, EOFError, OSError) as e:
+                    # Corrupt, encrypted or unsupported entries fail on their own
+                    yield self._count(_result(index, entry, 'FAILED', error=f'Unreadable entry: {e}'))
+                    continue
+
+                digest = source.digest()
+                if digest in seen:
+                    source.discard()
+                    yield self._count(_result(index, entry, DUPLICATE, duplicate_of=seen[digest]))
+                    continue
+                seen[digest] = index
+
+                future = pool.submit(self._parse, source, _entry_filename(entry))
+                running[future] = (index, entry, source)
+
+            while running:
+                yield from self._finished(running)
+
+            yield {'event': 'done', **self.counts}
+        finally:
+            # The client went away or the archive broke: drop whatever has not started
+            for future, (_, _, source) in running.items():
+                if future.cancel():
+                    source.discard()
+            pool.shutdown(wait=False)
+            self.archive.close()
+
+    def _spool(self, info: zipfile.ZipInfo) -> PdfSource:
+        with self.archive.open(info) as stream:
+            return spool(stream, self.max_entry_bytes)
+
+    def _parse(self, source: PdfSource, filename: str) -> Tuple[ParsedRecord, Optional[Trace]]:
+        try:
+            return self.parse(source, filename)
+        finally:
+            source.discard()
+
+    def _finished(self, running: dict) -> Iterator[dict]:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda future: running[future][0]):
+            index, entry, _ = running.pop(future)
+            try:
+                record, trace = future.result()
+            except Exception as e:
+                yield self._count(_result(index, entry, 'FAILED', error=f'Parsing error: {str(e)}'))
+                continue
+            result = _result(index, entry, record.status, record=record.to_dict())
+            if self.trace:
+                result['trace'] = trace.to_dict() if trace is not None else None
+            yield self._count(result)
+
+    def _count(self, result: dict) -> dict:
+        self.counts['total'] += 1
+        self.counts[result['status']] += 1
+        return result
+
+
+def _entry_filename(entry: str) -> str:
+    # Folders become part of the name, so same-named PDFs in different folders stay apart
+    return secure_filename(entry) or 'statement.pdf'
+
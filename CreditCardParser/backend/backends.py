@@ -0,0 +1,194 @@
+"""
+PDF, export and regex backends, imported on first use.
+
+pdfplumber, PDFium, PyPDF2, the OCR stack and pyarrow together take longer to import
+than the rest of the app, and many processes never touch some of them (a
+CLI run without scans never needs OCR). Each backend is registered here with
+the modules that make it available, a loader and an optional warm-up step.
+Availability is checked without importing anything.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Import and warm every installed backend at startup instead of on first use,
+# e.g. once in the master of a pre-forking server so workers inherit them
+PRELOAD_BACKENDS = os.environ.get('PRELOAD_BACKENDS', 'false').lower() == 'true'
+
+# Executor.shutdown(cancel_futures=...) is new in Python 3.9
+_CANCEL_FUTURES = sys.version_info >= (3, 9)
+
+
+class Backend:
+    def __init__(
+        self,
+        name: str,
+        modules: Tuple[str, ...],
+        loader: Callable[[], Any],
+        warm: Optional[Callable[[Any], None]] = None
+    ):
+        self.name = name
+        self.modules = modules
+        self.loader = loader
+        self.warm = warm
+        self._available: Optional[bool] = None
+        self._loaded = None
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether every module is installed, found without importing any of them.
+        """
+        if self._available is None:
+            self._available = all(
+                importlib.util.find_spec(module.split('.')[0]) is not None for module in self.modules
+            )
+        return self._available
+
+    def load(self):
+        if self._loaded is None:
+            with _lock:
+                if self._loaded is None:
+                    self._loaded = self.loader()
+        return self._loaded
+
+
+_lock = threading.RLock()
+
+BACKENDS: Dict[str, Backend] = {}
+
+
+def register(
+    name: str,
+    modules: Tuple[str, ...],
+    loader: Callable[[], Any],
+    warm: Optional[Callable[[Any], None]] = None
+) -> Backend:
+    backend = BACKENDS[name] = Backend(name, modules, loader, warm)
+    return backend
+
+
+def available(name: str) -> bool:
+    return BACKENDS[name].available
+
+
+def load(name: str):
+    """
+    The backend's loaded object, importing it on the first call.
+    Raises ImportError when it is not installed.
+    """
+    return BACKENDS[name].load()
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Import and warm the given (default: all installed) backends, returning
+    the seconds each took. A backend that fails to load is skipped and is
+    retried on first use as usual.
+    """
+    timings = {}
+    for name in (names if names is not None else BACKENDS):
+        backend = BACKENDS[name]
+        if not backend.available:
+            continue
+        start = time.perf_counter()
+        try:
+            loaded = backend.load()
+            if backend.warm is not None:
+                backend.warm(loaded)
+        except Exception:
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def shutdown_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Shut down the backend worker pool without waiting, cancelling the calls
+    not yet handed to a worker. Python 3.8 lacks cancel_futures, so there the
+    queued futures are cancelled by hand.
+    """
+    if _CANCEL_FUTURES:
+        pool.shutdown(wait=False, cancel_futures=True)
+        return
+    # Futures already running refuse cancel(); the rest never start
+    for work_item in list(getattr(pool, '_pending_work_items', {}).values()):
+        work_item.future.cancel()
+    pool.shutdown(wait=False)
+
+
+def _sample_pdf() -> bytes:
+    """
+    A one-page PDF with a line of text, used to run the backends once.
+    """
+    content = b'BT /F1 12 Tf 10 30 Td (Warm up 01/01/2024 1,000.00) Tj ET'
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 72] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+
+def _warm_pdfplumber(pdfplumber) -> None:
+    with pdfplumber.open(BytesIO(_sample_pdf())) as pdf:
+        pdf.pages[0].extract_text()
+        pdf.pages[0].images
+
+
+def _warm_pdfium(pdfium) -> None:
+    pdf = pdfium.PdfDocument(_sample_pdf())
+    try:
+        page = pdf[0]
+        textpage = page.get_textpage()
+        textpage.get_text_range()
+        textpage.close()
+        page.close()
+    finally:
+        pdf.close()
+
+
+def _warm_pypdf2(PyPDF2) -> None:
+    PyPDF2.PdfReader(BytesIO(_sample_pdf())).pages[0].extract_text()
+
+
+def _load_ocr():
+    pytesseract = importlib.import_module('pytesseract')
+    pdf2image = importlib.import_module('pdf2image')
+    return pytesseract, pdf2image.convert_from_path
+
+
+def _load_arrow():
+    pyarrow = importlib.import_module('pyarrow')
+    importlib.import_module('pyarrow.ipc')
+    importlib.import_module('pyarrow.parquet')
+    return pyarrow
+
+
+register('pdfplumber', ('pdfplumber',), lambda: importlib.import_module('pdfplumber'), _warm_pdfplumber)
+register('pdfium', ('pypdfium2',), lambda: importlib.import_module('pypdfium2'), _warm_pdfium)
+register('pypdf2', ('PyPDF2',), lambda: importlib.import_module('PyPDF2'), _warm_pypdf2)
+register('ocr', ('pytesseract', 'pdf2image'), _load_ocr)
+register('arrow', ('pyarrow',), _load_arrow)
+register('re2', ('re2',), lambda: importlib.import_module('re2'))
+
+# What parse_pdf may use; warmed in parse pool workers
+PARSER_BACKENDS = ('pdfium', 'pdfplumber', 'pypdf2', 'ocr')
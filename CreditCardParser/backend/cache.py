@@ -0,0 +1,161 @@
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+from models import ParsedRecord
+from source import PdfSource, as_source
+from transactions import Transaction
+
+# Fields that describe the upload rather than the PDF contents; these are
+# regenerated on every cache hit.
+_VOLATILE_FIELDS = ('id', 'filename', 'uploaded_at')
+
+
+class TieredCache:
+    """
+    Bounded in-memory LRU in front of an optional on-disk tier (one JSON file
+    per entry) that survives restarts. Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.max_entries = max(0, max_entries)
+        self.cache_dir = cache_dir or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'stores': 0,
+        }
+
+    def get(self, key: str):
+        """
+        Return the cached value, or None on a miss.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+        with self._lock:
+            self._counters['stores'] += 1
+
+    def stats(self) -> dict:
+        """
+        Hit/miss/eviction counters and current sizes.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['max_entries'] = self.max_entries
+        stats['hit_ratio'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        stats['disk_enabled'] = self.cache_dir is not None
+        return stats
+
+    def _put_memory(self, key: str, value) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def _disk_path(self, key: str) -> str:
+        digest = key.rsplit('-', 1)[-1]
+        return os.path.join(self.cache_dir, digest[:2], f'{key}.json')
+
+    def _read_disk(self, key: str):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, value) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best-effort; the memory tier still holds the entry
+            pass
+
+
+class ParseCache(TieredCache):
+    """
+    Content-addressed cache of parse results.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the parser version
+    and extraction mode, so bumping the version (PARSER_VERSION or
+    RULES_VERSION) invalidates everything.
+    """
+
+    def __init__(self, version: str, max_entries: int = 256, cache_dir: Optional[str] = None):
+        super().__init__(max_entries=max_entries, cache_dir=cache_dir)
+        self.version = version
+
+    def key(self, file_bytes: Union[bytes, PdfSource], mode: str) -> str:
+        """
+        Build the cache key for a PDF parsed in the given extraction mode.
+        """
+        return f'{self.version}-{mode}-{as_source(file_bytes).digest()}'
+
+    def get_record(self, key: str, filename: str) -> Optional[ParsedRecord]:
+        """
+        Return a fresh ParsedRecord built from the cached fields, or None on a miss.
+        """
+        fields = self.get(key)
+        if fields is None:
+            return None
+        fields = dict(fields)
+        rows = fields.pop('transactions', ())
+        pages = fields.pop('pages', ())
+        merchants = fields.pop('merchants', ())
+        record = ParsedRecord.create(filename=filename, **fields)
+        record.transactions = [Transaction(*row) for row in rows]
+        record.pages = tuple(pages)
+        record.merchants = list(merchants)
+        return record
+
+    def put_record(self, key: str, record: ParsedRecord) -> None:
+        """
+        Cache the content-derived fields of a record. Failed parses are not cached,
+        since they may be caused by a missing OCR install or a transient error,
+        nor are partial ones, which depend on how busy the machine was.
+        """
+        if record.status != 'PARSED' or record.partial_fields:
+            return
+        fields = {k: v for k, v in record.to_dict().items() if k not in _VOLATILE_FIELDS}
+        fields['transactions'] = [list(row) for row in record.transactions]
+        fields['pages'] = list(record.pages)
+        fields['merchants'] = list(record.merchants)
+        self.put(key, fields)
@@ -0,0 +1,291 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple, Union
+from backends import PARSER_BACKENDS, PRELOAD_BACKENDS, shutdown_pool, warm_up
+from parser import EXTRACTION_MODE, parse_pdf_traced
+from models import ParsedRecord
+from cache import ParseCache
+from metrics import Trace, cache_total, observe_trace, worker_failures_total
+from source import PdfSource
+
+EXECUTOR_MODES = ('inline', 'process')
+
+# How often a caller waiting for a free pool worker re-checks for one
+_SLOT_POLL = 0.5
+
+
+def _parse_worker(file_bytes: Union[bytes, PdfSource], filename: str, mode: str) -> Tuple[ParsedRecord, Trace]:
+    """
+    Entry point run inside pool processes. The trace is returned alongside the
+    record since metrics recorded in a worker would never reach the server.
+    """
+    return parse_pdf_traced(file_bytes, filename, mode)
+
+
+def _failed(filename: str, error: str) -> ParsedRecord:
+    return ParsedRecord.create(filename=filename, status='FAILED', error=error)
+
+
+class ParseExecutor:
+    """
+    Runs parse_pdf over a batch of files, either inline on the calling thread or
+    across a bounded process pool.
+
+    In process mode every file gets its own timeout, measured from the moment it
+    is handed to a worker: the pool is shared by every caller (uploads, jobs,
+    archives), and a file is only submitted once one of its workers is free,
+    so time spent waiting behind other callers' files does not count. A file
+    that times out becomes a FAILED record and is abandoned in its worker;
+    the pool is restarted only once every file left in it is abandoned, so
+    one caller's timeout never cuts short another caller's parse. A file that
+    crashes its worker breaks the pool for everyone; the files that were in
+    flight are resubmitted. Results are always returned in input order.
+    """
+
+    def __init__(
+        self,
+        mode: str = 'process',
+        max_workers: Optional[int] = None,
+        timeout: float = 120.0,
+        cache: Optional[ParseCache] = None
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f'Unknown executor mode: {mode}')
+        self.mode = mode
+        self.max_workers = max(1, max_workers or min(4, os.cpu_count() or 1))
+        self.timeout = timeout
+        self.cache = cache
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # One slot per pool worker, held from submit until the file finishes
+        self._slots = threading.Semaphore(self.max_workers)
+        self._slot_lock = threading.RLock()
+        self._holding = set()
+        # Timed-out files still occupying a worker
+        self._abandoned = set()
+
+    def parse_many(
+        self,
+        items: List[Tuple[Union[bytes, PdfSource], str]],
+        extraction_mode: Optional[str] = None
+    ) -> List[ParsedRecord]:
+        """
+        Parse (file_bytes, filename) pairs and return records in the same order.
+        A file-backed PdfSource is passed to pool workers as a path, not its bytes.
+        extraction_mode defaults to EXTRACTION_MODE.
+        """
+        return [record for record, _ in self.parse_many_traced(items, extraction_mode)]
+
+    def parse_many_traced(
+        self,
+        items: List[Tuple[Union[bytes, PdfSource], str]],
+        extraction_mode: Optional[str] = None
+    ) -> List[Tuple[ParsedRecord, Optional[Trace]]]:
+        """
+        Like parse_many, pairing each record with its parse trace (None for
+        cache hits and for files whose worker crashed or timed out).
+        """
+        mode = extraction_mode or EXTRACTION_MODE
+        results = [None] * len(items)
+        traces = [None] * len(items)
+        keys = [None] * len(items)
+        pending = []
+
+        for index, (file_bytes, filename) in enumerate(items):
+            if self.cache is not None:
+                keys[index] = self.cache.key(file_bytes, mode)
+                results[index] = self.cache.get_record(keys[index], filename)
+                cache_total.inc(result='miss' if results[index] is None else 'hit')
+            if results[index] is None:
+                pending.append(index)
+
+        if self.mode == 'inline':
+            for index in pending:
+                results[index], traces[index] = parse_pdf_traced(*items[index], mode)
+        else:
+            self._run_pool(items, pending, results, traces, mode)
+
+        for index in pending:
+            observe_trace(traces[index], results[index].status)
+            if self.cache is not None:
+                self.cache.put_record(keys[index], results[index])
+
+        return list(zip(results, traces))
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            shutdown_pool(pool)
+
+    def _run_pool(self, items, pending, results, traces, mode) -> None:
+        queue = deque(pending)
+        # Files that were in flight when the pool broke are retried one at a
+        # time, so a file that crashes its worker cannot take others down again
+        suspects = set()
+        running = {}
+
+        while queue or running:
+            self._reset_if_stuck()
+
+            while queue and len(running) < self.max_workers:
+                isolated = queue[0] in suspects or any(
+                    index in suspects for index, _ in running.values()
+                )
+                if isolated and running:
+                    break
+                # Block for a free worker only when none of our files is running
+                if not self._slots.acquire(timeout=_SLOT_POLL if not running else 0):
+                    break
+                index = queue.popleft()
+                try:
+                    future = self._submit(items[index], mode)
+                except (BrokenProcessPool, RuntimeError):
+                    # The pool broke or was restarted between taking the slot and submitting
+                    self._slots.release()
+                    queue.appendleft(index)
+                    self._reset_broken_pool()
+                    continue
+                running[future] = (index, time.monotonic() + self.timeout)
+
+            if not running:
+                continue
+
+            next_deadline = min(deadline for _, deadline in running.values())
+            timeout = max(0.0, next_deadline - time.monotonic())
+            if queue:
+                # Files still waiting for a slot another caller may free
+                timeout = min(timeout, _SLOT_POLL)
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            broken = []
+            for future in done:
+                index, _ = running.pop(future)
+                filename = items[index][1]
+                try:
+                    results[index], traces[index] = future.result()
+                except BrokenProcessPool:
+                    broken.append(index)
+                except Exception as e:
+                    results[index] = _failed(filename, f'Parsing error: {str(e)}')
+
+            for index in broken:
+                if index in suspects or len(broken) == 1 and not running:
+                    results[index] = _failed(items[index][1], 'Parser worker crashed')
+                    worker_failures_total.inc(reason='crash')
+                else:
+                    suspects.add(index)
+                    queue.appendleft(index)
+
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in running.items() if deadline <= now]
+            for future in expired:
+                index, _ = running.pop(future)
+                results[index] = _failed(
+                    items[index][1],
+                    f'Parsing timed out after {self.timeout:g}s'
+                )
+                worker_failures_total.inc(reason='timeout')
+                self._abandon(future)
+
+            if broken:
+                # A dead worker breaks the whole pool: restart it and resubmit
+                # whatever else of ours was in flight
+                for index, _ in sorted(running.values(), reverse=True):
+                    queue.appendleft(index)
+                running.clear()
+                self._reset_broken_pool()
+
+    def _submit(self, item, mode):
+        """
+        Submit a file to the pool; the caller already holds a slot for it,
+        which is given back when the file finishes.
+        """
+        with self._slot_lock:
+            future = self._get_pool().submit(_parse_worker, *item, mode)
+            self._holding.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future) -> None:
+        with self._slot_lock:
+            if future not in self._holding:
+                return
+            self._holding.discard(future)
+            self._abandoned.discard(future)
+        self._slots.release()
+
+    def _abandon(self, future) -> None:
+        with self._slot_lock:
+            if future in self._holding:
+                self._abandoned.add(future)
+
+    def _reset_if_stuck(self) -> None:
+        """
+        Restart the pool once every file in it has timed out. A hung worker
+        cannot be reclaimed on its own, and restarting sooner would kill the
+        files other callers still have running.
+        """
+        with self._slot_lock:
+            if not self._abandoned or self._abandoned != self._holding:
+                return
+            stuck = len(self._abandoned)
+            self._holding.clear()
+            self._abandoned.clear()
+            with self._pool_lock:
+                pool = self._pool
+            if pool is not None:
+                self._reset_pool(pool)
+        for _ in range(stuck):
+            self._slots.release()
+
+    def _reset_broken_pool(self) -> None:
+        # Another caller may already have replaced the broken pool with a working one
+        with self._pool_lock:
+            pool = self._pool
+        if pool is not None and getattr(pool, '_broken', False):
+            self._reset_pool(pool)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Forked workers inherit backends the parent preloaded; spawned
+                # ones import them here rather than during their first parse
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=warm_up if PRELOAD_BACKENDS else None,
+                    initargs=(PARSER_BACKENDS,)
+                )
+            return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        terminate = getattr(pool, 'terminate_workers', None)
+        if terminate is not None:
+            terminate()
+        else:
+            for process in list((getattr(pool, '_processes', None) or {}).values()):
+                process.terminate()
+        shutdown_pool(pool)
+
+
+def create_executor(cache: Optional[ParseCache] = None) -> ParseExecutor:
+    """
+    Build a ParseExecutor from PARSE_EXECUTOR, PARSE_WORKERS and PARSE_TIMEOUT.
+    """
+    workers = os.environ.get('PARSE_WORKERS')
+    executor = ParseExecutor(
+        mode=os.environ.get('PARSE_EXECUTOR', 'process'),
+        max_workers=int(workers) if workers else None,
+        timeout=float(os.environ.get('PARSE_TIMEOUT', '120')),
+        cache=cache
+    )
+    atexit.register(executor.shutdown)
+    return executor
@@ -0,0 +1,169 @@
+import csv
+import io
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple
+from backends import available, load
+from models import ParsedRecord
+from storage import RECORD_COLUMNS
+
+# Columnar exports (optional); pyarrow is imported on the first such export
+ARROW_AVAILABLE = available('arrow')
+
+# Records serialized per chunk written to the response
+EXPORT_BATCH_SIZE = 500
+
+CSV_HEADER = [
+    'ID', 'Filename', 'Issuer', 'Card Last 4',
+    'Card Variant', 'Amount Payable', 'Transaction Count',
+    'Interest Charges', 'Top Spending Category',
+    'Uploaded At', 'Status', 'Error', 'Text Backend', 'Partial Fields'
+]
+
+
+class ExportFormat(NamedTuple):
+    mimetype: str
+    extension: str
+    write: Callable[[Iterable[ParsedRecord]], Iterator[bytes]]
+    columnar: bool = False
+
+
+def _batches(records: Iterable[ParsedRecord]) -> Iterator[list]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def stream_csv(records: Iterable[ParsedRecord]) -> Iterator[bytes]:
+    """
+    CSV rows, one chunk per batch of records.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for batch in _batches(records):
+        for record in batch:
+            writer.writerow([
+                record.id,
+                record.filename,
+                record.issuer,
+                record.card_last4 or '',
+                record.card_variant or '',
+                record.total_balance or '',
+                record.transaction_count or '',
+                record.interest_charges or '',
+                record.top_merchant_category or '',
+                record.uploaded_at,
+                record.status,
+                record.error or '',
+                record.text_backend or '',
+                record.partial_fields or ''
+            ])
+        yield _drain(buffer).encode('utf-8')
+    # Header only when there are no records
+    remaining = _drain(buffer)
+    if remaining:
+        yield remaining.encode('utf-8')
+
+
+def stream_ndjson(records: Iterable[ParsedRecord]) -> Iterator[bytes]:
+    """
+    One JSON object per line.
+    """
+    for batch in _batches(records):
+        yield ''.join(record.to_json() + '\n' for record in batch).encode('utf-8')
+
+
+def stream_parquet(records: Iterable[ParsedRecord]) -> Iterator[bytes]:
+    """
+    Zstandard-compressed Parquet, one row group per batch of records.
+    """
+    pa = load('arrow')
+    sink = _ChunkSink()
+    writer = pa.parquet.ParquetWriter(pa.PythonFile(sink, mode='w'), _arrow_schema(), compression='zstd')
+    for batch in _batches(records):
+        writer.write_batch(_arrow_batch(batch))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+def stream_arrow(records: Iterable[ParsedRecord]) -> Iterator[bytes]:
+    """
+    Zstandard-compressed Arrow IPC stream, one record batch per batch of records.
+    """
+    pa = load('arrow')
+    sink = _ChunkSink()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), _arrow_schema(), options=options)
+    for batch in _batches(records):
+        writer.write_batch(_arrow_batch(batch))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    'csv': ExportFormat('text/csv', 'csv', stream_csv),
+    'ndjson': ExportFormat('application/x-ndjson', 'ndjson', stream_ndjson),
+    'parquet': ExportFormat('application/vnd.apache.parquet', 'parquet', stream_parquet, columnar=True),
+    'arrow': ExportFormat('application/vnd.apache.arrow.stream', 'arrows', stream_arrow, columnar=True),
+}
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return text
+
+
+def _arrow_schema():
+    pa = load('arrow')
+    types = {
+        'total_balance': pa.float64(),
+        'transaction_count': pa.int64(),
+        'interest_charges': pa.float64(),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in RECORD_COLUMNS])
+
+
+def _arrow_batch(batch: list):
+    pa = load('arrow')
+    return pa.RecordBatch.from_pydict(
+        {column: [getattr(record, column) for record in batch] for column in RECORD_COLUMNS},
+        schema=_arrow_schema()
+    )
+
+
+class _ChunkSink:
+    """
+    Write-only file object that hands written bytes back to the caller in
+    chunks, so columnar writers can stream without a full in-memory copy.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
@@ -0,0 +1,572 @@
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import backends
+from metrics import count_budget_exceeded, time_field
+
+# Bump whenever a field rule, issuer profile or transaction row pattern
+# changes; stored records are then re-extracted from their page text
+FIELD_RULES_VERSION = '2'
+
+# Regex engine for the field rules: 're' or 're2'. re2 (google-re2) matches in
+# time linear in the text; rules it cannot compile (lookarounds) stay on re.
+# Under re2, \d, \s and \b are ASCII-only: a non-breaking space is not \s.
+FIELD_REGEX_ENGINE = os.environ.get('FIELD_REGEX_ENGINE', 're')
+RE2_ENABLED = FIELD_REGEX_ENGINE == 're2' and backends.available('re2')
+
+# Time budgets for extracting one field and one whole document, in
+# milliseconds (0 disables, the default). A field that runs out keeps what it
+# found so far, so results then depend on machine load.
+FIELD_TIME_BUDGET_MS = float(os.environ.get('FIELD_TIME_BUDGET_MS', '0'))
+DOCUMENT_TIME_BUDGET_MS = float(os.environ.get('DOCUMENT_TIME_BUDGET_MS', '0'))
+
+# Match positions tried between deadline checks
+_BUDGET_CHECK_EVERY = 64
+
+_LOOKAROUND_RE = re.compile(r'\(\?<?[=!]')
+
+
+def _fold(text: str) -> str:
+    """
+    Lower-case text the way re.IGNORECASE compares it to ASCII letters, without
+    changing any offsets, so anchor positions found in the folded text line up
+    with the original. Besides A-Z, IGNORECASE equates KELVIN SIGN (lowered by
+    str.lower), dotted/dotless I and long S with ASCII letters.
+    """
+    if text.isascii():
+        return text.lower()
+    # U+0130 is the only character str.lower() expands, so map it first
+    folded = text.replace('\u0130', 'i').lower()
+    return folded.replace('\u0131', 'i').replace('\u017f', 's')
+
+
+_AMOUNT_CLEAN_RE = re.compile(r'[,₹\s]')
+_CURRENCY_RE = re.compile(r'Rs\.?|INR', re.IGNORECASE)
+
+
+def normalize_amount(amount_str: str) -> Optional[float]:
+    """
+    Normalize amount string to float (remove commas, currency symbols).
+    """
+    try:
+        # Remove commas, currency symbols, whitespace
+        cleaned = _AMOUNT_CLEAN_RE.sub('', amount_str)
+        cleaned = _CURRENCY_RE.sub('', cleaned)
+        amount = float(cleaned.strip())
+        return round(amount, 2)
+    except (ValueError, AttributeError):
+        return None
+
+
+class Rule(NamedTuple):
+    """
+    A compiled field rule.
+
+    `anchors` are lower-case literals one of which every match must start with;
+    `tail` literals are ones every match must end with, at most `reach`
+    characters (plus a whitespace run) after the match start. Rules with
+    neither are scanned the ordinary way.
+    """
+    pattern: re.Pattern
+    anchors: Optional[Tuple[str, ...]] = None
+    tail: Optional[Tuple[str, ...]] = None
+    reach: int = 0
+    first_only: bool = False
+
+
+class Candidate(NamedTuple):
+    value: object
+    rule: int
+    start: int
+    votes: int = 1
+
+
+class FieldSpec(NamedTuple):
+    name: str
+    rules: Tuple[Rule, ...]
+    # 'first': first valid match in rule order wins
+    # 'vote': most frequent valid value across all rules wins
+    # 'collect': every valid match, in rule order
+    policy: str
+    convert: Callable[[re.Match], object]
+    fallback: Optional[Callable[[str], object]] = None
+
+
+def _compile(pattern: str):
+    if RE2_ENABLED and not _LOOKAROUND_RE.search(pattern):
+        re2 = backends.load('re2')
+        options = re2.Options()
+        options.case_sensitive = False
+        return re2.compile(pattern, options)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _rule(pattern: str, anchors=None, tail=None, reach=0, first_only=False) -> Rule:
+    return Rule(_compile(pattern), anchors, tail, reach, first_only)
+
+
+class Budget:
+    """
+    Deadlines for extracting one document: a per-document one set when the
+    budget is created and a per-field one restarted by start(). Anchored
+    rules check it between match attempts; unanchored ones run as a single
+    finditer scan and check it only before the scan and between matches.
+    A single runaway match or scan is not cut short (the parse pool's
+    PARSE_TIMEOUT still is); `exceeded` lists the fields that ran out.
+    """
+
+    def __init__(
+        self,
+        field_ms: float = FIELD_TIME_BUDGET_MS,
+        document_ms: float = DOCUMENT_TIME_BUDGET_MS
+    ):
+        now = time.perf_counter()
+        self.field_seconds = field_ms / 1000 if field_ms > 0 else math.inf
+        self.document_deadline = now + document_ms / 1000 if document_ms > 0 else math.inf
+        self.deadline = self.document_deadline
+        self.exceeded: List[str] = []
+
+    def start(self) -> None:
+        self.deadline = min(self.document_deadline, time.perf_counter() + self.field_seconds)
+
+    def expired(self) -> bool:
+        return time.perf_counter() > self.deadline
+
+
+class TextScan:
+    """
+    Per-document scan state shared by every field: the folded text and the
+    positions of each anchor literal, found once with str.find.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = _fold(text)
+        self._positions = {}
+        self._regions = {}
+
+    def region(self, window: Optional[int]) -> 'TextScan':
+        """
+        A scan of the first `window` characters only (all of them for None).
+        """
+        if window is None or window >= len(self.text):
+            return self
+        region = self._regions.get(window)
+        if region is None:
+            region = self._regions[window] = TextScan(self.text[:window])
+        return region
+
+    def positions(self, literal: str) -> List[int]:
+        found = self._positions.get(literal)
+        if found is None:
+            found = []
+            index = self.folded.find(literal)
+            while index != -1:
+                found.append(index)
+                index = self.folded.find(literal, index + 1)
+            self._positions[literal] = found
+        return found
+
+    def anchored(self, literals: Tuple[str, ...]) -> List[int]:
+        if len(literals) == 1:
+            return self.positions(literals[0])
+        merged = set()
+        for literal in literals:
+            merged.update(self.positions(literal))
+        return sorted(merged)
+
+    def tail_starts(self, literals: Tuple[str, ...], reach: int) -> Iterator[int]:
+        """
+        Every position a match ending in one of `literals` could start at.
+        """
+        text = self.text
+        cursor = 0
+        for end in self.anchored(literals):
+            ws_start = end
+            while ws_start > 0 and text[ws_start - 1].isspace():
+                ws_start -= 1
+            if ws_start == end:
+                continue
+            for position in range(max(cursor, ws_start - reach), end):
+                yield position
+            cursor = max(cursor, end)
+
+    def finditer(self, rule: Rule, budget: Optional[Budget] = None) -> Iterator[re.Match]:
+        """
+        Equivalent to rule.pattern.finditer(text), but only tries positions a
+        match can start at. Stops early once the budget has run out.
+        """
+        if rule.anchors is not None:
+            starts = self.anchored(rule.anchors)
+        elif rule.tail is not None:
+            starts = self.tail_starts(rule.tail, rule.reach)
+        else:
+            # One C-level scan; it cannot be interrupted, only not started
+            if budget is not None and budget.expired():
+                return
+            for m in rule.pattern.finditer(self.text):
+                yield m
+                if budget is not None and budget.expired():
+                    return
+            return
+
+        match = rule.pattern.match
+        text = self.text
+        last_end = 0
+        for tried, position in enumerate(starts):
+            if position < last_end:
+                continue
+            if budget is not None and tried % _BUDGET_CHECK_EVERY == 0 and budget.expired():
+                return
+            m = match(text, position)
+            if m:
+                yield m
+                last_end = m.end()
+
+
+# Building blocks shared by the amount rules
+_CURRENCY = r'(?:Rs\.?|INR|₹)'
+_CURRENCY_ANCHORS = ('rs', 'inr', '₹')
+
+
+def _as_last4(m: re.Match) -> Optional[str]:
+    last4 = m.group(1)
+    if last4.isdigit() and len(last4) == 4:
+        return last4
+    return None
+
+
+def _as_variant(m: re.Match) -> Optional[str]:
+    variant = m.group(1).strip()
+    if len(variant) > 2 and len(variant) < 50:
+        return variant.title()
+    return None
+
+
+def _as_balance(m: re.Match) -> Optional[float]:
+    amount = normalize_amount(m.group(1))
+    if amount is not None and amount > 0 and amount < 10000000:  # Reasonable range
+        return amount
+    return None
+
+
+def _as_count(m: re.Match) -> Optional[int]:
+    try:
+        count = int(m.group(1))
+    except ValueError:
+        return None
+    if 0 < count < 10000:  # Sanity check
+        return count
+    return None
+
+
+def _as_charge(m: re.Match) -> Optional[float]:
+    amount = normalize_amount(m.group(1))
+    if amount is not None and amount > 0:
+        return amount
+    return None
+
+
+def _as_merchant(m: re.Match) -> Optional[str]:
+    merchant = m.group(1).strip()
+    if len(merchant) > 3 and len(merchant) < 50:
+        return merchant.title()
+    return None
+
+
+_DATE_TOKEN_RE = re.compile(r'\b\d{2}[/-](?:\d{2}|[A-Za-z]{3})\b')
+
+
+def _count_date_tokens(text: str) -> Optional[int]:
+    # Look for patterns like DD/MM or DD-MMM that appear multiple times
+    date_tokens = _DATE_TOKEN_RE.findall(text)
+    if len(date_tokens) > 5:  # If we find many dates, estimate transaction count
+        return len(date_tokens) // 2  # Rough estimate (each transaction might have 2 dates)
+    return None
+
+
+FIELD_SPECS: Dict[str, FieldSpec] = {
+    'card_last4': FieldSpec('card_last4', (
+        _rule(r'Card\s*(?:No\.?|Number|#)?\s*(?:ending\s*(?:in|with))?\s*[:#-]?\s*[xX*]{4,16}[\s-]?(\d{4})',
+              anchors=('card',)),
+        _rule(r'(?:Card|Account)\s*(?:No\.?|Number)?\s*[:#-]?\s*(?:[xX*\d]{4}[\s-]?){3}(\d{4})',
+              anchors=('card', 'account')),
+        _rule(r'(?:ending|ends)\s*(?:in|with)\s*(\d{4})', anchors=('end',)),
+        _rule(r'[xX*]{4,16}[\s-]?(\d{4})(?!\d)', anchors=('x', '*')),
+        _rule(r'(?:xxxx|XXXX)[\s-]?(\d{4})', anchors=('xxxx',)),
+        _rule(r'\d{4}[\s-]\d{4}[\s-]\d{4}[\s-](\d{4})'),
+    ), 'first', _as_last4),
+
+    'card_variant': FieldSpec('card_variant', (
+        _rule(r'(?:Card\s*Type|Variant|Product)[:\s-]*([A-Za-z\s]+?)(?:Card|Credit)',
+              anchors=('card', 'variant', 'product'), first_only=True),
+        _rule(r'(Platinum|Gold|Silver|Titanium|Signature|Classic|Premium|Rewards|Cashback|Millennia|Regalia)(?:\s+(?:Card|Credit))?',
+              anchors=('platinum', 'gold', 'silver', 'titanium', 'signature', 'classic',
+                       'premium', 'rewards', 'cashback', 'millennia', 'regalia'), first_only=True),
+        _rule(r'(?:HDFC|ICICI|SBI|Axis|AMEX)\s+([A-Za-z\s]+?)(?:Card|Credit)',
+              anchors=('hdfc', 'icici', 'sbi', 'axis', 'amex'), first_only=True),
+    ), 'first', _as_variant),
+
+    'total_balance': FieldSpec('total_balance', (
+        # Standard balance patterns
+        _rule(rf'(?:Total|Outstanding|Current)\s*Balance\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('total', 'outstanding', 'current')),
+        _rule(rf'Total\s*Amount\s*(?:Due|Outstanding)\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('total',)),
+        _rule(rf'Amount\s*(?:Payable|Due)\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('amount',)),
+        _rule(rf'(?:Closing|Statement)\s*Balance\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('closing', 'statement')),
+
+        # Payment patterns
+        _rule(rf'(?:Minimum|Total)\s*Payment\s*(?:Due|Amount)\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('minimum', 'total')),
+        _rule(rf'Pay(?:ment)?\s*(?:Due|Amount)\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('pay',)),
+
+        # Due amount patterns
+        _rule(rf'(?:Amount|Total)\s*Due\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('amount', 'total')),
+        _rule(rf'Due\s*Amount\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('due',)),
+
+        # Currency first patterns
+        _rule(rf'{_CURRENCY}\s*([\d,]+\.?\d*)\s*(?:Total|Balance|Due|Outstanding|Payable)',
+              anchors=_CURRENCY_ANCHORS),
+        _rule(rf'Balance\s*{_CURRENCY}\s*([\d,]+\.?\d*)',
+              anchors=('balance',)),
+
+        # New/Unbilled patterns
+        _rule(rf'(?:New|Unbilled)\s*(?:Balance|Amount)\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('new', 'unbilled')),
+
+        # Credit limit usage patterns (sometimes shows outstanding)
+        _rule(rf'(?:Total|Current)\s*Outstanding\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('total', 'current')),
+
+        # Table-like patterns (common in statements)
+        _rule(rf'(?:Total|Balance|Outstanding|Due)\s+{_CURRENCY}?\s*([\d,]+\.?\d*)\s*(?:\n|$)',
+              anchors=('total', 'balance', 'outstanding', 'due')),
+
+        # Axis/ICICI specific patterns
+        _rule(rf'(?:Statement|Billing)\s*Amount\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('statement', 'billing')),
+
+        # HDFC specific patterns
+        _rule(rf'(?:Total|Minimum)\s*Amount\s*Payable\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('total', 'minimum')),
+
+        # Generic amount after label
+        _rule(rf'(?:Balance|Outstanding|Due|Payable|Amount)\s*[:\s]+{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('balance', 'outstanding', 'due', 'payable', 'amount')),
+    ), 'vote', _as_balance),
+
+    'transaction_count': FieldSpec('transaction_count', (
+        _rule(r'(?:Total\s*)?(?:Number\s*of\s*)?Transactions?\s*[:#-]?\s*(\d+)',
+              anchors=('total', 'number', 'transaction'), first_only=True),
+        _rule(r'(\d+)\s*Transactions?', first_only=True),
+    ), 'first', _as_count, fallback=_count_date_tokens),
+
+    'interest_charges': FieldSpec('interest_charges', (
+        _rule(rf'(?:Interest|Finance)\s*Charge[sd]?\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('interest', 'finance'), first_only=True),
+        _rule(rf'(?:Late|Penalty)\s*(?:Fee|Charge)[s]?\s*[:#-]?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('late', 'penalty'), first_only=True),
+        _rule(rf'Interest\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('interest',), first_only=True),
+        _rule(rf'Finance\s*Charges?\s*{_CURRENCY}?\s*([\d,]+\.?\d*)',
+              anchors=('finance',), first_only=True),
+        _rule(rf'{_CURRENCY}\s*([\d,]+\.?\d*)\s*(?:Interest|Finance)',
+              anchors=_CURRENCY_ANCHORS, first_only=True),
+    ), 'first', _as_charge),
+
+    'merchants': FieldSpec('merchants', (
+        _rule(r'(?:POS|PURCHASE|TXN)\s+(?:AT\s+)?([A-Z][A-Z\s&\-\.]{3,40})',
+              anchors=('pos', 'purchase', 'txn')),
+        # A match ends in a city name: it can only start within 41 characters
+        # of the whitespace before one, so only those windows are tried
+        _rule(r'([A-Z][A-Z\s&\-\.]{3,40})\s+(?:BANGALORE|MUMBAI|DELHI|PUNE|HYDERABAD|CHENNAI)',
+              tail=('bangalore', 'mumbai', 'delhi', 'pune', 'hyderabad', 'chennai'), reach=41),
+        _rule(r'(?:SWIGGY|ZOMATO|AMAZON|FLIPKART|UBER|OLA|PAYTM|PHONEPE|GPAY)([A-Z\s]*)',
+              anchors=('swiggy', 'zomato', 'amazon', 'flipkart', 'uber', 'ola', 'paytm', 'phonepe', 'gpay')),
+    ), 'collect', _as_merchant),
+}
+
+
+
+class IssuerProfile(NamedTuple):
+    """
+    Targeted rules for one issuer's statement layout.
+
+    For each field in `rules` the profile's rules are tried in order and the
+    first valid match wins; only when none matches do the generic FIELD_SPECS
+    rules run. `window` limits the profile's rules to the leading characters
+    of the text, where that issuer prints its account summary.
+    """
+    issuer: str
+    rules: Dict[str, Tuple[Rule, ...]]
+    window: Optional[int] = None
+
+
+# Amounts in summary blocks are always printed with paise
+_AMOUNT = r'([\d,]+\.\d{2})'
+
+# "Card No: 4695 25XX XXXX 3458", "Card Number: XXXX XXXX XXXX 1234"
+_MASKED_CARD = _rule(r'Card\s*(?:No\.?|Number)\s*[:#-]?\s*(?:[\dxX*]{4}[\s-]?){3}(\d{4})(?!\d)',
+                     anchors=('card',))
+_TOTAL_AMOUNT_DUE = _rule(rf'Total\s*Amount\s*Due\s*[:#-]?\s*{_CURRENCY}?\s*{_AMOUNT}', anchors=('total',))
+
+ISSUER_PROFILES: Dict[str, IssuerProfile] = {
+    'HDFC': IssuerProfile('HDFC', {
+        'card_last4': (_MASKED_CARD,),
+        'total_balance': (
+            _TOTAL_AMOUNT_DUE,
+            # Summary table: the header row, then the due date and the total dues
+            _rule(rf'Payment\s*Due\s*Date\s*Total\s*Dues\b.{{0,400}}?\d{{2}}/\d{{2}}/\d{{4}}\s+{_AMOUNT}',
+                  anchors=('payment',)),
+        ),
+    }, window=3000),
+    'ICICI': IssuerProfile('ICICI', {
+        'card_last4': (_MASKED_CARD,),
+        # The rupee sign is extracted as a backtick from ICICI's font
+        'total_balance': (
+            _rule(rf'Total\s*Amount\s*Due\s*[:#-]?\s*(?:{_CURRENCY}|`)?\s*{_AMOUNT}', anchors=('total',)),
+        ),
+    }, window=2000),
+    'SBI': IssuerProfile('SBI', {
+        'card_last4': (_MASKED_CARD,),
+        'total_balance': (
+            _TOTAL_AMOUNT_DUE,
+            _rule(rf'Total\s*Outstanding\s*[:#-]?\s*{_CURRENCY}?\s*{_AMOUNT}', anchors=('total',)),
+        ),
+    }, window=3000),
+    'AXIS': IssuerProfile('AXIS', {
+        # "Card No: 53346700****1060"
+        'card_last4': (
+            _rule(r'Card\s*(?:No\.?|Number)\s*[:#-]?\s*\d{6,8}[xX*]{4,6}(\d{4})(?!\d)', anchors=('card',)),
+            _MASKED_CARD,
+        ),
+        'total_balance': (
+            # Payment summary: column headers, then the total due as the first debit amount
+            _rule(rf'Total\s*Payment\s*Due\s*Minimum\s*Payment\s*Due\b.{{0,160}}?{_AMOUNT}\s*Dr\b',
+                  anchors=('total',)),
+            _TOTAL_AMOUNT_DUE,
+        ),
+    }, window=2000),
+    'AMEX': IssuerProfile('AMEX', {
+        'card_last4': (_MASKED_CARD,),
+        'total_balance': (
+            _TOTAL_AMOUNT_DUE,
+            _rule(rf'Closing\s*Balance\s*[:#-]?\s*{_CURRENCY}?\s*{_AMOUNT}', anchors=('closing',)),
+        ),
+    }, window=3000),
+}
+
+SUMMARY_FIELDS = ('card_last4', 'card_variant', 'total_balance', 'transaction_count', 'interest_charges')
+
+
+def _iter_candidates(
+    scan: TextScan,
+    rules: Tuple[Rule, ...],
+    convert: Callable[[re.Match], object],
+    budget: Optional[Budget] = None
+) -> Iterator[Candidate]:
+    for index, rule in enumerate(rules):
+        if budget is not None and budget.expired():
+            return
+        for m in scan.finditer(rule, budget):
+            value = convert(m)
+            if value is not None:
+                yield Candidate(value, index, m.start())
+            if rule.first_only:
+                break
+
+
+def rank_candidates(
+    text: str,
+    field: str,
+    scan: Optional[TextScan] = None,
+    budget: Optional[Budget] = None
+) -> List[Candidate]:
+    """
+    All valid candidates for a field, best first.
+
+    For 'first' fields candidates are ordered by rule, then position; for
+    'vote' fields by how often the value was found, then first appearance.
+    """
+    spec = FIELD_SPECS[field]
+    scan = scan or TextScan(text)
+    candidates = list(_iter_candidates(scan, spec.rules, spec.convert, budget))
+    if spec.policy != 'vote':
+        return candidates
+
+    votes = Counter(c.value for c in candidates)
+    first_seen = {}
+    for candidate in candidates:
+        first_seen.setdefault(candidate.value, candidate)
+    ranked = sorted(first_seen.values(), key=lambda c: -votes[c.value])
+    return [c._replace(votes=votes[c.value]) for c in ranked]
+
+
+def extract_field(
+    text: str,
+    field: str,
+    scan: Optional[TextScan] = None,
+    issuer: Optional[str] = None,
+    budget: Optional[Budget] = None
+):
+    """
+    The winning value for a single field (None when nothing valid was found).
+    With a known issuer its profile's targeted rules are tried first. When
+    the budget runs out the best value found so far wins.
+    """
+    spec = FIELD_SPECS[field]
+    scan = scan or TextScan(text)
+
+    profile = ISSUER_PROFILES.get(issuer)
+    if profile is not None and field in profile.rules:
+        region = scan.region(profile.window)
+        first = next(_iter_candidates(region, profile.rules[field], spec.convert, budget), None)
+        if first is not None:
+            return first.value
+
+    if spec.policy == 'collect':
+        return [c.value for c in _iter_candidates(scan, spec.rules, spec.convert, budget)]
+
+    if spec.policy == 'vote':
+        ranked = rank_candidates(text, field, scan, budget)
+        value = ranked[0].value if ranked else None
+    else:
+        first = next(_iter_candidates(scan, spec.rules, spec.convert, budget), None)
+        value = first.value if first is not None else None
+
+    if value is None and spec.fallback is not None and not (budget is not None and budget.expired()):
+        value = spec.fallback(text)
+    return value
+
+
+def extract_fields(
+    text: str,
+    fields: Tuple[str, ...] = tuple(FIELD_SPECS),
+    issuer: Optional[str] = None,
+    budget: Optional[Budget] = None
+) -> Dict[str, object]:
+    """
+    Extract several fields from one document, sharing a single TextScan.
+    Fields that run out of budget are added to budget.exceeded.
+    """
+    scan = TextScan(text)
+    budget = budget or Budget()
+    values = {}
+    for field in fields:
+        start = time.perf_counter()
+        budget.start()
+        values[field] = extract_field(text, field, scan, issuer, budget)
+        time_field(field, time.perf_counter() - start)
+        if budget.expired():
+            budget.exceeded.append(field)
+            count_budget_exceeded(field)
+    return values
@@ -0,0 +1,209 @@
+"""
+Parse a directory tree of PDF statements without the web server.
+
+    python ingest.py STATEMENT_DIR --output records.ndjson
+    python ingest.py STATEMENT_DIR --store          # USE_SQLITE / DATABASE_PATH
+
+Files are parsed across a process pool (all cores by default) and read by the
+workers straight from disk. Every finished file is appended to a checkpoint,
+so rerunning the same command after an interruption skips everything already
+done; files that changed since (size or mtime) are parsed again. Output is
+written before the checkpoint, so a crash can repeat a file but never lose one.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from executor import ParseExecutor
+from parser import EXTRACTION_MODE, EXTRACTION_MODES
+from source import PdfSource
+from storage import create_store
+
+# Files handed to the executor per round, per worker
+BATCH_PER_WORKER = 4
+
+# (size, mtime_ns) identifies the version of a file that was parsed
+FileStamp = Tuple[int, int]
+
+
+def find_pdfs(root: str) -> Iterator[str]:
+    """
+    Paths of all .pdf files under root, in a stable order.
+    """
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.pdf'):
+                yield os.path.join(directory, filename)
+
+
+def _stamp(path: str) -> FileStamp:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_checkpoint(path: str) -> Dict[str, FileStamp]:
+    """
+    Files already processed by an earlier run, by relative path. A torn last
+    line from an interrupted write is ignored.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                done[entry['path']] = (entry['size'], entry['mtime_ns'])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+class Summary:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statuses: Dict[str, int] = {}
+        self.skipped = 0
+        self.pages = 0
+        self.bytes = 0
+
+    def add(self, record, trace, size: int) -> None:
+        self.statuses[record.status] = self.statuses.get(record.status, 0) + 1
+        self.bytes += size
+        if trace is not None:
+            self.pages += sum(trace.pages.values())
+
+    def render(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        files = sum(self.statuses.values())
+        outcome = ', '.join(f'{status} {count}' for status, count in sorted(self.statuses.items())) or 'none'
+        return '\n'.join([
+            f'Files:      {files} parsed in {elapsed:.1f}s ({self.skipped} skipped from checkpoint)',
+            f'Outcome:    {outcome}',
+            f'Throughput: {files / elapsed:.2f} files/s, {self.pages / elapsed:.2f} pages/s, '
+            f'{self.bytes / elapsed / (1024 * 1024):.2f} MB/s',
+        ])
+
+
+def ingest(
+    root: str,
+    executor: ParseExecutor,
+    checkpoint_path: str,
+    output=None,
+    store=None,
+    progress: bool = True,
+    extraction_mode: Optional[str] = None
+) -> Summary:
+    """
+    Parse every PDF under root not already in the checkpoint, writing records
+    to `output` (NDJSON) and/or `store` as each batch finishes.
+    """
+    summary = Summary()
+    done = load_checkpoint(checkpoint_path)
+
+    todo: List[Tuple[str, str, FileStamp]] = []
+    for path in find_pdfs(root):
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        stamp = _stamp(path)
+        if done.get(relative) == stamp:
+            summary.skipped += 1
+        else:
+            todo.append((path, relative, stamp))
+
+    batch_size = executor.max_workers * BATCH_PER_WORKER
+    with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+        for start in range(0, len(todo), batch_size):
+            batch = todo[start:start + batch_size]
+            results = executor.parse_many_traced([
+                (PdfSource.from_path(path), relative) for path, relative, _ in batch
+            ], extraction_mode)
+            records = [record for record, _ in results]
+
+            if output is not None:
+                output.write(''.join(record.to_json() + '\n' for record in records))
+                output.flush()
+            if store is not None:
+                store.add_many(records)
+
+            for (_, relative, (size, mtime_ns)), (record, trace) in zip(batch, results):
+                checkpoint.write(json.dumps({
+                    'path': relative,
+                    'size': size,
+                    'mtime_ns': mtime_ns,
+                    'status': record.status,
+                    'record_id': record.id
+                }) + '\n')
+                summary.add(record, trace, size)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+            if progress:
+                print(f'{start + len(batch)}/{len(todo)} files', file=sys.stderr)
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description='Parse a directory tree of PDF statements.')
+    ap.add_argument('root', help='directory to scan for .pdf files (recursively)')
+    ap.add_argument('--output', help='append records as NDJSON to this file (default: stdout)')
+    ap.add_argument('--store', action='store_true',
+                    help='add records to the record store configured by USE_SQLITE / DATABASE_PATH')
+    ap.add_argument('--checkpoint', help='checkpoint file (default: <output>.checkpoint, or .ingest-checkpoint in root)')
+    ap.add_argument('--restart', action='store_true', help='ignore and overwrite an existing checkpoint')
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parser processes (default: all cores)')
+    ap.add_argument('--timeout', type=float, default=float(os.environ.get('PARSE_TIMEOUT', '120')),
+                    help='seconds allowed per file')
+    ap.add_argument('--mode', choices=list(EXTRACTION_MODES), default=EXTRACTION_MODE,
+                    help='text extraction mode (default: %(default)s)')
+    ap.add_argument('--quiet', action='store_true', help='no per-batch progress on stderr')
+    args = ap.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        print(f'Not a directory: {args.root}', file=sys.stderr)
+        return 2
+
+    store = None
+    if args.store:
+        if os.environ.get('USE_SQLITE', 'false').lower() != 'true':
+            print('--store needs USE_SQLITE=true; the in-memory store would be lost on exit', file=sys.stderr)
+            return 2
+        store = create_store()
+
+    checkpoint_path = args.checkpoint or (
+        args.output + '.checkpoint' if args.output else os.path.join(args.root, '.ingest-checkpoint')
+    )
+    if args.restart and os.path.exists(checkpoint_path):
+        os.unlink(checkpoint_path)
+
+    if args.output:
+        # Resumed runs append to the records written before the interruption
+        output = open(args.output, 'w' if args.restart else 'a', encoding='utf-8')
+    elif store is None:
+        output = sys.stdout
+    else:
+        output = None
+
+    executor = ParseExecutor(mode='process', max_workers=args.workers, timeout=args.timeout)
+    try:
+        summary = ingest(
+            args.root, executor, checkpoint_path, output=output, store=store,
+            progress=not args.quiet, extraction_mode=args.mode
+        )
+    except KeyboardInterrupt:
+        print(f'Interrupted; rerun the same command to resume from {checkpoint_path}', file=sys.stderr)
+        return 130
+    finally:
+        executor.shutdown()
+        if output is not None and output is not sys.stdout:
+            output.close()
+
+    print(summary.render(), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from admission import AdmissionQueue
+from models import ParsedRecord
+from executor import ParseExecutor
+from metrics import Trace
+from source import PdfSource
+
+# Finished jobs kept around so clients can still poll them
+MAX_FINISHED_JOBS = 200
+
+
+class Job:
+    """
+    A batch of uploaded files parsed in the background.
+
+    Each file moves through QUEUED -> RUNNING -> PARSED/FAILED. Finished records
+    are appended to an event log that SSE subscribers read from by sequence
+    number, so a reconnecting client can resume where it left off.
+    """
+
+    def __init__(
+        self,
+        uploads: List[Tuple[Union[bytes, PdfSource], str]],
+        trace: bool = False,
+        mode: Optional[str] = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.trace = trace
+        self.mode = mode
+        self.created_at = datetime.utcnow().isoformat() + 'Z'
+        self.files = [
+            {'index': index, 'filename': filename, 'status': 'QUEUED', 'record_id': None, 'error': None}
+            for index, (_, filename) in enumerate(uploads)
+        ]
+        self.events = []
+        self._uploads = list(uploads)
+        self._changed = threading.Condition()
+
+    @property
+    def status(self) -> str:
+        states = {f['status'] for f in self.files}
+        if states <= {'PARSED', 'FAILED'}:
+            return 'COMPLETED'
+        if states == {'QUEUED'}:
+            return 'QUEUED'
+        return 'RUNNING'
+
+    @property
+    def finished(self) -> bool:
+        return self.status == 'COMPLETED'
+
+    def to_dict(self) -> dict:
+        with self._changed:
+            files = [dict(f) for f in self.files]
+        done = sum(1 for f in files if f['status'] in ('PARSED', 'FAILED'))
+        return {
+            'id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'total': len(files),
+            'completed': done,
+            'files': files
+        }
+
+    def wait_for_events(self, start: int, timeout: float) -> List[Tuple[int, dict]]:
+        """
+        Block until there are events after `start` (or the job finishes / timeout).
+        """
+        with self._changed:
+            if len(self.events) <= start and not self.finished:
+                self._changed.wait(timeout)
+            return list(enumerate(self.events))[start:]
+
+    def _take_upload(self, index: int) -> Tuple[Union[bytes, PdfSource], str]:
+        with self._changed:
+            upload, self._uploads[index] = self._uploads[index], None
+            self.files[index]['status'] = 'RUNNING'
+            self._changed.notify_all()
+        return upload
+
+    def _complete(self, index: int, record: ParsedRecord, trace: Optional[Trace] = None) -> None:
+        event = record.to_dict()
+        if self.trace:
+            event['trace'] = trace.to_dict() if trace is not None else None
+        with self._changed:
+            entry = self.files[index]
+            entry['status'] = record.status
+            entry['record_id'] = record.id
+            entry['error'] = record.error
+            self.events.append(event)
+            self._changed.notify_all()
+
+
+class JobManager:
+    """
+    Background queue that feeds uploaded files to a ParseExecutor one file at a
+    time and hands each finished record to `on_record` (the record store).
+    With an `admission` queue, callers admit a job's files before submitting
+    it and each file's slot is released once it has been parsed.
+
+    The worker threads start on the first submit in each process: threads
+    do not survive fork, so a manager built before a pre-forking server
+    forks its workers (gunicorn --preload) starts its own in each of them.
+    """
+
+    def __init__(
+        self,
+        executor: ParseExecutor,
+        on_record: Callable[[ParsedRecord], None],
+        workers: Optional[int] = None,
+        admission: Optional[AdmissionQueue] = None
+    ):
+        self.executor = executor
+        self.on_record = on_record
+        self.admission = admission
+        self.workers = workers or executor.max_workers
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(
+        self,
+        uploads: List[Tuple[Union[bytes, PdfSource], str]],
+        trace: bool = False,
+        mode: Optional[str] = None
+    ) -> Job:
+        job = Job(uploads, trace=trace, mode=mode)
+        with self._lock:
+            self._start_workers()
+            self._jobs[job.id] = job
+            self._prune()
+            work = self._queue
+        for index in range(len(uploads)):
+            work.put((job, index))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stream(self, job: Job, start: int = 0, keepalive: float = 15.0) -> Iterator[str]:
+        """
+        Yield Server-Sent Events for a job: one `record` event per finished file,
+        then a final `done` event carrying the job summary.
+        """
+        position = start
+        while True:
+            events = job.wait_for_events(position, keepalive)
+            for sequence, record in events:
+                yield _sse('record', record, event_id=sequence + 1)
+                position = sequence + 1
+            if job.finished and position >= len(job.events):
+                yield _sse('done', job.to_dict())
+                return
+            if not events:
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+
+    def _start_workers(self) -> None:
+        # Called with self._lock held
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        # A queue inherited through fork may hold the parent's entries
+        self._queue = queue.Queue()
+        # One thread per pool worker keeps the process pool saturated
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(self._queue,), name=f'parse-job-{i}', daemon=True)
+            thread.start()
+
+    def _work(self, work: queue.Queue) -> None:
+        while True:
+            job, index = work.get()
+            trace = None
+            upload = None
+            start = time.monotonic()
+            try:
+                upload = job._take_upload(index)
+                record, trace = self.executor.parse_many_traced([upload], job.mode)[0]
+            except Exception as e:
+                record = ParsedRecord.create(
+                    filename=job.files[index]['filename'],
+                    status='FAILED',
+                    error=f'Parsing error: {str(e)}'
+                )
+            finally:
+                # Spooled uploads are deleted as soon as their file is parsed
+                if upload is not None and isinstance(upload[0], PdfSource):
+                    upload[0].discard()
+                if self.admission is not None:
+                    self.admission.release(1, time.monotonic() - start)
+            try:
+                self.on_record(record)
+            except Exception as e:
+                record = ParsedRecord.create(
+                    filename=record.filename,
+                    status='FAILED',
+                    error=f'Storage error: {str(e)}'
+                )
+            job._complete(index, record, trace)
+            work.task_done()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
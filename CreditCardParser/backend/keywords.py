@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# C automaton (optional); the pure-Python one below gives the same matches
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Issuer markers and merchant category keywords, in priority order
+KEYWORDS_PATH = os.environ.get('KEYWORDS_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keywords.json')
+
+# Distinct merchant strings whose categories are memoized
+MERCHANT_CACHE_SIZE = int(os.environ.get('MERCHANT_CACHE_SIZE', '4096'))
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over (keyword, label) pairs. labels() finds the
+    labels of every keyword occurring in a text in one pass, however many
+    keywords there are. Keywords are matched case-sensitively, so callers
+    upper-case both sides.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        outputs: Dict[str, set] = {}
+        for keyword, label in keywords:
+            if keyword:
+                outputs.setdefault(keyword, set()).add(label)
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, labels in outputs.items():
+                self._automaton.add_word(keyword, frozenset(labels))
+            if outputs:
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+            return
+
+        # Trie: goto[state][char] -> state, with the labels ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+        for keyword, labels in outputs.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._out.append(frozenset())
+                state = next_state
+            self._out[state] = self._out[state] | labels
+
+        # Failure links, breadth first; each state also inherits the labels of
+        # its failure state so a match never needs to walk the chain
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] | self._out[self._fail[next_state]]
+
+    def labels(self, text: str) -> FrozenSet[str]:
+        """
+        Labels of all keywords found in text.
+        """
+        if AHOCORASICK_AVAILABLE:
+            if self._automaton is None:
+                return frozenset()
+            found = set()
+            for _, labels in self._automaton.iter(text):
+                found |= labels
+            return frozenset(found)
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return frozenset(found)
+
+
+class KeywordTables:
+    """
+    Issuer markers and merchant categories loaded from a JSON data file, each
+    compiled into one automaton.
+    """
+
+    def __init__(self, issuers: List[dict], categories: List[dict], digest: str = ''):
+        self.issuers = [entry['name'] for entry in issuers]
+        self.categories = [entry['name'] for entry in categories]
+        self.digest = digest
+        self._issuer_automaton = KeywordAutomaton(
+            (pattern.upper(), entry['name']) for entry in issuers for pattern in entry['patterns']
+        )
+        self._category_automaton = KeywordAutomaton(
+            (keyword.upper(), entry['name']) for entry in categories for keyword in entry['keywords']
+        )
+        self.merchant_categories = lru_cache(maxsize=MERCHANT_CACHE_SIZE)(self._merchant_categories)
+
+    @classmethod
+    def load(cls, path: str = KEYWORDS_PATH) -> 'KeywordTables':
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        return cls(data['issuers'], data['categories'], hashlib.sha256(raw).hexdigest())
+
+    def detect_issuer(self, text: str) -> Optional[str]:
+        """
+        The highest-priority issuer with a marker in text, or None.
+        """
+        found = self._issuer_automaton.labels(text.upper())
+        for issuer in self.issuers:
+            if issuer in found:
+                return issuer
+        return None
+
+    def _merchant_categories(self, merchant: str) -> FrozenSet[str]:
+        return self._category_automaton.labels(merchant.upper())
+
+
+KEYWORDS = KeywordTables.load()
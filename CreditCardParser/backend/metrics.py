@@ -0,0 +1,245 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FIELD_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(label, '') for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name + '_total', dict(zip(self.labels, key)), value
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(label, '') for label in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> Iterator[Tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                yield self.name + '_bucket', {**labels, 'le': le}, cumulative
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+stage_seconds = REGISTRY.register(Histogram(
+    'parser_stage_seconds', 'Time spent in each parsing stage per document.', ('stage',)
+))
+field_seconds = REGISTRY.register(Histogram(
+    'parser_field_seconds', 'Time spent extracting each field per document.', ('field',), FIELD_BUCKETS
+))
+pages_total = REGISTRY.register(Counter(
+    'parser_pages', 'Pages read, by the backend that produced their text.', ('source',)
+))
+fallbacks_total = REGISTRY.register(Counter(
+    'parser_fallbacks', 'Fallback paths taken while extracting text.', ('path',)
+))
+documents_total = REGISTRY.register(Counter(
+    'parser_documents', 'Documents parsed, by outcome.', ('status',)
+))
+cache_total = REGISTRY.register(Counter(
+    'parse_cache_lookups', 'Parse cache lookups, by result.', ('result',)
+))
+worker_failures_total = REGISTRY.register(Counter(
+    'parser_worker_failures', 'Files failed because their pool worker crashed or timed out.', ('reason',)
+))
+budget_exceeded_total = REGISTRY.register(Counter(
+    'parser_budget_exceeded', 'Field extractions cut short by their time budget.', ('field',)
+))
+admission_rejections_total = REGISTRY.register(Counter(
+    'parser_admission_rejections', 'Uploads and jobs refused with 429 because the parse queue was full.'
+))
+
+
+class Trace:
+    """
+    Timings and fallback counts collected while parsing one document.
+
+    Parsing may run in a pool process, so a trace is a plain picklable object
+    that travels back with the record; the parent then records it with
+    observe_trace().
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.fields: Dict[str, float] = {}
+        self.pages: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+        self.budget_exceeded: Dict[str, int] = {}
+
+    def to_dict(self) -> dict:
+        return {
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            'fields_ms': {field: round(seconds * 1000, 3) for field, seconds in self.fields.items()},
+            'pages': dict(self.pages),
+            'fallbacks': dict(self.fallbacks),
+            'budget_exceeded': dict(self.budget_exceeded),
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+
+@contextmanager
+def tracing() -> Iterator[Trace]:
+    """
+    Collect a Trace for everything parsed inside the block.
+    """
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Add the block's wall time to the current trace's `name` stage.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stages[name] = trace.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def time_field(name: str, seconds: float) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.fields[name] = trace.fields.get(name, 0.0) + seconds
+
+
+def count_page(source: str) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.pages[source] = trace.pages.get(source, 0) + 1
+
+
+def count_fallback(path: str, amount: int = 1) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.fallbacks[path] = trace.fallbacks.get(path, 0) + amount
+
+
+def count_budget_exceeded(field: str) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.budget_exceeded[field] = trace.budget_exceeded.get(field, 0) + 1
+
+
+def observe_trace(trace: Optional[Trace], status: str) -> None:
+    """
+    Record a finished document's trace in the process-wide metrics.
+    """
+    documents_total.inc(status=status)
+    if trace is None:
+        return
+    for name, seconds in trace.stages.items():
+        stage_seconds.observe(seconds, stage=name)
+    for name, seconds in trace.fields.items():
+        field_seconds.observe(seconds, field=name)
+    for source, count in trace.pages.items():
+        pages_total.inc(count, source=source)
+    for path, count in trace.fallbacks.items():
+        fallbacks_total.inc(count, path=path)
+    for field, count in trace.budget_exceeded.items():
+        budget_exceeded_total.inc(count, field=field)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
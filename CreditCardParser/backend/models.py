@@ -1,11 +1,40 @@
-from dataclasses import dataclass, asdict
-from typing import Optional, Literal
+from dataclasses import dataclass, fields
+from typing import Iterable, Optional, Literal
 from datetime import datetime
+from json.encoder import encode_basestring_ascii
+import json
+import os
+import sys
 import uuid
 
+# Faster encoder for whole record lists (optional); the encoder below is used otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Keep each record's encoded JSON after it is first sent; trades memory for CPU
+# on stores that serve the same records repeatedly
+RECORD_JSON_CACHE = os.environ.get('RECORD_JSON_CACHE', 'false').lower() == 'true'
+
+# Short labels that repeat across records; interned so records share one copy
+_INTERNED_FIELDS = (
+    'issuer', 'card_variant', 'top_merchant_category', 'text_backend', 'rules_version', 'status'
+)
+
 
 @dataclass
 class ParsedRecord:
+    # Slots instead of a per-instance __dict__; fields therefore take no
+    # class-level defaults (create() supplies them)
+    __slots__ = (
+        'id', 'filename', 'issuer', 'card_last4', 'card_variant', 'total_balance',
+        'transaction_count', 'interest_charges', 'top_merchant_category', 'text_backend',
+        'content_hash', 'rules_version', 'partial_fields', 'uploaded_at', 'status', 'error', 'transactions',
+        'pages', 'merchants', '_json'
+    )
+
     id: str
     filename: str
     issuer: Literal['HDFC', 'ICICI', 'SBI', 'AXIS', 'AMEX', 'UNKNOWN']
@@ -15,9 +44,30 @@ class ParsedRecord:
     transaction_count: Optional[int]
     interest_charges: Optional[float]
     top_merchant_category: Optional[str]
+    # Backend that produced most of the text: 'pdfium', 'pdfplumber', 'pypdf2' or 'ocr'
+    text_backend: Optional[str]
+    # SHA-256 of the PDF, which keys its stored page text
+    content_hash: Optional[str]
+    # Field rules the values were extracted with (parser.RULES_VERSION)
+    rules_version: Optional[str]
+    # Comma-separated fields whose extraction ran out of time budget, or None
+    partial_fields: Optional[str]
     uploaded_at: str
     status: Literal['PARSED', 'FAILED']
-    error: Optional[str] = None
+    error: Optional[str]
+
+    def __post_init__(self):
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+        # Transaction rows, page text and merchant names found by the parser.
+        # Not columns: they travel with the record to the transaction and
+        # record stores (and search index) and are not part of to_dict().
+        self.transactions = ()
+        self.pages = ()
+        self.merchants = ()
+        self._json = None
 
     @staticmethod
     def create(
@@ -29,6 +79,10 @@ class ParsedRecord:
         transaction_count: Optional[int] = None,
         interest_charges: Optional[float] = None,
         top_merchant_category: Optional[str] = None,
+        text_backend: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        rules_version: Optional[str] = None,
+        partial_fields: Optional[str] = None,
         status: str = 'PARSED',
         error: Optional[str] = None
     ):
@@ -42,10 +96,56 @@ class ParsedRecord:
             transaction_count=transaction_count,
             interest_charges=interest_charges,
             top_merchant_category=top_merchant_category,
+            text_backend=text_backend,
+            content_hash=content_hash,
+            rules_version=rules_version,
+            partial_fields=partial_fields,
             uploaded_at=datetime.utcnow().isoformat() + 'Z',
             status=status,
             error=error
         )
 
     def to_dict(self):
-        return asdict(self)
+        # Every field is a scalar, so a shallow copy is all asdict() would give
+        return {name: getattr(self, name) for name in RECORD_FIELDS}
+
+    def to_json(self) -> str:
+        """
+        The record as a compact JSON object, written field by field without
+        an intermediate dict. Records are not modified after they are created,
+        so with RECORD_JSON_CACHE the text is kept for the next response.
+        """
+        encoded = self._json
+        if encoded is None:
+            encoded = '{' + ','.join(
+                key + _ENCODERS.get(type(value), _encode)(value)
+                for key, value in zip(_JSON_KEYS, [getattr(self, name) for name in RECORD_FIELDS])
+            ) + '}'
+            if RECORD_JSON_CACHE:
+                self._json = encoded
+        return encoded
+
+
+RECORD_FIELDS = tuple(f.name for f in fields(ParsedRecord))
+
+_JSON_KEYS = tuple(encode_basestring_ascii(name) + ':' for name in RECORD_FIELDS)
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+# The types record fields hold, encoded as json.dumps would
+_ENCODERS = {
+    str: encode_basestring_ascii,
+    type(None): lambda value: 'null',
+    int: int.__repr__,
+    float: _encode,
+}
+
+
+def records_json(records: Iterable[ParsedRecord]) -> bytes:
+    """
+    A JSON array of records, encoded directly from the record objects.
+    """
+    if ORJSON_AVAILABLE and not RECORD_JSON_CACHE:
+        # orjson serializes dataclass instances natively
+        return orjson.dumps(list(records))
+    return ('[' + ','.join(record.to_json() for record in records) + ']').encode('utf-8')
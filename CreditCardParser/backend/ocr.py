@@ -0,0 +1,188 @@
+import atexit
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Union
+from backends import PRELOAD_BACKENDS, available, load, shutdown_pool, warm_up
+from cache import TieredCache
+from source import PdfSource, as_source
+
+# OCR (optional); pytesseract and pdf2image are imported on the first OCR'd page
+OCR_AVAILABLE = available('ocr')
+
+# Maximum number of pages OCR'd per document
+OCR_PAGE_BUDGET = int(os.environ.get('OCR_PAGE_BUDGET', '10'))
+
+# Resolutions tried in order; a page is re-OCR'd at the next one only while
+# Tesseract's mean word confidence stays below OCR_MIN_CONFIDENCE
+OCR_DPI_LEVELS = tuple(int(dpi) for dpi in os.environ.get('OCR_DPI_LEVELS', '150,300').split(','))
+OCR_MIN_CONFIDENCE = float(os.environ.get('OCR_MIN_CONFIDENCE', '70'))
+OCR_LANG = os.environ.get('OCR_LANG', 'eng')
+
+# Pages rasterized and recognized in parallel; 1 runs OCR on the calling process
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Recognized text per page, keyed by a hash of the page's content
+ocr_cache = TieredCache(
+    max_entries=int(os.environ.get('OCR_CACHE_SIZE', '512')),
+    cache_dir=os.environ.get('OCR_CACHE_DIR', './data/ocr_cache')
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class OcrResult(NamedTuple):
+    text: str
+    confidence: float
+    dpi: int
+
+
+def page_fingerprint(page) -> Optional[str]:
+    """
+    Hash a PyPDF2 page by its content stream and the raw data of the images it
+    draws, so the same scanned page inside different files shares one cache entry.
+    """
+    try:
+        digest = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        resources = page.get('/Resources')
+        xobjects = resources.get_object().get('/XObject') if resources else None
+        if xobjects:
+            xobjects = xobjects.get_object()
+            for name in sorted(xobjects):
+                xobject = xobjects[name].get_object()
+                digest.update(name.encode())
+                # Hash the raw (still encoded) stream; decoding images is not needed
+                digest.update(getattr(xobject, '_data', None) or b'')
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def ocr_pages(
+    file_bytes: Union[bytes, PdfSource],
+    page_numbers: List[int],
+    fingerprints: Optional[Dict[int, str]] = None
+) -> Dict[int, str]:
+    """
+    OCR the given 1-based pages and return their text by page number.
+
+    Cached pages are returned without rasterizing; the rest are spread across
+    the OCR process pool. Pages that fail to OCR map to ''.
+    """
+    if not OCR_AVAILABLE or not page_numbers:
+        return {}
+
+    fingerprints = fingerprints or {}
+    results = {}
+    missing = []
+    for page_number in page_numbers:
+        key = _cache_key(fingerprints.get(page_number))
+        cached = ocr_cache.get(key) if key else None
+        if cached is not None:
+            results[page_number] = cached
+        else:
+            missing.append(page_number)
+
+    if not missing:
+        return results
+
+    # Rasterizers read the PDF from disk, so only a path crosses process
+    # boundaries; a spooled source is used in place rather than copied
+    with as_source(file_bytes).as_path() as pdf_path:
+        recognized = {}
+        pool = _get_pool() if len(missing) > 1 else None
+        if pool is not None:
+            try:
+                futures = {n: pool.submit(ocr_page, pdf_path, n) for n in missing}
+                for page_number, future in futures.items():
+                    recognized[page_number] = future.result()
+            except BrokenProcessPool:
+                # A worker died; drop the pool and finish the remaining pages here
+                _reset_pool(pool)
+        for page_number in missing:
+            if page_number not in recognized:
+                recognized[page_number] = ocr_page(pdf_path, page_number)
+
+    for page_number, result in recognized.items():
+        results[page_number] = result.text if result else ''
+        key = _cache_key(fingerprints.get(page_number))
+        if key and result is not None:
+            ocr_cache.put(key, result.text)
+
+    return results
+
+
+def ocr_page(pdf_path: str, page_number: int) -> Optional[OcrResult]:
+    """
+    Rasterize and recognize one page, escalating through OCR_DPI_LEVELS until the
+    confidence is acceptable. Returns the most confident attempt, or None on error.
+    """
+    best = None
+    try:
+        _, convert_from_path = load('ocr')
+        for dpi in OCR_DPI_LEVELS:
+            images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+            if not images:
+                break
+            result = _recognize(images[0], dpi)
+            if best is None or result.confidence > best.confidence:
+                best = result
+            if result.confidence >= OCR_MIN_CONFIDENCE:
+                break
+    except Exception:
+        # OCR failed, keep whatever attempt succeeded
+        pass
+    return best
+
+
+def _recognize(image, dpi: int) -> OcrResult:
+    pytesseract, _ = load('ocr')
+    data = pytesseract.image_to_data(image, lang=OCR_LANG, output_type=pytesseract.Output.DICT)
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not word.strip():
+            continue
+        line = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(line, []).append(word)
+        confidences.append(confidence)
+    text = '\n'.join(' '.join(words) for words in lines.values())
+    mean = sum(confidences) / len(confidences) if confidences else 0.0
+    return OcrResult(text, round(mean, 2), dpi)
+
+
+def _cache_key(fingerprint: Optional[str]) -> Optional[str]:
+    if not fingerprint:
+        return None
+    settings = f"{OCR_LANG}:{','.join(map(str, OCR_DPI_LEVELS))}:{OCR_MIN_CONFIDENCE:g}"
+    return f"{hashlib.sha256(settings.encode()).hexdigest()[:8]}-{fingerprint}"
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if OCR_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                initializer=warm_up if PRELOAD_BACKENDS else None,
+                initargs=(('ocr',),)
+            )
+            atexit.register(shutdown_pool, _pool)
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    shutdown_pool(pool)
@@ -1,31 +1,76 @@
 import re
-import pdfplumber
-import PyPDF2
-from io import BytesIO
-from typing import Optional, Tuple, List
-from datetime import datetime
-from dateutil import parser as date_parser
+import threading
+from contextlib import ExitStack
+from dataclasses import replace
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from backends import load
 from models import ParsedRecord
+from extraction import FIELD_RULES_VERSION, Budget, extract_field, extract_fields
+from ocr import OCR_AVAILABLE, OCR_PAGE_BUDGET, OCR_WORKERS, ocr_pages, page_fingerprint
+from metrics import Trace, count_fallback, count_page, stage, tracing
+from keywords import KEYWORDS
+from source import PdfSource, as_source
+from transactions import extract_transactions
 import os
 
-# OCR imports (optional)
-try:
-    import pytesseract
-    from pdf2image import convert_from_bytes
-    from PIL import Image
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
 
+# Bump whenever text extraction changes: PDFs have to be read again
+PARSER_VERSION = '5'
 
-def parse_pdf(file_bytes: bytes, filename: str) -> ParsedRecord:
+# Version of everything extracted from the text; editing keywords.json changes
+# results too. Records with an older one are re-extracted from their stored text.
+RULES_VERSION = f'{FIELD_RULES_VERSION}.{KEYWORDS.digest[:8]}'
+
+# Parse cache version: invalidated by either
+CACHE_VERSION = f'{PARSER_VERSION}.{RULES_VERSION}'
+
+# Pages with fewer characters than this are treated as having no text layer
+MIN_PAGE_CHARS = 20
+
+# Text-layer backends tried per page, in order, by extraction mode. PDFium is
+# 20-60x faster than pdfplumber but keeps content-stream order, which costs
+# some transaction counts and balances on multi-column layouts. fast never
+# OCRs; the others OCR image-only pages.
+EXTRACTION_MODES = {
+    'fast': ('pdfium', 'pypdf2'),
+    'balanced': ('pdfium', 'pdfplumber', 'pypdf2'),
+    'accurate': ('pdfplumber', 'pypdf2'),
+}
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'accurate')
+
+# Page text scoring below this (see text_quality) moves on to the next backend
+TEXT_QUALITY_THRESHOLD = float(os.environ.get('TEXT_QUALITY_THRESHOLD', '0.6'))
+
+# In accurate mode, also OCR image pages whose text still scores low (opt-in:
+# each such page costs an OCR pass, seconds rather than milliseconds)
+OCR_LOW_QUALITY = os.environ.get('OCR_LOW_QUALITY', 'false').lower() == 'true'
+
+# Stop reading pages once the summary fields have been found (opt-in)
+TEXT_EARLY_STOP = os.environ.get('TEXT_EARLY_STOP', 'false').lower() == 'true'
+EARLY_STOP_FIELDS = ('card_last4', 'total_balance')
+
+_HYPHEN_BREAK_RE = re.compile(r'-\s*\n\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+_CID_RE = re.compile(r'\(cid:\d+\)')
+_TOKEN_RE = re.compile(r"[\w.,:;/()&@#%*'+\-₹$`|]{1,40}")
+
+
+def parse_pdf(
+    file_bytes: Union[bytes, PdfSource],
+    filename: str,
+    mode: str = EXTRACTION_MODE
+) -> ParsedRecord:
     """
-    Main entry point: parse a PDF credit card statement.
-    Returns a ParsedRecord with status PARSED or FAILED.
+    Main entry point: parse a PDF credit card statement, given as bytes or a PdfSource.
+    `mode` is one of EXTRACTION_MODES. Returns a ParsedRecord with status PARSED or FAILED.
     """
     try:
+        source = as_source(file_bytes)
+
         # Extract text
-        text = extract_text(file_bytes)
+        with stage('extract_text'):
+            pages = extract_pages(source, early_stop=TEXT_EARLY_STOP, mode=mode)
+            text = join_pages(pages)
         if not text or len(text.strip()) < 50:
             return ParsedRecord.create(
                 filename=filename,
@@ -33,31 +78,20 @@ def parse_pdf(file_bytes: bytes, filename: str) -> ParsedRecord:
                 error='Unable to extract text from PDF'
             )
 
-        # Detect issuer
-        issuer = detect_issuer(text)
-
-        # Extract fields
-        card_last4 = extract_last4(text, issuer)
-        card_variant = extract_card_variant(text, issuer)
-        total_balance = extract_total_balance(text, issuer)
-        transaction_count = extract_transaction_count(text, issuer)
-        interest_charges = extract_interest_charges(text, issuer)
-        
-        # Extract merchants and categorize
-        merchants = extract_merchants(text)
-        top_category = categorize_merchants(merchants)
-
-        return ParsedRecord.create(
+        page_texts = tuple(page.text for page in pages if page.text)
+        fields, transactions, merchants = extract_record_fields(page_texts, text)
+        record = ParsedRecord.create(
             filename=filename,
-            issuer=issuer,
-            card_last4=card_last4,
-            card_variant=card_variant,
-            total_balance=total_balance,
-            transaction_count=transaction_count,
-            interest_charges=interest_charges,
-            top_merchant_category=top_category,
-            status='PARSED'
+            text_backend=text_backend(pages),
+            content_hash=source.digest(),
+            status='PARSED',
+            **fields
         )
+        record.transactions = transactions
+        record.merchants = merchants
+        # Kept with the record so fields can be re-extracted when the rules change
+        record.pages = page_texts
+        return record
 
     except Exception as e:
         return ParsedRecord.create(
@@ -67,300 +101,452 @@ def parse_pdf(file_bytes: bytes, filename: str) -> ParsedRecord:
         )
 
 
-def extract_text(file_bytes: bytes) -> str:
+def extract_record_fields(
+    page_texts: Tuple[str, ...],
+    text: Optional[str] = None
+) -> Tuple[dict, list, List[str]]:
     """
-    Extract text from PDF using pdfplumber (primary), PyPDF2 (fallback), or OCR (last resort).
+    The cheap half of parsing: issuer, summary fields, top category and
+    transaction rows from the extracted page text (`text` is its joined,
+    cleaned form when already built). Returns the record fields, including
+    rules_version and partial_fields, the transaction rows and the merchant
+    names. The document's time budget starts here.
     """
-    text = ""
-    
-    # Try pdfplumber first
+    budget = Budget()
+    if text is None:
+        text = clean_text(''.join(page + "\n" for page in page_texts))
+
+    # Detect issuer
+    with stage('detect_issuer'):
+        issuer = detect_issuer(text)
+
+    # Transaction rows come from the page lines, before whitespace is flattened
+    with stage('extract_transactions'):
+        transactions = extract_transactions(page_texts)
+
+    # Extract all fields in one scan of the text
+    with stage('extract_fields'):
+        fields = extract_fields(text, issuer=issuer, budget=budget)
+
+    # Rows found are the count; the summary-text heuristics only fill in without them
+    if transactions:
+        fields['transaction_count'] = len(transactions)
+
+    # Categorize merchants
+    merchants = fields.pop('merchants')
+    with stage('categorize'):
+        top_category = categorize_merchants(merchants)
+
+    fields.update(
+        issuer=issuer,
+        top_merchant_category=top_category,
+        rules_version=RULES_VERSION,
+        partial_fields=','.join(budget.exceeded) or None
+    )
+    return fields, transactions, merchants
+
+
+def reextract(record: ParsedRecord, page_texts: Tuple[str, ...]) -> ParsedRecord:
+    """
+    The record with its fields and transaction rows extracted again from its
+    stored page text under the current rules; id, filename and upload time
+    are kept.
+    """
+    fields, transactions, merchants = extract_record_fields(page_texts)
+    updated = replace(record, status='PARSED', error=None, **fields)
+    updated.transactions = transactions
+    updated.merchants = merchants
+    return updated
+
+
+def parse_pdf_traced(
+    file_bytes: Union[bytes, PdfSource],
+    filename: str,
+    mode: str = EXTRACTION_MODE
+) -> Tuple[ParsedRecord, Trace]:
+    """
+    parse_pdf, also returning the per-stage timings and fallback counts.
+    """
+    with tracing() as trace:
+        with stage('total'):
+            record = parse_pdf(file_bytes, filename, mode)
+    return record, trace
+
+
+class PageText(NamedTuple):
+    number: int
+    text: str
+    source: str  # 'pdfium', 'pdfplumber', 'pypdf2', 'ocr' or 'none'
+    quality: float = 0.0
+
+
+def extract_text(
+    file_bytes: Union[bytes, PdfSource],
+    early_stop: bool = TEXT_EARLY_STOP,
+    mode: str = EXTRACTION_MODE
+) -> str:
+    """
+    Extract text from PDF page by page, trying the text-layer backends of the
+    extraction mode in order and falling back to OCR for image-only pages.
+    """
+    return join_pages(extract_pages(file_bytes, early_stop=early_stop, mode=mode))
+
+
+def join_pages(pages: List['PageText']) -> str:
+    """
+    The cleaned text of all pages that have any.
+    """
+    return clean_text(''.join(page.text + "\n" for page in pages if page.text))
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalize whitespace and join hyphenated line breaks.
+    """
+    text = _HYPHEN_BREAK_RE.sub('', text)  # Join hyphenated words
+    text = _WHITESPACE_RE.sub(' ', text)  # Normalize whitespace
+    return text.strip()
+
+
+def text_quality(text: str) -> float:
+    """
+    How usable a page's extracted text looks, from 0 to 1: the share of
+    whitespace-separated tokens that read as words or numbers. Pages shorter
+    than MIN_PAGE_CHARS score 0, as do undecodable glyphs ((cid:NN), U+FFFD)
+    and letters split into single characters by a broken text layer.
+    """
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return 0.0
+    tokens = _CID_RE.sub(' \ufffd ', stripped).split()
+    readable = 0
+    for token in tokens:
+        if len(token) == 1 and token.isalpha():
+            continue
+        if _TOKEN_RE.fullmatch(token) and any(char.isalnum() for char in token):
+            readable += 1
+    return round(readable / len(tokens), 3)
+
+
+def extract_pages(
+    file_bytes: Union[bytes, PdfSource],
+    early_stop: bool = False,
+    mode: str = EXTRACTION_MODE
+) -> List[PageText]:
+    """
+    Extract each page with the backends of the extraction mode, in order,
+    until one yields text scoring at least TEXT_QUALITY_THRESHOLD; the best
+    scoring text is kept. Backends are opened only when a page needs them.
+
+    Except in fast mode, image-only pages are queued for OCR (up to
+    OCR_PAGE_BUDGET pages) and recognized in parallel batches; in accurate
+    mode with OCR_LOW_QUALITY, OCR also replaces low-quality text when it
+    scores higher. With
+    early_stop, extraction stops after the first page at which every field in
+    EARLY_STOP_FIELDS can be extracted from the text so far. Transaction
+    estimates and merchants then only reflect the pages that were read.
+    """
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"mode must be one of {', '.join(EXTRACTION_MODES)}")
+    order = EXTRACTION_MODES[mode]
+    use_ocr = OCR_AVAILABLE and mode != 'fast'
+    source = as_source(file_bytes)
+    # Each backend reads through its own handle onto the same source
+    handles = ExitStack()
+    layers: Dict[str, Optional[_TextLayer]] = {}
+    pages = []
+    pending_ocr = []
+    ocr_budget = OCR_PAGE_BUDGET
+
+    def layer(name: str) -> Optional[_TextLayer]:
+        if name not in layers:
+            with stage(name):
+                try:
+                    layers[name] = _TEXT_LAYERS[name](source, handles)
+                except Exception:
+                    layers[name] = None
+        return layers[name]
+
+    def flush_ocr():
+        fingerprints = {}
+        pypdf = layers.get('pypdf2')
+        if pypdf is not None:
+            for index in pending_ocr:
+                fingerprints[index + 1] = page_fingerprint(pypdf.reader.pages[index])
+        with stage('ocr'):
+            recognized = ocr_pages(source, [index + 1 for index in pending_ocr], fingerprints)
+        for index in pending_ocr:
+            ocr_text = recognized.get(index + 1, '')
+            quality = text_quality(ocr_text)
+            if (quality, len(ocr_text.strip())) > (pages[index].quality, len(pages[index].text.strip())):
+                pages[index] = PageText(index + 1, ocr_text, 'ocr', quality)
+        pending_ocr.clear()
+
     try:
-        with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception:
-        pass
-
-    # Fallback to PyPDF2 if pdfplumber fails
-    if not text or len(text.strip()) < 50:
+        # The first backend that can open the document gives the page count
+        page_count = next((layer(name).page_count for name in order if layer(name) is not None), 0)
+
+        if page_count == 0:
+            # No backend could read the document; OCR is all that is left
+            if not use_ocr:
+                return []
+            count_fallback('ocr_unreadable')
+            with stage('ocr'):
+                pages = _ocr_unreadable(source)
+            _count_pages(pages)
+            return pages
+
+        for index in range(page_count):
+            best = PageText(index + 1, '', 'none')
+            for position, name in enumerate(order):
+                backend = layer(name)
+                if backend is None or index >= backend.page_count:
+                    continue
+                with stage(name):
+                    text = backend.text(index)
+                quality = text_quality(text)
+                if (quality, len(text.strip())) > (best.quality, len(best.text.strip())):
+                    if position > 0:
+                        count_fallback(name)
+                    best = PageText(index + 1, text, name if text else 'none', quality)
+                if best.quality >= TEXT_QUALITY_THRESHOLD:
+                    break
+            pages.append(best)
+
+            # Last resort: OCR pages that are images rather than text (in
+            # accurate mode with OCR_LOW_QUALITY, also pages whose text scored low)
+            needs_ocr = _is_sparse(best.text) or (
+                OCR_LOW_QUALITY and mode == 'accurate' and best.quality < TEXT_QUALITY_THRESHOLD
+            )
+            if needs_ocr and use_ocr and ocr_budget > 0 and _has_images(layers, index):
+                ocr_budget -= 1
+                pending_ocr.append(index)
+                count_fallback('ocr')
+
+            # Early stop must wait for queued OCR, so OCR in smaller batches then
+            if pending_ocr and (len(pending_ocr) >= OCR_WORKERS or early_stop):
+                flush_ocr()
+
+            if early_stop and index + 1 < page_count and _summary_found(pages):
+                count_fallback('early_stop')
+                break
+
+        if pending_ocr:
+            flush_ocr()
+    finally:
+        handles.close()
+
+    _count_pages(pages)
+    return pages
+
+
+def text_backend(pages: List[PageText]) -> Optional[str]:
+    """
+    The backend that produced most of the text (by characters), or None.
+    """
+    characters: Dict[str, int] = {}
+    for page in pages:
+        if page.text:
+            characters[page.source] = characters.get(page.source, 0) + len(page.text)
+    return max(characters, key=characters.get) if characters else None
+
+
+def _count_pages(pages: List[PageText]) -> None:
+    for page in pages:
+        count_page(page.source)
+
+
+def _is_sparse(text: str) -> bool:
+    return len(text.strip()) < MIN_PAGE_CHARS
+
+
+class _TextLayer:
+    """
+    One text-layer backend opened on a document. Failures reading a page give ''.
+    """
+
+    page_count = 0
+
+    def text(self, index: int) -> str:
+        raise NotImplementedError
+
+    def has_images(self, index: int) -> Optional[bool]:
+        """
+        Whether the page draws any images, or None when the backend cannot tell.
+        """
+        return None
+
+
+class _PdfiumLayer(_TextLayer):
+    """
+    PDFium through pypdfium2 (installed with pdfplumber): native and by far
+    the fastest, but emits text in content-stream order.
+    """
+
+    def __init__(self, source: PdfSource, handles: ExitStack):
+        pdfium = load('pdfium')
+        self._image_type = pdfium.raw.FPDF_PAGEOBJ_IMAGE
+        with _PDFIUM_LOCK:
+            self.pdf = pdfium.PdfDocument(source.path if source.path is not None else source.data)
+        handles.callback(self._close)
+        self.page_count = len(self.pdf)
+
+    def text(self, index: int) -> str:
         try:
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            with _PDFIUM_LOCK:
+                page = self.pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
         except Exception:
-            pass
+            return ''
+        return text.replace('\r\n', '\n')
 
-    # Last resort: OCR if available and text is still insufficient
-    if OCR_AVAILABLE and (not text or len(text.strip()) < 50):
+    def has_images(self, index: int) -> Optional[bool]:
         try:
-            # Convert PDF to images
-            images = convert_from_bytes(file_bytes, dpi=300, first_page=1, last_page=3)  # First 3 pages only
-            
-            for image in images:
-                # Perform OCR on each page
-                ocr_text = pytesseract.image_to_string(image, lang='eng')
-                if ocr_text:
-                    text += ocr_text + "\n"
-        except Exception as e:
-            # OCR failed, continue with whatever text we have
-            pass
-
-    # Clean text: normalize whitespace, join hyphenated lines
-    text = re.sub(r'-\s*\n\s*', '', text)  # Join hyphenated words
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    return text.strip()
+            with _PDFIUM_LOCK:
+                page = self.pdf[index]
+                try:
+                    return any(True for _ in page.get_objects(filter=(self._image_type,)))
+                finally:
+                    page.close()
+        except Exception:
+            return None
+
+    def _close(self) -> None:
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+
+class _PlumberLayer(_TextLayer):
+    """
+    pdfplumber: slowest, but orders words by their position on the page.
+    """
+
+    def __init__(self, source: PdfSource, handles: ExitStack):
+        self.pdf = load('pdfplumber').open(handles.enter_context(source.open()))
+        handles.callback(self.pdf.close)
+        self.page_count = len(self.pdf.pages)
+
+    def text(self, index: int) -> str:
+        try:
+            return self.pdf.pages[index].extract_text() or ''
+        except Exception:
+            return ''
+
+    def has_images(self, index: int) -> Optional[bool]:
+        try:
+            return bool(self.pdf.pages[index].images)
+        except Exception:
+            return None
+
+
+class _PyPdfLayer(_TextLayer):
+    """
+    PyPDF2: pure Python; reads some pages the others cannot.
+    """
+
+    def __init__(self, source: PdfSource, handles: ExitStack):
+        self.reader = load('pypdf2').PdfReader(handles.enter_context(source.open()))
+        self.page_count = len(self.reader.pages)
+
+    def text(self, index: int) -> str:
+        try:
+            return self.reader.pages[index].extract_text() or ''
+        except Exception:
+            return ''
+
+
+_TEXT_LAYERS = {
+    'pdfium': _PdfiumLayer,
+    'pdfplumber': _PlumberLayer,
+    'pypdf2': _PyPdfLayer,
+}
+
+# PDFium is not thread-safe; parses on request threads (inline mode) take turns
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _has_images(layers: Dict[str, Optional[_TextLayer]], index: int) -> bool:
+    # Without a backend that can tell, let OCR decide
+    for name in ('pdfplumber', 'pdfium'):
+        backend = layers.get(name)
+        if backend is not None:
+            found = backend.has_images(index)
+            if found is not None:
+                return found
+    return True
+
+
+def _ocr_unreadable(source: PdfSource) -> List[PageText]:
+    if not OCR_AVAILABLE:
+        return []
+    recognized = ocr_pages(source, list(range(1, OCR_PAGE_BUDGET + 1)))
+    return [
+        PageText(page_number, text, 'ocr', text_quality(text))
+        for page_number, text in sorted(recognized.items())
+        if text
+    ]
+
+
+def _summary_found(pages: List[PageText]) -> bool:
+    text = clean_text(''.join(page.text + "\n" for page in pages if page.text))
+    return all(extract_field(text, field) is not None for field in EARLY_STOP_FIELDS)
 
 
 def detect_issuer(text: str) -> str:
     """
-    Detect credit card issuer from text using keyword heuristics.
+    Detect credit card issuer from the issuer markers in keywords.json.
+    When several issuers are mentioned, the first one listed there wins.
     """
-    text_upper = text.upper()
-    
-    # HDFC patterns
-    if any(pattern in text_upper for pattern in [
-        'HDFC BANK',
-        'HDFC CREDIT CARD',
-        'HDFCBANK'
-    ]):
-        return 'HDFC'
-    
-    # ICICI patterns
-    if any(pattern in text_upper for pattern in [
-        'ICICI BANK',
-        'ICICI CREDIT CARD',
-        'ICICIBANK'
-    ]):
-        return 'ICICI'
-    
-    # SBI patterns
-    if any(pattern in text_upper for pattern in [
-        'STATE BANK OF INDIA',
-        'SBI CARD',
-        'SBICARD',
-        'SBI CREDIT CARD'
-    ]):
-        return 'SBI'
-    
-    # Axis patterns
-    if any(pattern in text_upper for pattern in [
-        'AXIS BANK',
-        'AXIS CREDIT CARD',
-        'AXISBANK'
-    ]):
-        return 'AXIS'
-    
-    # American Express patterns
-    if any(pattern in text_upper for pattern in [
-        'AMERICAN EXPRESS',
-        'AMEX',
-        'AMERICANEXPRESS'
-    ]):
-        return 'AMEX'
-    
-    return 'UNKNOWN'
+    return KEYWORDS.detect_issuer(text) or 'UNKNOWN'
 
 
 def extract_last4(text: str, issuer: str) -> Optional[str]:
     """
     Extract last 4 digits of card number.
     """
-    patterns = [
-        r'Card\s*(?:No\.?|Number|#)?\s*(?:ending\s*(?:in|with))?\s*[:#-]?\s*[xX*]{4,16}[\s-]?(\d{4})',
-        r'(?:Card|Account)\s*(?:No\.?|Number)?\s*[:#-]?\s*(?:[xX*\d]{4}[\s-]?){3}(\d{4})',
-        r'(?:ending|ends)\s*(?:in|with)\s*(\d{4})',
-        r'[xX*]{4,16}[\s-]?(\d{4})(?!\d)',
-        r'(?:xxxx|XXXX)[\s-]?(\d{4})',
-        r'\d{4}[\s-]\d{4}[\s-]\d{4}[\s-](\d{4})',
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            last4 = match.group(1)
-            if last4.isdigit() and len(last4) == 4:
-                return last4
-    
-    return None
+    return extract_field(text, 'card_last4', issuer=issuer)
 
 
 def extract_card_variant(text: str, issuer: str) -> Optional[str]:
     """
     Extract card variant/type (e.g., Platinum, Gold, Signature).
     """
-    variant_patterns = [
-        r'(?:Card\s*Type|Variant|Product)[:\s-]*([A-Za-z\s]+?)(?:Card|Credit)',
-        r'(Platinum|Gold|Silver|Titanium|Signature|Classic|Premium|Rewards|Cashback|Millennia|Regalia)(?:\s+(?:Card|Credit))?',
-        r'(?:HDFC|ICICI|SBI|Axis|AMEX)\s+([A-Za-z\s]+?)(?:Card|Credit)',
-    ]
-    
-    for pattern in variant_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            variant = match.group(1).strip()
-            if len(variant) > 2 and len(variant) < 50:
-                return variant.title()
-    
-    return None
+    return extract_field(text, 'card_variant', issuer=issuer)
 
 
 def extract_total_balance(text: str, issuer: str) -> Optional[float]:
     """
     Extract total balance/outstanding amount.
+    Returns the most frequently matched amount across all balance rules.
     """
-    patterns = [
-        # Standard balance patterns
-        r'(?:Total|Outstanding|Current)\s*Balance\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Total\s*Amount\s*(?:Due|Outstanding)\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Amount\s*(?:Payable|Due)\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'(?:Closing|Statement)\s*Balance\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Payment patterns
-        r'(?:Minimum|Total)\s*Payment\s*(?:Due|Amount)\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Pay(?:ment)?\s*(?:Due|Amount)\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Due amount patterns
-        r'(?:Amount|Total)\s*Due\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Due\s*Amount\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Currency first patterns
-        r'(?:Rs\.?|INR|₹)\s*([\d,]+\.?\d*)\s*(?:Total|Balance|Due|Outstanding|Payable)',
-        r'Balance\s*(?:Rs\.?|INR|₹)\s*([\d,]+\.?\d*)',
-        
-        # New/Unbilled patterns
-        r'(?:New|Unbilled)\s*(?:Balance|Amount)\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Credit limit usage patterns (sometimes shows outstanding)
-        r'(?:Total|Current)\s*Outstanding\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Table-like patterns (common in statements)
-        r'(?:Total|Balance|Outstanding|Due)\s+(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)\s*(?:\n|$)',
-        
-        # Axis/ICICI specific patterns
-        r'(?:Statement|Billing)\s*Amount\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # HDFC specific patterns
-        r'(?:Total|Minimum)\s*Amount\s*Payable\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        
-        # Generic amount after label
-        r'(?:Balance|Outstanding|Due|Payable|Amount)\s*[:\s]+(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-    ]
-    
-    # Try all patterns and collect valid amounts
-    found_amounts = []
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            amount_str = match.group(1)
-            amount = normalize_amount(amount_str)
-            if amount is not None and amount > 0 and amount < 10000000:  # Reasonable range
-                found_amounts.append(amount)
-    
-    # Return the most common amount or the largest if all unique
-    if found_amounts:
-        # If we found multiple amounts, return the most frequent one
-        from collections import Counter
-        if len(found_amounts) > 1:
-            amount_counts = Counter(found_amounts)
-            most_common = amount_counts.most_common(1)[0][0]
-            return most_common
-        return found_amounts[0]
-    
-    return None
+    return extract_field(text, 'total_balance', issuer=issuer)
 
 
 def extract_transaction_count(text: str, issuer: str) -> Optional[int]:
     """
     Extract number of transactions from the statement.
+    Falls back to estimating from date-like tokens.
     """
-    # Try to count transaction entries
-    transaction_patterns = [
-        r'(?:Total\s*)?(?:Number\s*of\s*)?Transactions?\s*[:#-]?\s*(\d+)',
-        r'(\d+)\s*Transactions?',
-    ]
-    
-    for pattern in transaction_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            try:
-                count = int(match.group(1))
-                if 0 < count < 10000:  # Sanity check
-                    return count
-            except ValueError:
-                pass
-    
-    # Try to count date patterns that might indicate transactions
-    # Look for patterns like DD/MM or DD-MMM that appear multiple times
-    date_patterns = re.findall(r'\b\d{2}[/-](?:\d{2}|[A-Za-z]{3})\b', text)
-    if len(date_patterns) > 5:  # If we find many dates, estimate transaction count
-        return len(date_patterns) // 2  # Rough estimate (each transaction might have 2 dates)
-    
-    return None
-
-
-def normalize_amount(amount_str: str) -> Optional[float]:
-    """
-    Normalize amount string to float (remove commas, currency symbols).
-    """
-    try:
-        # Remove commas, currency symbols, whitespace
-        cleaned = re.sub(r'[,₹\s]', '', amount_str)
-        cleaned = re.sub(r'Rs\.?|INR', '', cleaned, flags=re.IGNORECASE)
-        amount = float(cleaned.strip())
-        return round(amount, 2)
-    except (ValueError, AttributeError):
-        return None
+    return extract_field(text, 'transaction_count', issuer=issuer)
 
 
 def extract_interest_charges(text: str, issuer: str) -> Optional[float]:
     """
     Extract interest charges/finance charges from the statement.
     """
-    patterns = [
-        r'(?:Interest|Finance)\s*Charge[sd]?\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'(?:Late|Penalty)\s*(?:Fee|Charge)[s]?\s*[:#-]?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Interest\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'Finance\s*Charges?\s*(?:Rs\.?|INR|₹)?\s*([\d,]+\.?\d*)',
-        r'(?:Rs\.?|INR|₹)\s*([\d,]+\.?\d*)\s*(?:Interest|Finance)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            amount_str = match.group(1)
-            amount = normalize_amount(amount_str)
-            if amount is not None and amount > 0:
-                return amount
-    
-    return None
+    return extract_field(text, 'interest_charges', issuer=issuer)
 
 
 def extract_merchants(text: str) -> List[str]:
     """
     Extract merchant names from transaction descriptions.
     """
-    merchants = []
-    
-    # Common patterns for merchant names in statements
-    # Look for lines that might contain merchant info
-    merchant_patterns = [
-        r'(?:POS|PURCHASE|TXN)\s+(?:AT\s+)?([A-Z][A-Z\s&\-\.]{3,40})',
-        r'([A-Z][A-Z\s&\-\.]{3,40})\s+(?:BANGALORE|MUMBAI|DELHI|PUNE|HYDERABAD|CHENNAI)',
-        r'(?:SWIGGY|ZOMATO|AMAZON|FLIPKART|UBER|OLA|PAYTM|PHONEPE|GPAY)([A-Z\s]*)',
-    ]
-    
-    for pattern in merchant_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            merchant = match.strip()
-            if len(merchant) > 3 and len(merchant) < 50:
-                merchants.append(merchant.title())
-    
-    return merchants
+    return extract_field(text, 'merchants')
 
 
 def categorize_merchants(merchants: List[str]) -> Optional[str]:
@@ -370,29 +556,15 @@ def categorize_merchants(merchants: List[str]) -> Optional[str]:
     if not merchants:
         return None
     
-    # Category keywords mapping
-    categories = {
-        'Food & Dining': ['SWIGGY', 'ZOMATO', 'RESTAURANT', 'CAFE', 'PIZZA', 'BURGER', 'FOOD', 'MCDONALD', 'KFC', 'DOMINO', 'STARBUCKS'],
-        'Shopping': ['AMAZON', 'FLIPKART', 'MYNTRA', 'AJIO', 'MALL', 'STORE', 'SHOP', 'RETAIL', 'MART'],
-        'Transportation': ['UBER', 'OLA', 'RAPIDO', 'PETROL', 'FUEL', 'PARKING', 'TOLL'],
-        'Entertainment': ['NETFLIX', 'PRIME', 'HOTSTAR', 'SPOTIFY', 'CINEMA', 'MOVIE', 'THEATRE', 'BOOKMYSHOW'],
-        'Utilities': ['ELECTRICITY', 'WATER', 'GAS', 'INTERNET', 'BROADBAND', 'MOBILE', 'RECHARGE'],
-        'Travel': ['AIRLINE', 'FLIGHT', 'HOTEL', 'BOOKING', 'MAKEMYTRIP', 'GOIBIBO', 'IRCTC'],
-        'Healthcare': ['HOSPITAL', 'PHARMACY', 'MEDICAL', 'CLINIC', 'DOCTOR', 'APOLLO', 'MEDPLUS'],
-        'Digital Services': ['PAYTM', 'PHONEPE', 'GPAY', 'GOOGLE', 'MICROSOFT', 'APPLE', 'ADOBE'],
-    }
-    
-    # Count matches for each category
-    category_counts = {cat: 0 for cat in categories}
-    
+    # Count matches for each category (keywords.json), in file order for ties
+    category_counts = dict.fromkeys(KEYWORDS.categories, 0)
+
     for merchant in merchants:
-        merchant_upper = merchant.upper()
-        for category, keywords in categories.items():
-            if any(keyword in merchant_upper for keyword in keywords):
-                category_counts[category] += 1
+        for category in KEYWORDS.merchant_categories(merchant):
+            category_counts[category] += 1
     
     # Return the category with most matches
-    if max(category_counts.values()) > 0:
+    if category_counts and max(category_counts.values()) > 0:
         top_category = max(category_counts, key=category_counts.get)
         return top_category
     
@@ -0,0 +1,137 @@
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional
+from models import ParsedRecord
+from parser import RULES_VERSION, reextract
+from storage import RecordStore
+
+# Records re-extracted and written back per store write
+REEXTRACT_BATCH_SIZE = 200
+
+
+def is_stale(record: ParsedRecord) -> bool:
+    """
+    Whether the record was extracted with older field rules than the current
+    ones, or ran out of time budget on some fields.
+    """
+    return record.status == 'PARSED' and (record.rules_version != RULES_VERSION or bool(record.partial_fields))
+
+
+class ReextractJob:
+    """
+    One pass over the record store that refreshes stale records from their
+    stored page text. Records without stored text (parsed before it was kept,
+    or whose text is gone) are counted as missing and left as they are.
+    """
+
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.status = 'RUNNING'
+        self.rules_version = RULES_VERSION
+        self.created_at = datetime.utcnow().isoformat() + 'Z'
+        self.finished_at = None
+        self.scanned = 0
+        self.updated = 0
+        self.missing_text = 0
+        self.failed = 0
+        self.error = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status != 'RUNNING'
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'rules_version': self.rules_version,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at,
+                'scanned': self.scanned,
+                'updated': self.updated,
+                'missing_text': self.missing_text,
+                'failed': self.failed,
+                'error': self.error
+            }
+
+
+class Reextractor:
+    """
+    Runs ReextractJobs on a background thread, one at a time: starting a job
+    while one is running returns the running job. Re-extracted records are
+    written back in place with replace_many, then handed to `on_records`
+    (the transaction store).
+    """
+
+    def __init__(
+        self,
+        store: RecordStore,
+        on_records: Optional[Callable[[List[ParsedRecord]], None]] = None,
+        batch_size: int = REEXTRACT_BATCH_SIZE
+    ):
+        self.store = store
+        self.on_records = on_records
+        self.batch_size = batch_size
+        self._current: Optional[ReextractJob] = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> ReextractJob:
+        with self._lock:
+            if self._current is not None and not self._current.finished:
+                return self._current
+            job = self._current = ReextractJob()
+            self._jobs[job.id] = job
+        thread = threading.Thread(target=self._run, args=(job,), name='reextract', daemon=True)
+        thread.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[ReextractJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ReextractJob) -> None:
+        try:
+            batch = []
+            for record in self.store.iter_records(self.batch_size):
+                with job._lock:
+                    job.scanned += 1
+                if is_stale(record):
+                    batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self._refresh(job, batch)
+                    batch = []
+            if batch:
+                self._refresh(job, batch)
+            status = 'COMPLETED'
+        except Exception as e:
+            job.error = str(e)
+            status = 'FAILED'
+        with job._lock:
+            job.status = status
+            job.finished_at = datetime.utcnow().isoformat() + 'Z'
+
+    def _refresh(self, job: ReextractJob, batch: List[ParsedRecord]) -> None:
+        texts = self.store.page_texts({record.content_hash for record in batch if record.content_hash})
+        updated = []
+        missing = failed = 0
+        for record in batch:
+            page_texts = texts.get(record.content_hash)
+            if page_texts is None:
+                missing += 1
+                continue
+            try:
+                updated.append(reextract(record, page_texts))
+            except Exception:
+                failed += 1
+
+        self.store.replace_many(updated)
+        if self.on_records is not None:
+            self.on_records(updated)
+        with job._lock:
+            job.updated += len(updated)
+            job.missing_text += missing
+            job.failed += failed
@@ -0,0 +1,160 @@
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Merchant names found by extract_merchants count this many times a mention
+# in the statement text
+MERCHANT_WEIGHT = 3
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# Letters and digits, case-folded: the same tokens SQLite's unicode61 FTS5 tokenizer produces
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+_MAX_TF = 65535
+
+
+class SearchHit(NamedTuple):
+    id: str
+    score: float
+
+
+class SearchPage(NamedTuple):
+    hits: List[SearchHit]
+    total: int
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def document_text(filename: str, issuer: str, pages: Iterable[str]) -> str:
+    """
+    The text a record is indexed under: its filename, issuer and page text.
+    """
+    return '\n'.join((filename or '', issuer or '', *pages))
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    An FTS5 MATCH expression requiring every query token, quoted so user
+    input is never read as query syntax. None when the query has no tokens.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"' for token in dict.fromkeys(tokens))
+
+
+class MemorySearchIndex:
+    """
+    Inverted index over statement text and merchant names, ranked with BM25.
+
+    Each token's postings are two typed arrays, document numbers and term
+    frequencies, appended in document order so lookups can bisect them.
+    Re-indexing a record retires its old document instead of rewriting
+    postings; retired documents are skipped at query time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs: Dict[str, array] = {}
+            self._tfs: Dict[str, array] = {}
+            self._lengths = array('I')
+            self._ids: List[str] = []
+            self._current: Dict[str, int] = {}
+            self._retired = set()
+            self._total_length = 0
+
+    def add(self, record_id: str, text: str, merchants: Iterable[str] = ()) -> None:
+        """
+        Index (or re-index) a record.
+        """
+        counts = Counter(tokenize(text))
+        for merchant in merchants:
+            for token in tokenize(merchant):
+                counts[token] += MERCHANT_WEIGHT
+        length = sum(counts.values())
+
+        with self._lock:
+            self._retire(record_id)
+            doc = len(self._ids)
+            self._ids.append(record_id)
+            self._lengths.append(length)
+            self._current[record_id] = doc
+            self._total_length += length
+            for token, tf in counts.items():
+                docs = self._docs.get(token)
+                if docs is None:
+                    docs = self._docs[token] = array('I')
+                    self._tfs[token] = array('H')
+                docs.append(doc)
+                self._tfs[token].append(min(tf, _MAX_TF))
+
+    def search(self, query: str, limit: int, offset: int = 0) -> SearchPage:
+        """
+        Records containing every query token, best BM25 score first.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return SearchPage([], 0)
+
+        with self._lock:
+            postings = []
+            for token in tokens:
+                if token not in self._docs:
+                    return SearchPage([], 0)
+                postings.append((self._docs[token], self._tfs[token]))
+            # Walk the rarest token's postings and look the others up
+            postings.sort(key=lambda posting: len(posting[0]))
+            live = len(self._current)
+            average = self._total_length / live if live else 1.0
+            retired = self._retired
+            lengths = self._lengths
+            idfs = [self._idf(len(docs), live) for docs, _ in postings]
+
+            scored = []
+            rarest_docs, rarest_tfs = postings[0]
+            for position, doc in enumerate(rarest_docs):
+                if doc in retired:
+                    continue
+                norm = _K1 * (1 - _B + _B * lengths[doc] / average)
+                tf = rarest_tfs[position]
+                score = idfs[0] * tf * (_K1 + 1) / (tf + norm)
+                for (docs, tfs), idf in zip(postings[1:], idfs[1:]):
+                    index = bisect_left(docs, doc)
+                    if index == len(docs) or docs[index] != doc:
+                        break
+                    tf = tfs[index]
+                    score += idf * tf * (_K1 + 1) / (tf + norm)
+                else:
+                    scored.append((score, doc))
+            ids = self._ids
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return SearchPage(
+            [SearchHit(ids[doc], round(score, 4)) for score, doc in scored[offset:offset + limit]],
+            len(scored)
+        )
+
+    def _retire(self, record_id: str) -> None:
+        doc = self._current.pop(record_id, None)
+        if doc is not None:
+            self._retired.add(doc)
+            self._total_length -= self._lengths[doc]
+
+    @staticmethod
+    def _idf(frequency: int, documents: int) -> float:
+        # Retired documents still in the postings make this a slight overestimate
+        frequency = min(frequency, documents)
+        return math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+from typing import BinaryIO, Iterator, Optional, Union
+
+# Where uploads are spooled; defaults to the system temp directory
+SPOOL_DIR = os.environ.get('SPOOL_DIR') or None
+
+# Bytes copied or hashed per read
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLarge(ValueError):
+    pass
+
+
+class PdfSource:
+    """
+    A PDF held either in memory or in a file on disk.
+
+    Every reader opens its own handle onto the same bytes, so pdfplumber,
+    PyPDF2 and OCR share one copy instead of each getting their own. A
+    file-backed source pickles as just its path (and digest, once known), so
+    the PDF's bytes never cross into a pool worker.
+    """
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        owned: bool = False,
+        digest: Optional[str] = None
+    ):
+        if (data is None) == (path is None):
+            raise ValueError('PdfSource needs either data or a path')
+        self.data = data
+        self.path = path
+        # Owned files are spooled copies, deleted by discard()
+        self.owned = owned
+        # SHA-256 hex digest, when already known (spool() hashes as it copies)
+        self._digest = digest
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PdfSource':
+        return cls(data=data)
+
+    @classmethod
+    def from_path(cls, path: str) -> 'PdfSource':
+        return cls(path=path)
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+
+    def open(self) -> BinaryIO:
+        """
+        A new binary handle positioned at the start of the PDF.
+        """
+        if self.data is not None:
+            # BytesIO shares the bytes object until something writes to it
+            return BytesIO(self.data)
+        return open(self.path, 'rb')
+
+    def digest(self) -> str:
+        """
+        SHA-256 hex digest of the PDF, read in chunks once and then remembered.
+        """
+        if self._digest is None:
+            if self.data is not None:
+                self._digest = hashlib.sha256(self.data).hexdigest()
+            else:
+                digest = hashlib.sha256()
+                with open(self.path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                self._digest = digest.hexdigest()
+        return self._digest
+
+    @contextmanager
+    def as_path(self) -> Iterator[str]:
+        """
+        A filesystem path to the PDF, writing a temporary copy only when the
+        source lives in memory.
+        """
+        if self.path is not None:
+            yield self.path
+            return
+        fd, path = tempfile.mkstemp(suffix='.pdf', dir=SPOOL_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.data)
+            yield path
+        finally:
+            os.unlink(path)
+
+    def discard(self) -> None:
+        """
+        Delete the spooled file, if this source owns one.
+        """
+        if self.owned and self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.owned = False
+
+
+def as_source(file: Union[bytes, PdfSource]) -> PdfSource:
+    if isinstance(file, PdfSource):
+        return file
+    return PdfSource.from_bytes(file)
+
+
+def spool(stream: BinaryIO, max_bytes: Optional[int] = None) -> PdfSource:
+    """
+    Copy a stream to a temporary file in SPOOL_DIR, chunk by chunk, hashing
+    it on the way. Raises FileTooLarge (and removes the partial file) once
+    more than max_bytes have been read.
+    """
+    fd, path = tempfile.mkstemp(suffix='.pdf', dir=SPOOL_DIR)
+    digest = hashlib.sha256()
+    try:
+        written = 0
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise FileTooLarge(f'File exceeds the {round(max_bytes / (1024 * 1024), 2):g} MB limit')
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return PdfSource(path=path, owned=True, digest=digest.hexdigest())
@@ -0,0 +1,97 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from models import ParsedRecord
+
+# One counter row per (dimension, key):
+#   ('status', 'PARSED'|'FAILED')  every record
+#   ('total', '')                  parsed records
+#   ('issuer', <issuer>)           parsed records per issuer
+#   ('variant', <card variant>)    parsed records with a detected variant
+#   ('category', <category>)       parsed records with a top merchant category
+# Each row holds [statements, total_balance, transaction_count, interest_charges].
+StatsKey = Tuple[str, str]
+STAT_VALUES = ('statements', 'total_balance', 'transaction_count', 'interest_charges')
+
+
+class RecordStats:
+    """
+    Running dashboard aggregates. Records are folded in (or, with sign=-1,
+    backed out) one at a time, so reading the totals never scans the store.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        self._counters: Dict[StatsKey, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0.0])
+        for dimension, key, *values in rows:
+            self._counters[(dimension, key)] = list(values)
+
+    def add(self, record: ParsedRecord, sign: int = 1) -> None:
+        for stats_key, values in record_deltas(record, sign).items():
+            counter = self._counters[stats_key]
+            for i, value in enumerate(values):
+                counter[i] += value
+
+    def add_many(self, records: Iterable[ParsedRecord], sign: int = 1) -> None:
+        for record in records:
+            self.add(record, sign)
+
+    def rows(self) -> List[tuple]:
+        """
+        (dimension, key, statements, total_balance, transaction_count, interest_charges) tuples.
+        """
+        return [(dimension, key, *values) for (dimension, key), values in self._counters.items()]
+
+    def to_dict(self) -> dict:
+        counters = {k: v for k, v in self._counters.items() if v[0] > 0}
+        parsed = counters.get(('status', 'PARSED'), [0])[0]
+        failed = counters.get(('status', 'FAILED'), [0])[0]
+        total = counters.get(('total', ''), [0, 0.0, 0, 0.0])
+        by_issuer = {
+            key: {
+                'statements': values[0],
+                'total_balance': round(values[1], 2),
+                'transaction_count': values[2],
+                'interest_charges': round(values[3], 2)
+            }
+            for (dimension, key), values in sorted(counters.items())
+            if dimension == 'issuer'
+        }
+        return {
+            'total_records': parsed + failed,
+            'parsed': parsed,
+            'failed': failed,
+            'parsed_ratio': round(parsed / (parsed + failed), 4) if parsed + failed else 0.0,
+            'total_balance': round(total[1], 2),
+            'total_transactions': total[2],
+            'total_interest': round(total[3], 2),
+            'by_issuer': by_issuer,
+            'by_variant': _counts(counters, 'variant'),
+            'by_category': _counts(counters, 'category'),
+        }
+
+
+def record_deltas(record: ParsedRecord, sign: int = 1) -> Dict[StatsKey, tuple]:
+    """
+    The counter changes one record contributes.
+    """
+    deltas = {('status', record.status): (sign, 0.0, 0, 0.0)}
+    if record.status != 'PARSED':
+        return deltas
+
+    amounts = (
+        sign,
+        sign * (record.total_balance or 0.0),
+        sign * (record.transaction_count or 0),
+        sign * (record.interest_charges or 0.0)
+    )
+    deltas[('total', '')] = amounts
+    deltas[('issuer', record.issuer)] = amounts
+    if record.card_variant:
+        deltas[('variant', record.card_variant)] = (sign, 0.0, 0, 0.0)
+    if record.top_merchant_category:
+        deltas[('category', record.top_merchant_category)] = (sign, 0.0, 0, 0.0)
+    return deltas
+
+
+def _counts(counters: Dict[StatsKey, List[float]], dimension: str) -> Dict[str, int]:
+    items = [(key, values[0]) for (d, key), values in counters.items() if d == dimension]
+    return dict(sorted(items, key=lambda item: (-item[1], item[0])))
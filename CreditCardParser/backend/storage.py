@@ -0,0 +1,686 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from models import ParsedRecord
+from search import MERCHANT_WEIGHT, MemorySearchIndex, SearchPage, SearchHit, document_text, match_expression
+from stats import RecordStats
+
+RECORD_COLUMNS = [f.name for f in fields(ParsedRecord)]
+
+# Columns added to the records table since it was first created, with their types
+ADDED_COLUMNS = (
+    ('text_backend', 'TEXT'), ('content_hash', 'TEXT'), ('rules_version', 'TEXT'), ('partial_fields', 'TEXT')
+)
+
+# Columns /api/records can sort by, with the value NULLs are coalesced to
+SORTABLE_COLUMNS = {
+    'uploaded_at': '',
+    'filename': '',
+    'issuer': '',
+    'total_balance': 0,
+    'transaction_count': 0,
+    'interest_charges': 0,
+}
+
+# Sortable columns that can never be NULL
+NOT_NULL_COLUMNS = ('uploaded_at', 'filename', 'issuer')
+
+# Columns the free-text filter matches against
+SEARCHABLE_COLUMNS = ('filename', 'issuer', 'card_last4')
+
+
+class RecordQuery(NamedTuple):
+    issuer: Optional[str] = None
+    status: Optional[str] = None
+    q: Optional[str] = None
+    sort: str = 'uploaded_at'
+    order: str = 'desc'
+    cursor: Optional[str] = None
+    limit: int = 100
+
+
+class RecordPage(NamedTuple):
+    records: List[ParsedRecord]
+    next_cursor: Optional[str]
+    total: int
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class SearchUnavailable(RuntimeError):
+    pass
+
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        is_null, value, seq = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(is_null), value, int(seq)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def _pack_pages(pages: Iterable[str]) -> bytes:
+    return zlib.compress(json.dumps(list(pages)).encode('utf-8'))
+
+
+def _unpack_pages(blob: bytes) -> Tuple[str, ...]:
+    return tuple(json.loads(zlib.decompress(blob)))
+
+
+def _texts(records: List[ParsedRecord]) -> Dict[str, bytes]:
+    # Page text the records carry, compressed, by content hash
+    return {
+        record.content_hash: _pack_pages(record.pages)
+        for record in records
+        if record.pages and record.content_hash
+    }
+
+
+def _sort_key(record: ParsedRecord, sort: str, seq: int) -> tuple:
+    # NULLs always sort last; seq breaks ties so every key is unique
+    value = getattr(record, sort)
+    if value is None:
+        return (1, SORTABLE_COLUMNS[sort], seq)
+    return (0, value, seq)
+
+
+class RecordStore:
+    """
+    Storage interface for parsed records.
+
+    Alongside the records, stores keep the page text records were parsed
+    from, compressed and keyed by content hash, so fields can be extracted
+    again when the rules change without reading the PDFs, and a full-text
+    index over that text and the merchant names, updated in the same write.
+    """
+
+    def add(self, record: ParsedRecord) -> None:
+        self.add_many([record])
+
+    def add_many(self, records: Iterable[ParsedRecord]) -> None:
+        """
+        Add records, and the page text they carry.
+        """
+        raise NotImplementedError
+
+    def replace_many(self, records: Iterable[ParsedRecord]) -> None:
+        """
+        Overwrite the stored records with the same ids, keeping their place in
+        insertion order. Records that are no longer stored are ignored.
+        """
+        raise NotImplementedError
+
+    def page_texts(self, content_hashes: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        The stored page text for each of the content hashes that has any.
+        """
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+        """
+        Ids of the records whose statement text, filename, issuer or merchant
+        names contain every word of the query, best match first.
+        """
+        raise NotImplementedError
+
+    def all(self) -> List[ParsedRecord]:
+        """
+        All records in insertion order.
+        """
+        raise NotImplementedError
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[ParsedRecord]:
+        """
+        All records in insertion order, read in batches rather than materialized.
+        """
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def query(self, query: RecordQuery) -> RecordPage:
+        """
+        One page of records matching the filters, in the requested order.
+        Pass the returned next_cursor back to get the following page.
+        """
+        raise NotImplementedError
+
+    def version(self) -> int:
+        """
+        A number that changes whenever the stored records change.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Dashboard aggregates, maintained as records are written rather than
+        computed by scanning them.
+        """
+        raise NotImplementedError
+
+
+class MemoryRecordStore(RecordStore):
+    """
+    Process-local list of records; lost on restart and not shared between workers.
+    """
+
+    def __init__(self):
+        self._records = []
+        self._texts: Dict[str, bytes] = {}
+        self._index = MemorySearchIndex()
+        self._stats = RecordStats()
+        # Start from the clock so versions (and ETags) are not reused after a restart
+        self._version = time.time_ns()
+        self._lock = threading.Lock()
+
+    def add_many(self, records: Iterable[ParsedRecord]) -> None:
+        records = list(records)
+        texts = _texts(records)
+        with self._lock:
+            self._records.extend(records)
+            self._texts.update(texts)
+            self._stats.add_many(records)
+            # Indexed under the lock, like clear(), so a clear cannot come between
+            for record in records:
+                self._index.add(record.id, document_text(record.filename, record.issuer, record.pages), record.merchants)
+            self._version += 1
+
+    def replace_many(self, records: Iterable[ParsedRecord]) -> None:
+        updates = {record.id: record for record in records}
+        replaced = []
+        with self._lock:
+            for index, record in enumerate(self._records):
+                update = updates.get(record.id)
+                if update is not None:
+                    self._records[index] = update
+                    self._stats.add(record, sign=-1)
+                    self._stats.add(update)
+                    replaced.append(update)
+            for record in replaced:
+                blob = self._texts.get(record.content_hash) if record.content_hash else None
+                pages = _unpack_pages(blob) if blob is not None else ()
+                self._index.add(record.id, document_text(record.filename, record.issuer, pages), record.merchants)
+            self._version += 1
+
+    def page_texts(self, content_hashes: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        with self._lock:
+            blobs = {key: self._texts[key] for key in content_hashes if key in self._texts}
+        return {key: _unpack_pages(blob) for key, blob in blobs.items()}
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+        return self._index.search(query, limit, offset)
+
+    def all(self) -> List[ParsedRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[ParsedRecord]:
+        # clear() swaps in a new list, add_many() only appends and
+        # replace_many() only swaps in newer versions of the same records, so
+        # the first `length` entries of this list stay the same records
+        with self._lock:
+            records, length = self._records, len(self._records)
+        for index in range(length):
+            yield records[index]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = []
+            self._texts = {}
+            self._index.clear()
+            self._stats = RecordStats()
+            self._version += 1
+
+    def query(self, query: RecordQuery) -> RecordPage:
+        with self._lock:
+            records = list(self._records)
+
+        needle = query.q.lower() if query.q else None
+        matches = []
+        for seq, record in enumerate(records):
+            if query.issuer and record.issuer != query.issuer:
+                continue
+            if query.status and record.status != query.status:
+                continue
+            if needle and not any(
+                needle in (getattr(record, column) or '').lower() for column in SEARCHABLE_COLUMNS
+            ):
+                continue
+            matches.append((_sort_key(record, query.sort, seq), record))
+
+        descending = query.order == 'desc'
+        # NULLs stay last in both directions
+        present = sorted((m for m in matches if not m[0][0]), key=lambda m: m[0], reverse=descending)
+        missing = sorted((m for m in matches if m[0][0]), key=lambda m: m[0], reverse=descending)
+        matches = present + missing
+        total = len(matches)
+
+        if query.cursor:
+            after = decode_cursor(query.cursor)
+            matches = [m for m in matches if _is_after(m[0], after, descending)]
+
+        page = matches[:query.limit]
+        next_cursor = encode_cursor(page[-1][0]) if len(matches) > query.limit else None
+        return RecordPage([record for _, record in page], next_cursor, total)
+
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats.to_dict()
+
+
+def _is_after(key: tuple, cursor: tuple, descending: bool) -> bool:
+    if key[0] != cursor[0]:
+        return key[0] > cursor[0]
+    return key[1:] < cursor[1:] if descending else key[1:] > cursor[1:]
+
+
+class SQLiteRecordStore(RecordStore):
+    """
+    Records persisted in SQLite (WAL mode), safe to share between threads and
+    between worker processes using the same database file.
+
+    Each thread of each process gets its own connection; WAL lets readers run
+    alongside the single writer, and busy_timeout makes concurrent writers
+    wait for the lock instead of failing.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        # Full-text search needs SQLite's FTS5 extension, which almost every build has
+        self.searchable = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def add_many(self, records: Iterable[ParsedRecord]) -> None:
+        records = list(records)
+        rows = [tuple(getattr(record, column) for column in RECORD_COLUMNS) for record in records]
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in RECORD_COLUMNS)
+        texts = _texts(records)
+        documents = [self._document(record, record.pages) for record in records]
+        with self._transaction() as conn:
+            # Back out the aggregates of any rows being replaced
+            delta = RecordStats()
+            delta.add_many(self._existing(conn, [record.id for record in records]), sign=-1)
+            delta.add_many(records)
+            if self.searchable:
+                # Replaced rows get a new seq, so their old documents go
+                self._delete_documents(conn, [record.id for record in records])
+            conn.executemany(
+                f"INSERT OR REPLACE INTO records ({', '.join(RECORD_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO record_texts (content_hash, pages) VALUES (?, ?)',
+                texts.items()
+            )
+            if self.searchable:
+                conn.executemany(
+                    'INSERT INTO record_search (rowid, text, merchants) SELECT seq, ?, ? FROM records WHERE id = ?',
+                    documents
+                )
+            self._apply_stats(conn, delta)
+            self._bump_version(conn)
+
+    def replace_many(self, records: Iterable[ParsedRecord]) -> None:
+        records = list(records)
+        if not records:
+            return
+        # UPDATE rather than INSERT OR REPLACE, which would give the rows a new seq
+        columns = [column for column in RECORD_COLUMNS if column != 'id']
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        texts = self.page_texts({record.content_hash for record in records if record.content_hash})
+        documents = [self._document(record, texts.get(record.content_hash, ())) for record in records]
+        with self._transaction() as conn:
+            existing = self._existing(conn, [record.id for record in records])
+            stored = {record.id for record in existing}
+            records = [record for record in records if record.id in stored]
+            delta = RecordStats()
+            delta.add_many(existing, sign=-1)
+            delta.add_many(records)
+            conn.executemany(
+                f'UPDATE records SET {assignments} WHERE id = ?',
+                [tuple(getattr(record, column) for column in columns) + (record.id,) for record in records]
+            )
+            if self.searchable:
+                conn.executemany(
+                    'UPDATE record_search SET text = ?, merchants = ? '
+                    'WHERE rowid = (SELECT seq FROM records WHERE id = ?)',
+                    [document for document in documents if document[2] in stored]
+                )
+            self._apply_stats(conn, delta)
+            self._bump_version(conn)
+
+    def page_texts(self, content_hashes: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        content_hashes = list(content_hashes)
+        texts = {}
+        conn = self._connection()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(content_hashes), 500):
+            chunk = content_hashes[start:start + 500]
+            cursor = conn.execute(
+                f"SELECT content_hash, pages FROM record_texts "
+                f"WHERE content_hash IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            )
+            texts.update((key, _unpack_pages(blob)) for key, blob in cursor)
+        return texts
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+        if not self.searchable:
+            raise SearchUnavailable('Search needs SQLite built with FTS5')
+        expression = match_expression(query)
+        if expression is None:
+            return SearchPage([], 0)
+        conn = self._connection()
+        total = conn.execute(
+            'SELECT COUNT(*) FROM record_search WHERE record_search MATCH ?', (expression,)
+        ).fetchone()[0]
+        # bm25() is lower for better matches; merchant names weigh more than the text
+        rank = f'bm25(record_search, 1.0, {float(MERCHANT_WEIGHT)})'
+        rows = conn.execute(
+            f'SELECT records.id, {rank} FROM record_search JOIN records ON records.seq = record_search.rowid '
+            f'WHERE record_search MATCH ? ORDER BY {rank}, records.seq LIMIT ? OFFSET ?',
+            (expression, limit, offset)
+        ).fetchall()
+        return SearchPage([SearchHit(record_id, round(-rank, 4)) for record_id, rank in rows], total)
+
+    def all(self) -> List[ParsedRecord]:
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(RECORD_COLUMNS)} FROM records ORDER BY seq"
+        )
+        return [self._to_record(row) for row in cursor]
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[ParsedRecord]:
+        # Keyset batches keep no read transaction open between yields
+        last_seq = 0
+        while True:
+            rows = self._connection().execute(
+                f"SELECT {', '.join(RECORD_COLUMNS)}, seq FROM records WHERE seq > ? ORDER BY seq LIMIT ?",
+                (last_seq, batch_size)
+            ).fetchall()
+            for row in rows:
+                yield self._to_record(row[:-1])
+            if len(rows) < batch_size:
+                return
+            last_seq = rows[-1][-1]
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM records')
+            conn.execute('DELETE FROM record_texts')
+            if self.searchable:
+                conn.execute('DELETE FROM record_search')
+            conn.execute('DELETE FROM record_stats')
+            self._bump_version(conn)
+
+    def query(self, query: RecordQuery) -> RecordPage:
+        where, params = [], []
+        if query.issuer:
+            where.append('issuer = ?')
+            params.append(query.issuer)
+        if query.status:
+            where.append('status = ?')
+            params.append(query.status)
+        if query.q:
+            pattern = '%' + query.q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            where.append('(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in SEARCHABLE_COLUMNS) + ')')
+            params.extend([pattern] * len(SEARCHABLE_COLUMNS))
+
+        conn = self._connection()
+        filters = f"WHERE {' AND '.join(where)}" if where else ''
+        total = conn.execute(f'SELECT COUNT(*) FROM records {filters}', params).fetchone()[0]
+
+        column = query.sort
+        direction = 'DESC' if query.order == 'desc' else 'ASC'
+        compare = '<' if query.order == 'desc' else '>'
+        if column in NOT_NULL_COLUMNS:
+            # Plain column order so the index on the column can be used
+            is_null, value, ordering = '0', column, ''
+        else:
+            is_null, value = f'({column} IS NULL)', f'COALESCE({column}, {SORTABLE_COLUMNS[column]!r})'
+            ordering = f'{is_null} ASC, '
+
+        if query.cursor:
+            cursor_null, cursor_value, cursor_seq = decode_cursor(query.cursor)
+            where.append(
+                f'({is_null} > ? OR ({is_null} = ? AND ({value} {compare} ? '
+                f'OR ({value} = ? AND seq {compare} ?))))'
+            )
+            params += [cursor_null, cursor_null, cursor_value, cursor_value, cursor_seq]
+
+        filters = f"WHERE {' AND '.join(where)}" if where else ''
+        rows = conn.execute(
+            f"SELECT {', '.join(RECORD_COLUMNS)}, {is_null}, {value}, seq FROM records {filters} "
+            f"ORDER BY {ordering}{value} {direction}, seq {direction} LIMIT ?",
+            params + [query.limit + 1]
+        ).fetchall()
+
+        page = rows[:query.limit]
+        next_cursor = None
+        if len(rows) > query.limit:
+            next_cursor = encode_cursor(tuple(page[-1][len(RECORD_COLUMNS):]))
+        return RecordPage([self._to_record(row[:len(RECORD_COLUMNS)]) for row in page], next_cursor, total)
+
+    def version(self) -> int:
+        row = self._connection().execute(
+            "SELECT value FROM store_meta WHERE key = 'version'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> dict:
+        rows = self._connection().execute(
+            'SELECT dimension, key, statements, total_balance, transaction_count, interest_charges '
+            'FROM record_stats'
+        )
+        return RecordStats(rows).to_dict()
+
+    def _existing(self, conn: sqlite3.Connection, ids: List[str]) -> List[ParsedRecord]:
+        existing = []
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor = conn.execute(
+                f"SELECT {', '.join(RECORD_COLUMNS)} FROM records WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            )
+            existing.extend(self._to_record(row) for row in cursor)
+        return existing
+
+    def _document(self, record: ParsedRecord, pages: Iterable[str]) -> tuple:
+        return document_text(record.filename, record.issuer, pages), ' '.join(record.merchants), record.id
+
+    def _delete_documents(self, conn: sqlite3.Connection, ids: List[str]) -> None:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            conn.execute(
+                f"DELETE FROM record_search WHERE rowid IN "
+                f"(SELECT seq FROM records WHERE id IN ({', '.join('?' for _ in chunk)}))",
+                chunk
+            )
+
+    def _apply_stats(self, conn: sqlite3.Connection, delta: RecordStats) -> None:
+        conn.executemany(
+            """
+            INSERT INTO record_stats (dimension, key, statements, total_balance, transaction_count, interest_charges)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(dimension, key) DO UPDATE SET
+                statements = statements + excluded.statements,
+                total_balance = total_balance + excluded.total_balance,
+                transaction_count = transaction_count + excluded.transaction_count,
+                interest_charges = interest_charges + excluded.interest_charges
+            """,
+            delta.rows()
+        )
+
+    def _bump_version(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('version', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    def _to_record(self, row) -> ParsedRecord:
+        return ParsedRecord(**dict(zip(RECORD_COLUMNS, row)))
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not be shared across threads or inherited through fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def _create_schema(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    filename TEXT NOT NULL,
+                    issuer TEXT NOT NULL,
+                    card_last4 TEXT,
+                    card_variant TEXT,
+                    total_balance REAL,
+                    transaction_count INTEGER,
+                    interest_charges REAL,
+                    top_merchant_category TEXT,
+                    text_backend TEXT,
+                    content_hash TEXT,
+                    rules_version TEXT,
+                    partial_fields TEXT,
+                    uploaded_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT
+                )
+            """)
+            # Databases created before a column existed gain it
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(records)')}
+            for column, column_type in ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE records ADD COLUMN {column} {column_type}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_records_issuer ON records (issuer)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_records_status ON records (status)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_records_card_last4 ON records (card_last4)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_records_uploaded_at ON records (uploaded_at)')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS record_texts (
+                    content_hash TEXT PRIMARY KEY,
+                    pages BLOB NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS record_stats (
+                    dimension TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    statements INTEGER NOT NULL,
+                    total_balance REAL NOT NULL,
+                    transaction_count INTEGER NOT NULL,
+                    interest_charges REAL NOT NULL,
+                    PRIMARY KEY (dimension, key)
+                )
+            """)
+            # Databases created before record_stats existed are backfilled once
+            has_stats = conn.execute('SELECT 1 FROM record_stats LIMIT 1').fetchone()
+            if not has_stats:
+                backfill = RecordStats()
+                cursor = conn.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM records")
+                backfill.add_many(self._to_record(row) for row in cursor)
+                self._apply_stats(conn, backfill)
+
+            has_search = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'record_search'"
+            ).fetchone()
+            try:
+                # Documents are keyed by the record's seq
+                conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS record_search USING fts5(text, merchants)')
+                self.searchable = True
+            except sqlite3.OperationalError:
+                return
+            if not has_search:
+                # Databases created before the index existed are indexed from their
+                # stored text once; merchant names are only in the text for those
+                rows = conn.execute(
+                    'SELECT records.seq, records.filename, records.issuer, record_texts.pages FROM records '
+                    'LEFT JOIN record_texts ON record_texts.content_hash = records.content_hash'
+                ).fetchall()
+                conn.executemany(
+                    "INSERT INTO record_search (rowid, text, merchants) VALUES (?, ?, '')",
+                    [
+                        (seq, document_text(filename, issuer, _unpack_pages(pages) if pages else ()))
+                        for seq, filename, issuer, pages in rows
+                    ]
+                )
+
+
+class _Transaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block, so a batch of writes
+    takes the write lock once and lands atomically.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
+
+
+def create_store() -> RecordStore:
+    """
+    Build the record store from USE_SQLITE and DATABASE_PATH.
+    """
+    if os.environ.get('USE_SQLITE', 'false').lower() == 'true':
+        return SQLiteRecordStore(os.environ.get('DATABASE_PATH', './data/statements.db'))
+    return MemoryRecordStore()
@@ -0,0 +1,56 @@
+"""
+ParseExecutor recovery from a worker that dies mid-parse.
+
+    cd CreditCardParser/backend && python -m pytest tests
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import backends  # noqa: E402
+import executor  # noqa: E402
+from executor import ParseExecutor  # noqa: E402
+from metrics import Trace  # noqa: E402
+from models import ParsedRecord  # noqa: E402
+
+
+def _stub_worker(file_bytes, filename, mode):
+    # Stands in for _parse_worker inside the pool; crash.pdf kills its process
+    if filename == 'crash.pdf':
+        os._exit(1)
+    return ParsedRecord.create(filename=filename, status='PARSED'), Trace()
+
+
+class WorkerCrashTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(executor, '_parse_worker', _stub_worker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.executor = ParseExecutor(mode='process', max_workers=2, timeout=30)
+        self.addCleanup(self.executor.shutdown)
+
+    def assert_recovers(self):
+        crashed = self.executor.parse_many([(b'%PDF', 'crash.pdf')])
+        self.assertEqual(crashed[0].status, 'FAILED')
+        self.assertEqual(crashed[0].error, 'Parser worker crashed')
+
+        # The broken pool was replaced and every worker slot given back
+        records = self.executor.parse_many([(b'%PDF', 'a.pdf'), (b'%PDF', 'b.pdf')])
+        self.assertEqual([record.status for record in records], ['PARSED', 'PARSED'])
+        self.assertEqual(self.executor._slots._value, self.executor.max_workers)
+
+    def test_crash_fails_the_file_and_keeps_the_pool(self):
+        self.assert_recovers()
+
+    def test_crash_recovery_without_cancel_futures(self):
+        # Python 3.8: Executor.shutdown has no cancel_futures
+        with mock.patch.object(backends, '_CANCEL_FUTURES', False):
+            self.assert_recovers()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+import re
+import threading
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from keywords import KEYWORDS
+
+# Vectorized aggregation (optional); plain column loops otherwise
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+AGGREGATE_DIMENSIONS = ('category', 'month', 'merchant')
+
+OTHER_CATEGORY = 'Other'
+
+
+class Transaction(NamedTuple):
+    date: str  # ISO date
+    description: str
+    amount: float
+    credit: bool
+
+    def to_dict(self) -> dict:
+        return {
+            'date': self.date,
+            'description': self.description,
+            'amount': self.amount,
+            'type': 'CR' if self.credit else 'DR',
+        }
+
+
+# A transaction line starts with its date: 17/04/2021, 17-04-21, 05-NOV-20. Spend
+# chart labels printed beside the table ('77%', 'Dining-10%') may come first.
+_LINE_DATE_RE = re.compile(r'\s*(?:\S*\d%\s+)*(\d{1,2})[/-](\d{1,2}|[A-Za-z]{3})[/-](\d{4}|\d{2})\b')
+# Amounts always carry paise; an optional Cr/Dr marker follows
+_AMOUNT_RE = re.compile(r'(?<![\w.,])(-?)([\d,]*\d\.\d{2})(?![\d.])(?:\s*(CR|DR)\b)?', re.IGNORECASE)
+_REFERENCE_RE = re.compile(r'\(Ref#[^)]*\)', re.IGNORECASE)
+# Reference numbers before the description, reward points after it
+_LEADING_REF_RE = re.compile(r'^(?:\d{6,}\s+)+')
+_TRAILING_INT_RE = re.compile(r'(?:\s+-?[\d,]+(?:\.\d{2})?)+$')
+_MONTHS = {name: number for number, name in enumerate(
+    ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'), start=1
+)}
+
+
+def parse_transaction_line(line: str) -> Optional[Transaction]:
+    """
+    A transaction from one statement line, or None when the line is not one.
+
+    The line must start with a date and contain an amount with paise. Of
+    several amount columns (international amount, cashback) the first
+    non-zero one is the transaction amount; a CR marker or a minus sign
+    makes it a credit.
+    """
+    m = _LINE_DATE_RE.match(line)
+    if m is None:
+        return None
+    day = _parse_date(*m.groups())
+    if day is None:
+        return None
+
+    rest = _REFERENCE_RE.sub(' ', line[m.end():])
+    for amount_match in _AMOUNT_RE.finditer(rest):
+        amount = float(amount_match.group(2).replace(',', ''))
+        if amount == 0:
+            continue
+        description = _TRAILING_INT_RE.sub('', _LEADING_REF_RE.sub('', rest[:amount_match.start()].strip()))
+        description = ' '.join(description.split())
+        if not any(char.isalpha() for char in description):
+            return None
+        credit = bool(amount_match.group(1)) or (amount_match.group(3) or '').upper() == 'CR'
+        return Transaction(day.isoformat(), description, round(amount, 2), credit)
+    return None
+
+
+def extract_transactions(page_texts: Iterable[str]) -> List[Transaction]:
+    """
+    Transaction rows from the text of each page, line by line.
+
+    The rows come from the page text of whichever backend read the page,
+    not from pdfplumber's table or word boxes, so they can be extracted
+    again from stored text. pdfplumber builds each line from words sharing
+    a baseline, so a row's date, description and amount columns arrive on
+    one line; PDFium (fast and balanced modes) keeps content-stream order,
+    which can split or merge rows on some layouts.
+    """
+    rows = []
+    for text in page_texts:
+        for line in text.splitlines():
+            row = parse_transaction_line(line)
+            if row is not None:
+                rows.append(row)
+    return rows
+
+
+def _parse_date(day: str, month: str, year: str) -> Optional[date]:
+    try:
+        month_number = int(month) if month.isdigit() else _MONTHS[month.upper()]
+        year_number = int(year) if len(year) == 4 else 2000 + int(year)
+        return date(year_number, month_number, int(day))
+    except (KeyError, ValueError):
+        return None
+
+
+def categorize_description(description: str) -> str:
+    """
+    The first category (in keywords.json order) whose keywords appear in the description.
+    """
+    found = KEYWORDS.merchant_categories(description)
+    for category in KEYWORDS.categories:
+        if category in found:
+            return category
+    return OTHER_CATEGORY
+
+
+class TransactionStore:
+    """
+    In-memory columnar store of transaction rows.
+
+    Each column is a typed array (about 20 bytes per row); descriptions and
+    categories are dictionary-encoded, so repeated merchants cost one code.
+    A record's rows are stored contiguously and located by their span.
+    Aggregations run over whole columns, with numpy when it is installed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._day = array('i')        # date.toordinal()
+            self._month = array('H')      # year * 12 + month - 1
+            self._amount = array('d')
+            self._credit = array('b')
+            self._merchant = array('I')   # index into _merchants
+            self._category = array('H')   # index into _categories
+            self._merchants: List[str] = []
+            self._merchant_codes: Dict[str, int] = {}
+            self._categories: List[str] = []
+            self._category_codes: Dict[str, int] = {}
+            # Category code of each merchant, found once when the merchant is first seen
+            self._merchant_category: List[int] = []
+            self._spans: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, record_id: str, rows: Iterable[Transaction]) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            # Record ids are unique; a repeated add would double count
+            if record_id in self._spans:
+                return
+            self._append(record_id, rows)
+
+    def add_records(self, records: Iterable) -> None:
+        """
+        Store the rows each parsed record carries.
+        """
+        for record in records:
+            self.add(record.id, record.transactions)
+
+    def replace_records(self, records: Iterable) -> None:
+        """
+        Store the rows each parsed record carries in place of any rows
+        already stored for it, as when a record is extracted again.
+        """
+        records = [(record.id, list(record.transactions)) for record in records]
+        with self._lock:
+            self._remove({record_id for record_id, _ in records})
+            for record_id, rows in records:
+                if rows:
+                    self._append(record_id, rows)
+
+    def _append(self, record_id: str, rows: List[Transaction]) -> None:
+        start = len(self._amount)
+        for row in rows:
+            day = date.fromisoformat(row.date)
+            merchant = self._merchant_codes.get(row.description)
+            if merchant is None:
+                merchant = self._add_merchant(row.description)
+            self._day.append(day.toordinal())
+            self._month.append(day.year * 12 + day.month - 1)
+            self._amount.append(row.amount)
+            self._credit.append(1 if row.credit else 0)
+            self._merchant.append(merchant)
+            self._category.append(self._merchant_category[merchant])
+        self._spans[record_id] = (start, len(self._amount))
+
+    def _remove(self, record_ids: set) -> None:
+        """
+        Drop the rows of `record_ids`, moving later rows down so each
+        record's span stays contiguous. Merchant codes are kept.
+        """
+        dropped = sorted(self._spans.pop(record_id) for record_id in record_ids if record_id in self._spans)
+        if not dropped:
+            return
+        columns = (self._day, self._month, self._amount, self._credit, self._merchant, self._category)
+        # Delete from the end so earlier offsets stay valid
+        for start, end in reversed(dropped):
+            for column in columns:
+                del column[start:end]
+        for record_id, (start, end) in self._spans.items():
+            shift = sum(e - s for s, e in dropped if e <= start)
+            if shift:
+                self._spans[record_id] = (start - shift, end - shift)
+
+    def rows(self, record_id: str) -> Optional[List[dict]]:
+        """
+        One record's rows, or None when no rows were stored for it.
+        """
+        with self._lock:
+            span = self._spans.get(record_id)
+            if span is None:
+                return None
+            return [
+                {
+                    **Transaction(
+                        date.fromordinal(self._day[i]).isoformat(),
+                        self._merchants[self._merchant[i]],
+                        self._amount[i],
+                        bool(self._credit[i])
+                    ).to_dict(),
+                    'category': self._categories[self._category[i]],
+                }
+                for i in range(*span)
+            ]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._amount)
+
+    def aggregate(self, by: str, limit: Optional[int] = None) -> List[dict]:
+        """
+        Spend (debits), credits and row count per category, month or merchant,
+        largest spend first (months in calendar order).
+        """
+        if by not in AGGREGATE_DIMENSIONS:
+            raise ValueError(f"by must be one of {', '.join(AGGREGATE_DIMENSIONS)}")
+
+        with self._lock:
+            if by == 'category':
+                codes, labels = self._category, list(self._categories)
+            elif by == 'merchant':
+                codes, labels = self._merchant, list(self._merchants)
+            else:
+                codes, labels = self._month, None
+            debits, credits, counts, keys = self._sums(codes)
+
+        if labels is not None:
+            keys = [labels[code] for code in keys]
+        else:
+            keys = [f'{code // 12:04d}-{code % 12 + 1:02d}' for code in keys]
+
+        groups = [
+            {by: key, 'spend': round(debit, 2), 'credits': round(credit, 2), 'transactions': count}
+            for key, debit, credit, count in zip(keys, debits, credits, counts)
+        ]
+        if by == 'month':
+            groups.sort(key=lambda group: group['month'])
+        else:
+            groups.sort(key=lambda group: (-group['spend'], group[by]))
+        return groups[:limit] if limit else groups
+
+    def _sums(self, codes: array) -> Tuple[list, list, list, list]:
+        """
+        Per distinct code: debit sum, credit sum, row count and the code itself.
+        """
+        if not codes:
+            return [], [], [], []
+
+        if NUMPY_AVAILABLE:
+            # Copies, so no buffer export outlives the lock and blocks appends
+            code_column = np.frombuffer(codes, dtype=np.dtype(codes.typecode)).astype(np.int64)
+            amount = np.frombuffer(self._amount, dtype=np.float64).copy()
+            credit = np.frombuffer(self._credit, dtype=np.int8).astype(bool)
+            present, inverse = np.unique(code_column, return_inverse=True)
+            debits = np.bincount(inverse, weights=np.where(credit, 0.0, amount))
+            credits = np.bincount(inverse, weights=np.where(credit, amount, 0.0))
+            counts = np.bincount(inverse)
+            return debits.tolist(), credits.tolist(), counts.tolist(), present.tolist()
+
+        sums: Dict[int, list] = {}
+        for code, amount, credit in zip(codes, self._amount, self._credit):
+            entry = sums.get(code)
+            if entry is None:
+                entry = sums[code] = [0.0, 0.0, 0]
+            entry[1 if credit else 0] += amount
+            entry[2] += 1
+        present = sorted(sums)
+        return (
+            [sums[code][0] for code in present],
+            [sums[code][1] for code in present],
+            [sums[code][2] for code in present],
+            present
+        )
+
+    def _add_merchant(self, description: str) -> int:
+        category = categorize_description(description)
+        category_code = self._category_codes.get(category)
+        if category_code is None:
+            category_code = self._category_codes[category] = len(self._categories)
+            self._categories.append(category)
+        code = self._merchant_codes[description] = len(self._merchants)
+        self._merchants.append(description)
+        self._merchant_category.append(category_code)
+        return code
@@ -0,0 +1,393 @@
+"""
+Benchmark and regression harness for the parsing pipeline.
+
+Parses the sample corpus (CreditStatements/) and the synthetic statements,
+then reports per-stage wall time, peak memory, throughput and field-level
+accuracy against golden expectations. With a baseline it exits non-zero
+when throughput or accuracy regresses, or when any document loses a field
+it matched in the baseline:
+
+    python benchmarks/run.py                   # compare against benchmarks/baseline.json
+    python benchmarks/run.py --save-baseline   # record a new baseline
+    python benchmarks/run.py --update-golden   # add golden values for new corpus files
+
+golden.json holds the expected fields for each corpus file. New files are
+seeded from the parser's output and should then be checked by hand; existing
+entries are never overwritten, so corrected values stay put.
+
+Exit codes: 0 ok, 1 regression, 2 bad arguments or missing inputs.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(HERE, '..', 'backend')
+DEFAULT_CORPUS = os.path.join(HERE, '..', '..', 'CreditStatements')
+GOLDEN_PATH = os.path.join(HERE, 'golden.json')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+
+# Every run must parse from scratch, so the OCR cache is disabled before the
+# backend modules read their configuration
+os.environ['OCR_CACHE_SIZE'] = '0'
+os.environ['OCR_CACHE_DIR'] = ''
+sys.path.insert(0, BACKEND)
+
+import parser  # noqa: E402
+from PyPDF2 import PdfReader  # noqa: E402
+from ocr import OCR_AVAILABLE  # noqa: E402
+if OCR_AVAILABLE:
+    import pytesseract
+import synthetic  # noqa: E402
+
+# Fields compared against golden values
+FIELDS = (
+    'status', 'issuer', 'card_last4', 'card_variant', 'total_balance',
+    'transaction_count', 'interest_charges', 'top_merchant_category'
+)
+
+# parser functions timed as stages of parse_pdf
+STAGES = ('extract_pages', 'detect_issuer', 'extract_transactions', 'extract_fields', 'categorize_merchants')
+
+# Allowed drop before a change counts as a regression. Back-to-back runs on
+# one machine differ by up to about 20% in throughput, so the throughput
+# tolerance sits above that; runs with fewer repeats than the baseline widen
+# it further (see throughput_tolerance)
+THROUGHPUT_TOLERANCE = 0.25
+ACCURACY_TOLERANCE = 0.0
+
+
+class Document(NamedTuple):
+    name: str
+    pdf: bytes
+    pages: int
+    kind: str  # 'corpus' | 'text' | 'scan'
+    expected: Optional[Dict[str, object]]
+
+
+class DocumentResult(NamedTuple):
+    name: str
+    kind: str
+    pages: int
+    wall_ms: float
+    stages_ms: Dict[str, float]
+    peak_kb: float
+    scored: bool
+    mismatches: Dict[str, dict]
+    fields: Dict[str, object]
+
+
+@contextmanager
+def stage_timers(timings: Dict[str, float]):
+    """
+    Wrap the parser's stage functions so each call adds its wall time (ms)
+    to `timings`. parse_pdf looks them up as module globals, so it picks up
+    the wrappers without any change to the parser.
+    """
+    originals = {name: getattr(parser, name) for name in STAGES}
+
+    def timed(name, fn):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+        return wrapper
+
+    for name, fn in originals.items():
+        setattr(parser, name, timed(name, fn))
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(parser, name, fn)
+
+
+def load_documents(corpus_dir: str, page_counts: List[int], scans: bool) -> List[Document]:
+    golden = {}
+    if os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+
+    documents = []
+    if os.path.isdir(corpus_dir):
+        for filename in sorted(os.listdir(corpus_dir)):
+            if not filename.lower().endswith('.pdf'):
+                continue
+            with open(os.path.join(corpus_dir, filename), 'rb') as f:
+                pdf = f.read()
+            documents.append(Document(filename, pdf, _page_count(pdf), 'corpus', golden.get(filename)))
+
+    text_layers = (True, False) if scans else (True,)
+    for statement in synthetic.generate(page_counts=tuple(page_counts), text_layers=text_layers):
+        kind = 'text' if statement.text_layer else 'scan'
+        documents.append(Document(statement.name, statement.pdf, statement.pages, kind, statement.expected))
+    return documents
+
+
+def run_document(document: Document, repeat: int) -> DocumentResult:
+    runs = []
+    for _ in range(repeat):
+        timings = {}
+        with stage_timers(timings):
+            start = time.perf_counter()
+            record = parser.parse_pdf(document.pdf, document.name)
+            wall = (time.perf_counter() - start) * 1000
+        runs.append((wall, timings))
+
+    # Peak memory is measured in a separate pass since tracing slows parsing down
+    tracemalloc.start()
+    parser.parse_pdf(document.pdf, document.name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Report the median run
+    wall, timings = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    fields = {field: getattr(record, field) for field in FIELDS}
+    mismatches = {}
+    if document.expected is not None:
+        for field in FIELDS:
+            if not _same(fields[field], document.expected.get(field)):
+                mismatches[field] = {'expected': document.expected.get(field), 'actual': fields[field]}
+
+    return DocumentResult(
+        name=document.name,
+        kind=document.kind,
+        pages=document.pages,
+        wall_ms=round(wall, 2),
+        stages_ms={stage: round(timings.get(stage, 0.0), 2) for stage in STAGES},
+        peak_kb=round(peak / 1024, 1),
+        scored=document.expected is not None,
+        mismatches=mismatches,
+        fields=fields
+    )
+
+
+def summarize(results: List[DocumentResult]) -> dict:
+    total_seconds = sum(r.wall_ms for r in results) / 1000
+    scored = [r for r in results if r.scored]
+    accuracy = {
+        field: round(sum(field not in r.mismatches for r in scored) / len(scored), 4) if scored else None
+        for field in FIELDS
+    }
+    # Fields each document gets right, so a fix elsewhere cannot mask a break here
+    matched = {r.name: [field for field in FIELDS if field not in r.mismatches] for r in scored}
+    by_kind = {}
+    for kind in sorted({r.kind for r in results}):
+        group = [r for r in results if r.kind == kind]
+        seconds = sum(r.wall_ms for r in group) / 1000
+        by_kind[kind] = {
+            'documents': len(group),
+            'docs_per_sec': round(len(group) / seconds, 2) if seconds else None,
+            'pages_per_sec': round(sum(r.pages for r in group) / seconds, 2) if seconds else None,
+            'median_ms': round(statistics.median(r.wall_ms for r in group), 2),
+        }
+    return {
+        'documents': len(results),
+        'pages': sum(r.pages for r in results),
+        'docs_per_sec': round(len(results) / total_seconds, 2) if total_seconds else None,
+        'pages_per_sec': round(sum(r.pages for r in results) / total_seconds, 2) if total_seconds else None,
+        'peak_kb': max((r.peak_kb for r in results), default=0),
+        'stages_ms': {stage: round(sum(r.stages_ms[stage] for r in results), 2) for stage in STAGES},
+        'accuracy': accuracy,
+        'matched': matched,
+        'by_kind': by_kind,
+    }
+
+
+def compare(summary: dict, baseline: dict, throughput_tolerance: float) -> List[str]:
+    """
+    Human-readable regressions of `summary` against `baseline`.
+    """
+    regressions = []
+    for kind, stats in baseline.get('by_kind', {}).items():
+        current = summary['by_kind'].get(kind)
+        if not current or not stats.get('pages_per_sec') or not current.get('pages_per_sec'):
+            continue
+        floor = stats['pages_per_sec'] * (1 - throughput_tolerance)
+        if current['pages_per_sec'] < floor:
+            regressions.append(
+                f"{kind}: throughput {current['pages_per_sec']} pages/s is below "
+                f"{floor:.2f} (baseline {stats['pages_per_sec']})"
+            )
+    for field, value in baseline.get('accuracy', {}).items():
+        current = summary['accuracy'].get(field)
+        if value is not None and current is not None and current < value - ACCURACY_TOLERANCE:
+            regressions.append(f'{field}: accuracy {current:.2%} is below baseline {value:.2%}')
+    for name, fields in baseline.get('matched', {}).items():
+        current = summary['matched'].get(name)
+        if current is None:
+            continue
+        for field in fields:
+            if field not in current:
+                regressions.append(f'{name}: {field} no longer matches its golden value')
+    return regressions
+
+
+def throughput_tolerance(tolerance: float, repeat: int, baseline_repeat: int) -> float:
+    """
+    `tolerance` scaled by sqrt(baseline_repeat / repeat) when this run takes
+    fewer timed runs per document than the baseline did, as the median of
+    fewer runs varies more.
+    """
+    if repeat >= baseline_repeat:
+        return tolerance
+    return min(tolerance * math.sqrt(baseline_repeat / repeat), 0.9)
+
+
+def update_golden(results: List[DocumentResult]) -> None:
+    golden = {}
+    if os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+    added = [r for r in results if r.kind == 'corpus' and r.name not in golden]
+    for result in added:
+        golden[result.name] = result.fields
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f'Added golden values for {len(added)} corpus documents to {GOLDEN_PATH}; check them by hand')
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    try:
+        page_counts = [int(n) for n in args.pages.split(',') if n]
+    except ValueError:
+        print('--pages must be a comma-separated list of integers', file=sys.stderr)
+        return 2
+
+    scans = not args.no_scans and _ocr_usable()
+    if not args.no_scans and not scans:
+        print('OCR is not available; skipping synthetic statements without a text layer', file=sys.stderr)
+
+    documents = load_documents(args.corpus, page_counts, scans)
+    if not documents:
+        print('No documents to benchmark', file=sys.stderr)
+        return 2
+
+    # Warm up imports and pools so the first document is not penalized
+    parser.parse_pdf(documents[0].pdf, documents[0].name)
+
+    results = []
+    for document in documents:
+        result = run_document(document, args.repeat)
+        results.append(result)
+        status = 'ok' if not result.mismatches else f'{len(result.mismatches)} field(s) differ'
+        if document.expected is None:
+            status = 'no golden values'
+        print(f'{result.name:<72} {result.pages:>3}p {result.wall_ms:>9.1f} ms {result.peak_kb:>9.0f} KB  {status}')
+        for field, mismatch in result.mismatches.items():
+            print(f"    {field}: expected {mismatch['expected']!r}, got {mismatch['actual']!r}")
+
+    if args.update_golden:
+        update_golden(results)
+        return 0
+
+    summary = summarize(results)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'ocr_available': _ocr_usable(),
+        'repeat': args.repeat,
+        'summary': summary,
+        'documents': [r._asdict() for r in results],
+    }
+    _print_summary(summary)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({k: report[k] for k in ('python', 'machine', 'ocr_available', 'repeat', 'summary')}, f, indent=2)
+            f.write('\n')
+        print(f'Saved baseline to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline to record one')
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    tolerance = throughput_tolerance(args.tolerance, args.repeat, baseline.get('repeat', args.repeat))
+    if tolerance != args.tolerance:
+        print(f"\n--repeat {args.repeat} is below the baseline's {baseline['repeat']}; "
+              f"allowing a {tolerance:.0%} throughput drop")
+    regressions = compare(summary, baseline['summary'], tolerance)
+    if regressions:
+        print('\nRegressions against baseline:')
+        for regression in regressions:
+            print(f'  - {regression}')
+        return 1
+    print('\nNo regressions against baseline')
+    return 0
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"\n{summary['documents']} documents, {summary['pages']} pages: "
+          f"{summary['docs_per_sec']} docs/s, {summary['pages_per_sec']} pages/s, "
+          f"peak {summary['peak_kb']:.0f} KB")
+    for kind, stats in summary['by_kind'].items():
+        print(f"  {kind:<7} {stats['documents']:>3} docs  {stats['pages_per_sec']:>8} pages/s  "
+              f"median {stats['median_ms']} ms")
+    print('Stage time (ms): ' + ', '.join(f'{stage} {ms}' for stage, ms in summary['stages_ms'].items()))
+    print('Accuracy: ' + ', '.join(
+        f'{field} {value:.0%}' for field, value in summary['accuracy'].items() if value is not None
+    ))
+
+
+def _parse_args(argv):
+    ap = argparse.ArgumentParser(description='Benchmark the statement parser.')
+    ap.add_argument('--corpus', default=DEFAULT_CORPUS, help='directory of sample PDFs')
+    ap.add_argument('--pages', default='1,3,10', help='synthetic statement page counts')
+    ap.add_argument('--no-scans', action='store_true', help='skip synthetic statements without a text layer')
+    ap.add_argument('--repeat', type=int, default=3, help='timed runs per document (median is reported)')
+    ap.add_argument('--baseline', default=BASELINE_PATH, help='baseline file to compare with or save to')
+    ap.add_argument('--save-baseline', action='store_true', help='record this run as the baseline')
+    ap.add_argument('--update-golden', action='store_true', help='record corpus results as golden values')
+    ap.add_argument('--tolerance', type=float, default=THROUGHPUT_TOLERANCE,
+                    help='allowed throughput drop before failing (fraction)')
+    ap.add_argument('--output', help='write the full report as JSON')
+    return ap.parse_args(argv)
+
+
+def _page_count(pdf: bytes) -> int:
+    try:
+        return len(PdfReader(io.BytesIO(pdf)).pages)
+    except Exception:
+        return 1
+
+
+def _ocr_usable() -> bool:
+    # OCR_AVAILABLE only means the Python packages import; the binaries must exist too
+    if not OCR_AVAILABLE:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return shutil.which('pdftoppm') is not None
+
+
+def _same(actual, expected) -> bool:
+    if isinstance(actual, float) and isinstance(expected, (int, float)):
+        return abs(actual - expected) < 0.005
+    return actual == expected
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Synthetic credit card statements with known field values.
+
+Each statement is rendered either with a text layer (a minimal hand-written
+PDF using the built-in Helvetica font) or as scanned-style page images with
+no text layer, so both the text and the OCR paths of the parser are covered.
+"""
+import io
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Header line (matched by detect_issuer) and card variant per issuer
+ISSUERS = {
+    'HDFC': ('HDFC BANK', 'Regalia'),
+    'ICICI': ('ICICI BANK', 'Coral'),
+    'SBI': ('SBI CARD', 'Elite'),
+    'AXIS': ('AXIS BANK', 'Magnus'),
+    'AMEX': ('AMERICAN EXPRESS', 'Platinum Travel'),
+}
+
+# Merchants drawn for transaction lines; Shopping dominates so the expected
+# top category is stable
+MERCHANTS = [
+    ('AMAZON RETAIL', 'Shopping'),
+    ('FLIPKART STORE', 'Shopping'),
+    ('MYNTRA FASHION', 'Shopping'),
+    ('SWIGGY FOOD', 'Food & Dining'),
+    ('UBER RIDES', 'Transportation'),
+]
+MERCHANT_WEIGHTS = [4, 3, 3, 1, 1]
+CITIES = ['MUMBAI', 'BANGALORE', 'DELHI', 'PUNE']
+
+LINES_PER_PAGE = 40
+TRANSACTIONS_PER_PAGE = 30
+
+
+class SyntheticStatement(NamedTuple):
+    name: str
+    pdf: bytes
+    pages: int
+    text_layer: bool
+    expected: Dict[str, object]
+
+
+def statement_lines(issuer: str, pages: int, rng: random.Random) -> Tuple[List[List[str]], Dict[str, object]]:
+    """
+    Lines of text per page plus the field values a correct parse should return.
+    """
+    header, variant = ISSUERS[issuer]
+    last4 = f'{rng.randint(0, 9999):04d}'
+    transaction_count = TRANSACTIONS_PER_PAGE * pages - 10
+    balance = round(rng.uniform(1000, 250000), 2)
+    interest = round(rng.uniform(10, 5000), 2)
+
+    summary = [
+        f'{header} Credit Card Statement',
+        f'Card Number: XXXX XXXX XXXX {last4}',
+        f'Card Type: {variant} Credit Card',
+        'Statement Date: 15/03/2024',
+        f'Total Amount Due: Rs. {balance:,.2f}',
+        f'Closing Balance: Rs. {balance:,.2f}',
+        f'Interest Charges: Rs. {interest:,.2f}',
+        f'Total Transactions: {transaction_count}',
+        '',
+    ]
+
+    transactions = []
+    for i in range(transaction_count):
+        merchant, _ = rng.choices(MERCHANTS, weights=MERCHANT_WEIGHTS)[0]
+        day = i % 28 + 1
+        amount = rng.uniform(50, 20000)
+        transactions.append(f'{day:02d}/03/2024 POS {merchant} {rng.choice(CITIES)} {amount:,.2f}')
+
+    lines = summary + transactions
+    page_lines = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)]
+    while len(page_lines) < pages:
+        page_lines.append(['Reward points summary and terms and conditions.'])
+
+    expected = {
+        'issuer': issuer,
+        'card_last4': last4,
+        'card_variant': variant.title(),
+        'total_balance': balance,
+        'transaction_count': transaction_count,
+        'interest_charges': interest,
+        'top_merchant_category': 'Shopping',
+        'status': 'PARSED',
+    }
+    return page_lines[:pages], expected
+
+
+def text_pdf(pages: List[List[str]]) -> bytes:
+    """
+    A minimal PDF with one Helvetica text line per entry.
+    """
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page object numbers are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for lines in pages:
+        body = ['BT /F1 10 Tf 12 TL 50 800 Td']
+        for line in lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            body.append(f'({escaped}) Tj T*')
+        body.append('ET')
+        stream = '\n'.join(body).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (len(objects),)
+        )
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids)
+    )
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def image_pdf(pages: List[List[str]], dpi: int = 150) -> bytes:
+    """
+    One rendered A4 image per page and no text layer, like a scanned statement.
+    """
+    size = (int(8.27 * dpi), int(11.69 * dpi))
+    try:
+        font = ImageFont.load_default(size=int(dpi / 7))
+    except TypeError:
+        # Pillow without FreeType only ships a fixed-size bitmap font
+        font = ImageFont.load_default()
+    line_height = int(dpi / 5)
+
+    images = []
+    for lines in pages:
+        image = Image.new('L', size, 255)
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines):
+            draw.text((dpi // 2, dpi // 2 + i * line_height), line, fill=0, font=font)
+        images.append(image)
+
+    out = io.BytesIO()
+    images[0].save(out, 'PDF', resolution=dpi, save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+def generate(page_counts=(1, 3, 10), text_layers=(True, False), seed: int = 1234) -> List[SyntheticStatement]:
+    """
+    One statement per issuer, page count and text-layer setting. The same seed
+    always produces the same statements.
+    """
+    rng = random.Random(seed)
+    statements = []
+    for issuer in ISSUERS:
+        for pages in page_counts:
+            page_lines, expected = statement_lines(issuer, pages, rng)
+            for text_layer in text_layers:
+                kind = 'text' if text_layer else 'scan'
+                pdf = text_pdf(page_lines) if text_layer else image_pdf(page_lines)
+                statements.append(SyntheticStatement(
+                    name=f'synthetic-{issuer.lower()}-{pages}p-{kind}.pdf',
+                    pdf=pdf,
+                    pages=pages,
+                    text_layer=text_layer,
+                    expected=expected
+                ))
+    return statements
@@ -1,24 +1,15 @@
-import { ParsedRecord } from '../types'
+import { DashboardStats } from '../types'
 import { PieChart, Pie, Cell, ResponsiveContainer, Legend, Tooltip } from 'recharts'
 
 interface CardVariantChartProps {
-  records: ParsedRecord[]
+  stats: DashboardStats
 }
 
 const COLORS = ['#16A34A', '#3b82f6', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#06b6d4']
 
-export default function CardVariantChart({ records }: CardVariantChartProps) {
-  // Count card variants
-  const variantCounts: Record<string, number> = {}
-
-  records
-    .filter(r => r.status === 'PARSED' && r.card_variant)
-    .forEach(r => {
-      const variant = r.card_variant || 'Unknown'
-      variantCounts[variant] = (variantCounts[variant] || 0) + 1
-    })
-
-  const chartData = Object.entries(variantCounts)
+export default function CardVariantChart({ stats }: CardVariantChartProps) {
+  // Card variant counts are aggregated by the server
+  const chartData = Object.entries(stats.by_variant)
     .map(([name, value]) => ({
       name,
       value
@@ -1,11 +1,11 @@
-import { ParsedRecord, Issuer } from '../types'
+import { DashboardStats, Issuer } from '../types'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts'
 
 interface ChartProps {
-  records: ParsedRecord[]
+  stats: DashboardStats
 }
 
-export default function Chart({ records }: ChartProps) {
+export default function Chart({ stats }: ChartProps) {
   // Aggregate data by issuer
   const issuerData: Record<Issuer | 'UNKNOWN', number> = {
     HDFC: 0,
@@ -16,11 +16,9 @@ export default function Chart({ records }: ChartProps) {
     UNKNOWN: 0
   }
 
-  records
-    .filter(r => r.status === 'PARSED' && r.total_balance !== null)
-    .forEach(r => {
-      issuerData[r.issuer] += r.total_balance || 0
-    })
+  Object.entries(stats.by_issuer).forEach(([issuer, totals]) => {
+    issuerData[issuer as Issuer] = (issuerData[issuer as Issuer] || 0) + (totals?.total_balance || 0)
+  })
 
   const chartData = Object.entries(issuerData)
     .filter(([_, value]) => value > 0)
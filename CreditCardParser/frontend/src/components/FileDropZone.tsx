@@ -1,6 +1,10 @@
 import { useCallback } from 'react'
 import { Upload } from 'lucide-react'
 
+// Statement PDFs, and ZIP archives of them
+const isAccepted = (file: File) =>
+  file.type === 'application/pdf' || /\.(pdf|zip)$/i.test(file.name)
+
 interface FileDropZoneProps {
   onFilesSelected: (files: File[]) => void
 }
@@ -9,9 +13,7 @@ export default function FileDropZone({ onFilesSelected }: FileDropZoneProps) {
   const handleDrop = useCallback(
     (e: React.DragEvent<HTMLDivElement>) => {
       e.preventDefault()
-      const files = Array.from(e.dataTransfer.files).filter(
-        file => file.type === 'application/pdf'
-      )
+      const files = Array.from(e.dataTransfer.files).filter(isAccepted)
       if (files.length > 0) {
         onFilesSelected(files)
       }
@@ -25,9 +27,7 @@ export default function FileDropZone({ onFilesSelected }: FileDropZoneProps) {
 
   const handleFileInput = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files) {
-      const files = Array.from(e.target.files).filter(
-        file => file.type === 'application/pdf'
-      )
+      const files = Array.from(e.target.files).filter(isAccepted)
       if (files.length > 0) {
         onFilesSelected(files)
       }
@@ -46,7 +46,7 @@ export default function FileDropZone({ onFilesSelected }: FileDropZoneProps) {
         type="file"
         id="file-upload"
         multiple
-        accept="application/pdf"
+        accept="application/pdf,.zip,application/zip"
         onChange={handleFileInput}
         className="hidden"
       />
@@ -55,10 +55,10 @@ export default function FileDropZone({ onFilesSelected }: FileDropZoneProps) {
           <Upload className="w-8 h-8 text-gray-400 dark:text-gray-500" />
         </div>
         <p className="text-lg font-medium text-gray-900 dark:text-white mb-2">
-          Drop PDF files here or click to browse
+          Drop PDF or ZIP files here or click to browse
         </p>
         <p className="text-sm text-gray-500 dark:text-gray-400">
-          Supports multiple credit card statement PDFs
+          Supports multiple credit card statement PDFs and ZIP archives of them
         </p>
       </label>
     </div>
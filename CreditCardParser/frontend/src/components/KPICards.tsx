@@ -1,20 +1,14 @@
-import { ParsedRecord } from '../types'
+import { DashboardStats } from '../types'
 import { FileText, DollarSign, Calendar } from 'lucide-react'
 
 interface KPICardsProps {
-  records: ParsedRecord[]
+  stats: DashboardStats
 }
 
-export default function KPICards({ records }: KPICardsProps) {
-  const totalStatements = records.filter(r => r.status === 'PARSED').length
-  
-  const totalBalance = records
-    .filter(r => r.status === 'PARSED' && r.total_balance !== null)
-    .reduce((sum, r) => sum + (r.total_balance || 0), 0)
-
-  const totalTransactions = records
-    .filter(r => r.status === 'PARSED' && r.transaction_count !== null)
-    .reduce((sum, r) => sum + (r.transaction_count || 0), 0)
+export default function KPICards({ stats }: KPICardsProps) {
+  const totalStatements = stats.parsed
+  const totalBalance = stats.total_balance
+  const totalTransactions = stats.total_transactions
 
   const formatAmount = (amount: number) => {
     return new Intl.NumberFormat('en-IN', {
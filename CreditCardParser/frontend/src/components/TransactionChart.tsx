@@ -1,11 +1,11 @@
-import { ParsedRecord, Issuer } from '../types'
+import { DashboardStats, Issuer } from '../types'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts'
 
 interface TransactionChartProps {
-  records: ParsedRecord[]
+  stats: DashboardStats
 }
 
-export default function TransactionChart({ records }: TransactionChartProps) {
+export default function TransactionChart({ stats }: TransactionChartProps) {
   // Aggregate transaction count by issuer
   const issuerData: Record<Issuer | 'UNKNOWN', number> = {
     HDFC: 0,
@@ -16,11 +16,9 @@ export default function TransactionChart({ records }: TransactionChartProps) {
     UNKNOWN: 0
   }
 
-  records
-    .filter(r => r.status === 'PARSED' && r.transaction_count !== null)
-    .forEach(r => {
-      issuerData[r.issuer] += r.transaction_count || 0
-    })
+  Object.entries(stats.by_issuer).forEach(([issuer, totals]) => {
+    issuerData[issuer as Issuer] = (issuerData[issuer as Issuer] || 0) + (totals?.transaction_count || 0)
+  })
 
   const chartData = Object.entries(issuerData)
     .filter(([_, value]) => value > 0)
@@ -3,7 +3,7 @@ import { useNavigate } from 'react-router-dom'
 import toast from 'react-hot-toast'
 import { FileText, Upload, LogOut, Download, XCircle } from 'lucide-react'
 import { api } from '../services/api'
-import { ParsedRecord, Issuer } from '../types'
+import { DashboardStats, ParsedRecord, Issuer, RecordQuery } from '../types'
 import { useAuth } from '../contexts/AuthContext'
 import RecordsTable from '../components/RecordsTable'
 import KPICards from '../components/KPICards'
@@ -12,64 +12,100 @@ import TransactionChart from '../components/TransactionChart'
 import CardVariantChart from '../components/CardVariantChart'
 import DarkModeToggle from '../components/DarkModeToggle'
 
+// Rows fetched per request for the statements table
+const PAGE_SIZE = 50
+
 export default function Dashboard() {
   const navigate = useNavigate()
   const { logout } = useAuth()
-  const [records, setRecords] = useState<ParsedRecord[]>([])
+  const [stats, setStats] = useState<DashboardStats | null>(null)
   const [filteredRecords, setFilteredRecords] = useState<ParsedRecord[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [matchCount, setMatchCount] = useState(0)
   const [isLoading, setIsLoading] = useState(true)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [searchQuery, setSearchQuery] = useState('')
+  const [debouncedQuery, setDebouncedQuery] = useState('')
   const [issuerFilter, setIssuerFilter] = useState<Issuer | 'ALL'>('ALL')
 
   useEffect(() => {
-    loadRecords()
+    loadStats()
   }, [])
 
+  // Wait for typing to pause before querying the server
+  useEffect(() => {
+    const timer = window.setTimeout(() => setDebouncedQuery(searchQuery.trim()), 300)
+    return () => window.clearTimeout(timer)
+  }, [searchQuery])
+
   useEffect(() => {
     filterRecords()
-  }, [records, searchQuery, issuerFilter])
+  }, [debouncedQuery, issuerFilter])
 
-  const loadRecords = async () => {
+  const loadStats = async () => {
     setIsLoading(true)
     try {
-      const response = await api.getRecords()
+      // KPIs and charts use aggregates kept up to date by the server
+      const response = await api.getStats()
       if (response.success && response.data) {
-        // Sort by uploaded_at descending (most recent first)
-        const sortedRecords = response.data.sort((a, b) => 
-          new Date(b.uploaded_at).getTime() - new Date(a.uploaded_at).getTime()
-        )
-        setRecords(sortedRecords)
+        setStats(response.data)
       } else {
-        toast.error(response.error || 'Failed to load records')
+        toast.error(response.error || 'Failed to load statistics')
       }
     } catch (error) {
-      toast.error('An error occurred while loading records')
+      toast.error('An error occurred while loading statistics')
     } finally {
       setIsLoading(false)
     }
   }
 
-  const filterRecords = () => {
-    let filtered = [...records]
+  const recordQuery = (cursor?: string): RecordQuery => ({
+    issuer: issuerFilter !== 'ALL' ? issuerFilter : undefined,
+    q: debouncedQuery || undefined,
+    sort: 'uploaded_at',
+    order: 'desc',
+    limit: PAGE_SIZE,
+    cursor,
+  })
 
-    // Apply issuer filter
-    if (issuerFilter !== 'ALL') {
-      filtered = filtered.filter(r => r.issuer === issuerFilter)
+  const filterRecords = async () => {
+    try {
+      // Issuer and search filters are applied by the server, one page at a time
+      const response = await api.getRecords(recordQuery())
+      if (response.success && response.data) {
+        setFilteredRecords(response.data)
+        setNextCursor(response.pagination?.next_cursor ?? null)
+        setMatchCount(response.pagination?.total ?? response.data.length)
+      } else {
+        toast.error(response.error || 'Failed to load records')
+      }
+    } catch (error) {
+      toast.error('An error occurred while loading records')
     }
+  }
 
-    // Apply search query
-    if (searchQuery.trim()) {
-      const query = searchQuery.toLowerCase()
-      filtered = filtered.filter(r =>
-        r.issuer.toLowerCase().includes(query) ||
-        r.card_last4?.toLowerCase().includes(query) ||
-        r.filename.toLowerCase().includes(query)
-      )
+  const loadMore = async () => {
+    if (!nextCursor) {
+      return
+    }
+    setIsLoadingMore(true)
+    try {
+      const response = await api.getRecords(recordQuery(nextCursor))
+      if (response.success && response.data) {
+        setFilteredRecords(prev => [...prev, ...response.data!])
+        setNextCursor(response.pagination?.next_cursor ?? null)
+      } else {
+        toast.error(response.error || 'Failed to load records')
+      }
+    } catch (error) {
+      toast.error('An error occurred while loading records')
+    } finally {
+      setIsLoadingMore(false)
     }
-
-    setFilteredRecords(filtered)
   }
 
+  const totalRecords = stats?.total_records ?? 0
+
   const handleExport = async () => {
     try {
       const blob = await api.exportCSV()
@@ -95,8 +131,10 @@ export default function Dashboard() {
     try {
       const response = await api.clearRecords()
       if (response.success) {
-        setRecords([])
         setFilteredRecords([])
+        setNextCursor(null)
+        setMatchCount(0)
+        loadStats()
         toast.success('All statements cleared successfully')
       } else {
         toast.error(response.error || 'Failed to clear records')
@@ -146,14 +184,14 @@ export default function Dashboard() {
 
       {/* Main Content */}
       <main className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
-        {isLoading ? (
+        {isLoading || !stats ? (
           <div className="flex items-center justify-center h-64">
             <div className="text-gray-600">Loading...</div>
           </div>
         ) : (
           <div className="space-y-6">
             {/* KPIs */}
-            <KPICards records={records} />
+            <KPICards stats={stats} />
 
             {/* Charts Grid */}
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
@@ -162,7 +200,7 @@ export default function Dashboard() {
                 <h2 className="text-lg font-semibold text-gray-900 mb-4">
                   Amount Payable by Issuer
                 </h2>
-                <Chart records={records} />
+                <Chart stats={stats} />
               </div>
 
               {/* Transaction Count by Issuer */}
@@ -170,7 +208,7 @@ export default function Dashboard() {
                 <h2 className="text-lg font-semibold text-gray-900 mb-4">
                   Transactions by Issuer
                 </h2>
-                <TransactionChart records={records} />
+                <TransactionChart stats={stats} />
               </div>
             </div>
 
@@ -179,7 +217,7 @@ export default function Dashboard() {
               <h2 className="text-lg font-semibold text-gray-900 mb-4">
                 Card Variant Distribution
               </h2>
-              <CardVariantChart records={records} />
+              <CardVariantChart stats={stats} />
             </div>
 
             {/* Filters and Table */}
@@ -191,7 +229,7 @@ export default function Dashboard() {
                 <div className="flex items-center space-x-3">
                   <button
                     onClick={handleClearAll}
-                    disabled={records.length === 0}
+                    disabled={totalRecords === 0}
                     className="flex items-center space-x-2 bg-red-500 hover:bg-red-600 text-white font-medium py-2 px-4 rounded-lg transition disabled:opacity-50 disabled:cursor-not-allowed"
                   >
                     <XCircle className="w-4 h-4" />
@@ -199,7 +237,7 @@ export default function Dashboard() {
                   </button>
                   <button
                     onClick={handleExport}
-                    disabled={records.length === 0}
+                    disabled={totalRecords === 0}
                     className="flex items-center space-x-2 bg-primary-500 hover:bg-primary-600 text-white font-medium py-2 px-4 rounded-lg transition disabled:opacity-50 disabled:cursor-not-allowed"
                   >
                     <Download className="w-4 h-4" />
@@ -245,7 +283,7 @@ export default function Dashboard() {
               {/* Table */}
               {filteredRecords.length === 0 ? (
                 <div className="text-center py-12 text-gray-500">
-                  {records.length === 0 ? (
+                  {totalRecords === 0 ? (
                     <>
                       <FileText className="w-12 h-12 mx-auto mb-3 text-gray-400" />
                       <p>No statements parsed yet</p>
@@ -261,7 +299,23 @@ export default function Dashboard() {
                   )}
                 </div>
               ) : (
-                <RecordsTable records={filteredRecords} />
+                <>
+                  <RecordsTable records={filteredRecords} />
+                  <div className="flex items-center justify-between mt-4 text-sm text-gray-500">
+                    <span>
+                      Showing {filteredRecords.length} of {matchCount} statements
+                    </span>
+                    {nextCursor && (
+                      <button
+                        onClick={loadMore}
+                        disabled={isLoadingMore}
+                        className="text-primary-600 hover:text-primary-700 font-medium disabled:opacity-50"
+                      >
+                        {isLoadingMore ? 'Loading...' : 'Load more'}
+                      </button>
+                    )}
+                  </div>
+                </>
               )}
             </div>
           </div>
@@ -9,17 +9,45 @@ import FileDropZone from '../components/FileDropZone'
 import RecordsTable from '../components/RecordsTable'
 import DarkModeToggle from '../components/DarkModeToggle'
 
+const isArchive = (file: File) => /\.zip$/i.test(file.name)
+
 export default function Parser() {
   const navigate = useNavigate()
   const { logout } = useAuth()
   const [files, setFiles] = useState<File[]>([])
   const [isUploading, setIsUploading] = useState(false)
   const [results, setResults] = useState<ParsedRecord[]>([])
+  const [progress, setProgress] = useState<{ completed: number; total: number } | null>(null)
 
   const handleFilesSelected = (selectedFiles: File[]) => {
     setFiles(selectedFiles)
   }
 
+  // Archives stream one result per entry; duplicate and non-PDF entries carry no record
+  const uploadArchive = async (archive: File) => {
+    const response = await api.uploadArchive(archive, (result) => {
+      const record = result.record
+      if (record) {
+        setResults(prev => [...prev, record])
+      }
+    })
+    if (!response.success || !response.data) {
+      toast.error(response.error || `Failed to process ${archive.name}`)
+      return
+    }
+
+    const { PARSED, FAILED, DUPLICATE } = response.data
+    if (PARSED > 0) {
+      toast.success(`${archive.name}: parsed ${PARSED} file(s)`)
+    }
+    if (FAILED > 0) {
+      toast.error(`${archive.name}: failed to parse ${FAILED} file(s)`)
+    }
+    if (DUPLICATE > 0) {
+      toast(`${archive.name}: skipped ${DUPLICATE} duplicate file(s)`)
+    }
+  }
+
   const handleUpload = async () => {
     if (files.length === 0) {
       toast.error('Please select at least one file')
@@ -27,28 +55,59 @@ export default function Parser() {
     }
 
     setIsUploading(true)
+    setResults([])
     try {
-      const response = await api.uploadFiles(files)
-      
-      if (response.success && response.data) {
-        setResults(response.data)
-        const successCount = response.data.filter(r => r.status === 'PARSED').length
-        const failCount = response.data.filter(r => r.status === 'FAILED').length
-        
-        if (successCount > 0) {
-          toast.success(`Successfully parsed ${successCount} file(s)`)
-        }
-        if (failCount > 0) {
-          toast.error(`Failed to parse ${failCount} file(s)`)
-        }
-        
+      const archives = files.filter(isArchive)
+      const pdfs = files.filter(file => !isArchive(file))
+      for (const archive of archives) {
+        await uploadArchive(archive)
+      }
+      if (pdfs.length === 0) {
         setFiles([])
-      } else {
+        setIsUploading(false)
+        return
+      }
+
+      const response = await api.createJob(pdfs)
+
+      if (!response.success || !response.data) {
         toast.error(response.error || 'Upload failed')
+        setIsUploading(false)
+        return
       }
+
+      setProgress({ completed: 0, total: response.data.total })
+      setFiles([])
+
+      // Records stream in as each file finishes parsing
+      api.streamJob(
+        response.data.id,
+        (record) => {
+          setResults(prev => [...prev, record])
+          setProgress(prev => prev && { ...prev, completed: prev.completed + 1 })
+        },
+        (job) => {
+          const successCount = job.files.filter(f => f.status === 'PARSED').length
+          const failCount = job.files.filter(f => f.status === 'FAILED').length
+
+          if (successCount > 0) {
+            toast.success(`Successfully parsed ${successCount} file(s)`)
+          }
+          if (failCount > 0) {
+            toast.error(`Failed to parse ${failCount} file(s)`)
+          }
+
+          setIsUploading(false)
+          setProgress(null)
+        },
+        () => {
+          toast.error('Lost connection while parsing')
+          setIsUploading(false)
+          setProgress(null)
+        },
+      )
     } catch (error) {
       toast.error('An error occurred during upload')
-    } finally {
       setIsUploading(false)
     }
   }
@@ -130,6 +189,22 @@ export default function Parser() {
             )}
           </div>
 
+          {/* Progress */}
+          {progress && (
+            <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 p-6">
+              <div className="flex items-center justify-between mb-2 text-sm text-gray-700 dark:text-gray-300">
+                <span>Parsing statements...</span>
+                <span>{progress.completed} / {progress.total}</span>
+              </div>
+              <div className="w-full h-2 bg-gray-200 dark:bg-gray-700 rounded-full overflow-hidden">
+                <div
+                  className="h-full bg-primary-500 transition-all"
+                  style={{ width: `${progress.total ? (progress.completed / progress.total) * 100 : 0}%` }}
+                />
+              </div>
+            </div>
+          )}
+
           {/* Results Section */}
           {results.length > 0 && (
             <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 p-6">
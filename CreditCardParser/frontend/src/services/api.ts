@@ -1,4 +1,13 @@
-import { ApiResponse, ParsedRecord } from '../types'
+import {
+  ApiResponse,
+  ArchiveEntryResult,
+  ArchiveSummary,
+  DashboardStats,
+  IngestionJob,
+  ParsedRecord,
+  RecordQuery,
+  SearchResponse,
+} from '../types'
 
 const API_BASE = '/api'
 
@@ -25,8 +34,123 @@ export const api = {
     return response.json()
   },
 
-  async getRecords(): Promise<ApiResponse<ParsedRecord[]>> {
-    const response = await fetch(`${API_BASE}/records`)
+  async createJob(files: File[]): Promise<ApiResponse<IngestionJob>> {
+    const formData = new FormData()
+    files.forEach(file => {
+      formData.append('files', file)
+    })
+
+    const response = await fetch(`${API_BASE}/jobs`, {
+      method: 'POST',
+      body: formData,
+    })
+    return response.json()
+  },
+
+  /**
+   * Upload a ZIP archive of statements and read its NDJSON result stream: onEntry
+   * runs as each entry finishes, and the final summary is returned.
+   */
+  async uploadArchive(
+    archive: File,
+    onEntry: (result: ArchiveEntryResult) => void,
+  ): Promise<ApiResponse<ArchiveSummary>> {
+    const formData = new FormData()
+    formData.append('archive', archive)
+
+    const response = await fetch(`${API_BASE}/archives`, {
+      method: 'POST',
+      body: formData,
+    })
+    if (!response.ok || !response.body) {
+      return response.json()
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffered = ''
+    let summary: ArchiveSummary | undefined
+    const handle = (line: string) => {
+      if (!line.trim()) return
+      const result = JSON.parse(line) as ArchiveEntryResult | ArchiveSummary
+      if (result.event === 'done') {
+        summary = result
+      } else {
+        onEntry(result)
+      }
+    }
+
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffered += decoder.decode(value, { stream: true })
+      const lines = buffered.split('\n')
+      buffered = lines.pop() ?? ''
+      lines.forEach(handle)
+    }
+    handle(buffered + decoder.decode())
+
+    return summary
+      ? { success: true, data: summary }
+      : { success: false, error: 'Archive stream ended early' }
+  },
+
+  async getJob(jobId: string): Promise<ApiResponse<IngestionJob>> {
+    const response = await fetch(`${API_BASE}/jobs/${jobId}`)
+    return response.json()
+  },
+
+  /**
+   * Subscribe to a job's Server-Sent Events stream. Returns a function that closes the stream.
+   */
+  streamJob(
+    jobId: string,
+    onRecord: (record: ParsedRecord) => void,
+    onDone: (job: IngestionJob) => void,
+    onError: () => void,
+  ): () => void {
+    const source = new EventSource(`${API_BASE}/jobs/${jobId}/events`)
+    source.addEventListener('record', (event) => {
+      onRecord(JSON.parse((event as MessageEvent).data))
+    })
+    source.addEventListener('done', (event) => {
+      source.close()
+      onDone(JSON.parse((event as MessageEvent).data))
+    })
+    source.onerror = () => {
+      // EventSource reconnects on its own (resuming via Last-Event-ID) unless closed
+      if (source.readyState === EventSource.CLOSED) {
+        onError()
+      }
+    }
+    return () => source.close()
+  },
+
+  /**
+   * Fetch one page of records; pass pagination.next_cursor back as `cursor` for the next page.
+   */
+  async getRecords(query: RecordQuery = {}): Promise<ApiResponse<ParsedRecord[]>> {
+    const params = new URLSearchParams()
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') {
+        params.append(key, String(value))
+      }
+    })
+    const response = await fetch(`${API_BASE}/records?${params}`)
+    return response.json()
+  },
+
+  /**
+   * Full-text search over statement text and merchants; returns ranked record ids.
+   */
+  async searchRecords(q: string, limit = 20, offset = 0): Promise<SearchResponse> {
+    const params = new URLSearchParams({ q, limit: String(limit), offset: String(offset) })
+    const response = await fetch(`${API_BASE}/search?${params}`)
+    return response.json()
+  },
+
+  async getStats(): Promise<ApiResponse<DashboardStats>> {
+    const response = await fetch(`${API_BASE}/stats`)
     return response.json()
   },
 
@@ -12,13 +12,118 @@ export interface ParsedRecord {
   transaction_count: number | null
   interest_charges: number | null
   top_merchant_category: string | null
+  text_backend: string | null
+  content_hash: string | null
+  rules_version: string | null
+  partial_fields: string | null
   uploaded_at: string
   status: ParseStatus
   error?: string
 }
 
+export type JobStatus = 'QUEUED' | 'RUNNING' | 'COMPLETED'
+
+export interface JobFile {
+  index: number
+  filename: string
+  status: 'QUEUED' | 'RUNNING' | ParseStatus
+  record_id: string | null
+  error: string | null
+}
+
+export interface IngestionJob {
+  id: string
+  status: JobStatus
+  created_at: string
+  total: number
+  completed: number
+  files: JobFile[]
+}
+
+export type ArchiveEntryStatus = ParseStatus | 'DUPLICATE' | 'SKIPPED'
+
+export interface ArchiveEntryResult {
+  event: 'entry'
+  index: number
+  entry: string
+  status: ArchiveEntryStatus
+  record?: ParsedRecord
+  error?: string
+  duplicate_of?: number
+}
+
+export interface ArchiveSummary {
+  event: 'done'
+  total: number
+  PARSED: number
+  FAILED: number
+  DUPLICATE: number
+  SKIPPED: number
+}
+
+export type RecordSort =
+  | 'uploaded_at'
+  | 'filename'
+  | 'issuer'
+  | 'total_balance'
+  | 'transaction_count'
+  | 'interest_charges'
+
+export interface RecordQuery {
+  issuer?: Issuer
+  status?: ParseStatus
+  q?: string
+  sort?: RecordSort
+  order?: 'asc' | 'desc'
+  limit?: number
+  cursor?: string
+}
+
+export interface Pagination {
+  next_cursor: string | null
+  limit: number
+  total: number
+}
+
+export interface SearchHit {
+  id: string
+  score: number
+}
+
+export interface SearchPagination {
+  offset: number
+  next_offset: number | null
+  limit: number
+  total: number
+}
+
+export interface IssuerStats {
+  statements: number
+  total_balance: number
+  transaction_count: number
+  interest_charges: number
+}
+
+export interface DashboardStats {
+  total_records: number
+  parsed: number
+  failed: number
+  parsed_ratio: number
+  total_balance: number
+  total_transactions: number
+  total_interest: number
+  by_issuer: Partial<Record<Issuer, IssuerStats>>
+  by_variant: Record<string, number>
+  by_category: Record<string, number>
+}
+
 export interface ApiResponse<T> {
   success: boolean
   data?: T
   error?: string
+  pagination?: Pagination
+}
+
+export type SearchResponse = Omit<ApiResponse<SearchHit[]>, 'pagination'> & {
+  pagination?: SearchPagination
 }